@@ -0,0 +1,79 @@
+# 📍 File: bench/bench_broadcast.py
+#
+# Throughput broadcast reminder: loop serial (cara lama) vs Broadcaster.
+# Jalankan dari root repo:  python -m bench.bench_broadcast --messages 300
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ADMIN_IDS", "1")
+
+from telegram import Bot  # noqa: E402
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from lib.broadcast import Broadcaster  # noqa: E402
+
+
+def _max_per_second(calls):
+    times = sorted(t for t, endpoint, _ in calls if endpoint != "getMe")
+    best = 0
+    start = 0
+    for end, t in enumerate(times):
+        while t - times[start] >= 1:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+async def _make_bot(request):
+    bot = Bot("123:fake", request=request, get_updates_request=FakeBotRequest())
+    await bot.initialize()
+    return bot
+
+
+async def run_serial(n, latency):
+    request = FakeBotRequest(latency=latency)
+    bot = await _make_bot(request)
+    t0 = time.perf_counter()
+    for i in range(n):
+        await bot.send_message(chat_id=1000 + i, text="reminder")
+    elapsed = time.perf_counter() - t0
+    return elapsed, _max_per_second(request.calls), 0
+
+
+async def run_broadcast(n, latency, concurrency, rate, flood_rate):
+    request = FakeBotRequest(latency=latency, flood_rate=flood_rate)
+    bot = await _make_bot(request)
+    broadcaster = Broadcaster(max_concurrency=concurrency, global_rate=rate)
+    jobs = [
+        (1000 + i, lambda chat_id=1000 + i: bot.send_message(chat_id=chat_id, text="reminder"))
+        for i in range(n)
+    ]
+    t0 = time.perf_counter()
+    results = await broadcaster.broadcast(jobs)
+    elapsed = time.perf_counter() - t0
+    failed = sum(isinstance(r, Exception) for r in results)
+    return elapsed, _max_per_second(request.calls), failed, request.flood_errors
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.08)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=25)
+    parser.add_argument("--flood-rate", type=int, default=30)
+    args = parser.parse_args()
+
+    n = args.messages
+    elapsed, peak, _ = await run_serial(n, args.latency)
+    print(f"serial     : {n} pesan dalam {elapsed:.2f}s ({n / elapsed:.1f} msg/s, puncak {peak}/s)")
+
+    elapsed, peak, failed, floods = await run_broadcast(n, args.latency, args.concurrency, args.rate, args.flood_rate)
+    print(f"broadcaster: {n} pesan dalam {elapsed:.2f}s ({n / elapsed:.1f} msg/s, puncak {peak}/s, "
+          f"gagal {failed}, 429 {floods})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+# 📍 File: bench/bench_change_feed.py
+#
+# Uji & ukur lib.change_feed terhadap FakeRealtime (websocket lokal) dan
+# FakeSupabase: latensi event -> cache (search index, client directory),
+# DELETE, dan reconnect + resync setelah server Realtime putus sementara
+# dan ada perubahan yang terlewat.
+# Jalankan dari root repo:  python -m bench.bench_change_feed --services 10000 --events 500
+
+import argparse
+import asyncio
+import logging
+import time
+
+# run_suite menyalakan FakeSupabase & mengisi env sebelum modul bot di-import
+from bench.run_suite import _fake as _fake_db, make_dataset
+from bench.fake_realtime import FakeRealtime, wait_until
+from database.supabase_client import supabase, run_query
+from lib.change_feed import ChangeFeed
+from lib.client_directory import client_directory
+from lib.search_index import search_index
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    services, clients = make_dataset(args.services)
+    _fake_db.seed(services, clients)
+    active = [s for s in services if s["status"] == "active"]
+    await client_directory.load_all()
+    await search_index.load(client_directory)
+
+    fake_rt = FakeRealtime()
+    feed = ChangeFeed(url=await fake_rt.start(), initial_delay=0.05, max_delay=0.5)
+    feed.start()
+    await wait_until(lambda: feed.connected)
+
+    # 1. UPDATE HostingServices -> search index
+    latencies = []
+    for i in range(args.events):
+        row = dict(active[i], domain=f"ubah{i}.com")
+        t0 = time.perf_counter()
+        await fake_rt.emit("HostingServices", "UPDATE", row, {"id": row["id"]})
+        svc_id = str(row["id"])
+        await wait_until(lambda: search_index.services[svc_id].domain == row["domain"], interval=0)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    assert search_index.search("ubah1")
+    print(f"UPDATE layanan  : {args.events} event, p50 {percentile(latencies, 0.5):.2f} ms, "
+          f"p99 {percentile(latencies, 0.99):.2f} ms")
+
+    # 2. UPDATE HostingClients -> client directory & index nama klien
+    client = clients[0]
+    await fake_rt.emit("HostingClients", "UPDATE", {**client, "username": "namabaru"}, {"user_id": client["user_id"]})
+    await wait_until(lambda: client_directory.get(client["user_id"]).username == "namabaru")
+    assert search_index.search("namabaru")
+    print("UPDATE klien    : client directory & search index terbarui")
+
+    # 3. DELETE (old_record hanya primary key)
+    await fake_rt.emit("HostingServices", "DELETE", None, {"id": active[0]["id"]})
+    await wait_until(lambda: str(active[0]["id"]) not in search_index.services)
+    print("DELETE layanan  : keluar dari search index")
+
+    # 4. Putus -> perubahan terlewat -> reconnect + resync
+    fake_rt.paused = True
+    await fake_rt.drop_connections()
+    await wait_until(lambda: not feed.connected)
+    t_drop = time.perf_counter()
+    missed_id = active[1]["id"]
+    await run_query(supabase.table("HostingServices").update({"domain": "terlewat.com"}).eq("id", missed_id))
+    await asyncio.sleep(0.3)
+    fake_rt.paused = False
+    await wait_until(lambda: feed.resyncs == 1)
+    elapsed = time.perf_counter() - t_drop
+    assert search_index.services[str(missed_id)].domain == "terlewat.com"
+    assert client_directory.live
+    print(f"reconnect+resync: perubahan selama putus terlihat {elapsed:.2f} detik setelah putus "
+          f"({fake_rt.joins} join total)")
+
+    await feed.stop()
+    await fake_rt.stop()
+    _fake_db.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+# 📍 File: bench/bench_cli.py
+#
+# Ukur cli.py terhadap FakeSupabase: import CSV besar (validasi + insert per
+# batch), penolakan baris tidak valid tanpa menulis apa pun, lalu export
+# CSV & JSONL lewat generator keyset (waktu + puncak memori tracemalloc,
+# harus tetap kecil berapa pun jumlah barisnya) dan round trip hasil export.
+# Jalankan dari root repo:  python -m bench.bench_cli --services 100000
+
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bench.run_suite import _fake as _fake_db, make_dataset
+from cli import export_services, import_services
+from lib.validators import SERVICE_FIELDS
+
+
+def write_csv(path, services, extra=()):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SERVICE_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(services)
+        writer.writerows(extra)
+
+
+def count_lines(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=100000)
+    parser.add_argument("--latency", type=float, default=0.002, help="round trip Supabase tersimulasi (detik)")
+    args = parser.parse_args()
+
+    # Klien sudah ada (sudah /start); layanan masuk lewat import
+    services, clients = make_dataset(args.services)
+    _fake_db.seed([], clients)
+    _fake_db.latency = args.latency
+    workdir = tempfile.mkdtemp(prefix="hmb-cli-")
+    source = os.path.join(workdir, "import.csv")
+    write_csv(source, services)
+    print(f"{args.services} layanan, {len(clients)} klien, latensi {args.latency * 1000:.0f} ms")
+
+    # File dengan baris rusak: ditolak seluruhnya, tidak ada yang tertulis
+    broken = os.path.join(workdir, "broken.csv")
+    bad = [
+        {**services[0], "tanggal_sewa": "01-12-2025"},
+        {**services[1], "price_sell": "150.000,00"},
+        {**services[2], "client_user_id": 999999},
+        {**services[3], "service_type": "dedicated"},
+    ]
+    write_csv(broken, services[:100], bad)
+    summary = await import_services(broken)
+    assert summary == {"valid": 100, "invalid": 4, "inserted": 0}, summary
+    assert _fake_db.requests.get("POST HostingServices", 0) == 0
+    print("  file dengan 4 baris rusak      : ditolak, 0 ditulis")
+
+    t0 = time.perf_counter()
+    summary = await import_services(source)
+    elapsed = time.perf_counter() - t0
+    assert summary == {"valid": args.services, "invalid": 0, "inserted": args.services}, summary
+    print(f"  import CSV                     : {summary['inserted']} layanan dalam {elapsed:.1f} detik "
+          f"({_fake_db.requests['POST HostingServices']} request insert)")
+
+    for ext in ("csv", "jsonl"):
+        out = os.path.join(workdir, f"export.{ext}")
+        t0 = time.perf_counter()
+        count = await export_services(out)
+        elapsed = time.perf_counter() - t0
+        assert count == args.services and count_lines(out) == count + (ext == "csv"), (count, count_lines(out))
+        # Putaran kedua dengan tracemalloc (memperlambat, jadi tidak ikut diukur waktunya)
+        tracemalloc.start()
+        await export_services(out)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Yang ditahan hanya halaman aktif + halaman berikutnya, bukan seluruh tabel
+        assert peak < 32e6, peak
+        print(f"  export {ext:5}                   : {count} baris dalam {elapsed:.1f} detik, "
+              f"{os.path.getsize(out) / 1e6:.1f} MB, puncak memori {peak / 1e6:.1f} MB")
+
+    # Hasil export bisa di-import ulang (kolom tambahan diabaikan)
+    summary = await import_services(os.path.join(workdir, "export.csv"), dry_run=True)
+    assert summary["valid"] == args.services and not summary["invalid"], summary
+    print(f"  round trip export -> import    : {summary['valid']} baris valid (dry run)")
+    _fake_db.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
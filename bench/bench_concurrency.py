@@ -0,0 +1,141 @@
+# 📍 File: bench/bench_concurrency.py
+#
+# Stress test pemrosesan update: serial (default PTB) vs paralel tanpa urutan
+# per chat vs ChatSerializedUpdateProcessor. Banyak user menjalankan
+# ConversationHandler 4 langkah sambil satu admin memanggil perintah lambat
+# (seperti /listhosting). Diukur updates/detik, latensi update klien, dan
+# jumlah percakapan yang rusak (langkah hilang / temp_data tidak urut).
+# Jalankan dari root repo:  python -m bench.bench_concurrency --users 200
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ADMIN_IDS", "1")
+
+from telegram import Update  # noqa: E402
+from telegram.ext import (  # noqa: E402
+    ApplicationBuilder, CommandHandler, ConversationHandler, MessageHandler, SimpleUpdateProcessor, filters,
+)
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from lib.session_store import SessionStore  # noqa: E402
+from lib.update_processor import ChatSerializedUpdateProcessor  # noqa: E402
+
+STEP_1, STEP_2, STEP_3 = range(3)
+ADMIN_ID = 1
+STEPS = ["/begin", "rumahweb", "example.com", "hosting"]
+temp_data = SessionStore("bench_concurrency", max_entries=100_000, max_bytes=1 << 30)
+
+
+def build_app(processor, api_latency):
+    builder = ApplicationBuilder().token("123:fake").request(FakeBotRequest(latency=api_latency)) \
+        .get_updates_request(FakeBotRequest(latency=0))
+    if processor is not None:
+        builder = builder.concurrent_updates(processor)
+    app = builder.build()
+    results = {"ok": 0, "corrupt": 0, "finished": []}
+
+    async def begin(update, context):
+        temp_data[update.effective_user.id] = {"steps": [0]}
+        await update.message.reply_text("Provider?")
+        return STEP_1
+
+    def step(n, next_state):
+        async def handler(update, context):
+            data = temp_data.get(update.effective_user.id)
+            if data is None:
+                results["corrupt"] += 1
+                return ConversationHandler.END
+            data["steps"].append(n)
+            data[f"field_{n}"] = update.message.text
+            await update.message.reply_text(f"Langkah {n} disimpan")
+            if next_state is not None:
+                return next_state
+            results["finished"].append(time.perf_counter())
+            if data["steps"] == [0, 1, 2, 3] and data["field_1"] == STEPS[1]:
+                results["ok"] += 1
+            else:
+                results["corrupt"] += 1
+            temp_data.pop(update.effective_user.id, None)
+            return ConversationHandler.END
+        return handler
+
+    async def slow(update, context):
+        # Simulasi /listhosting admin yang berat
+        await asyncio.sleep(0.5)
+        await update.message.reply_text("Daftar hosting")
+
+    text = filters.TEXT & ~filters.COMMAND
+    app.add_handler(ConversationHandler(
+        entry_points=[CommandHandler("begin", begin)],
+        states={
+            STEP_1: [MessageHandler(text, step(1, STEP_2))],
+            STEP_2: [MessageHandler(text, step(2, STEP_3))],
+            STEP_3: [MessageHandler(text, step(3, None))],
+        },
+        fallbacks=[],
+    ))
+    app.add_handler(CommandHandler("slow", slow))
+    return app, results
+
+
+def make_update(app, update_id, uid, text):
+    message = {
+        "message_id": update_id, "date": int(time.time()), "text": text,
+        "chat": {"id": uid, "type": "private"},
+        "from": {"id": uid, "is_bot": False, "first_name": f"user{uid}"},
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+    return Update.de_json({"update_id": update_id, "message": message}, app.bot)
+
+
+async def run(label, processor, users, api_latency):
+    temp_data.clear()
+    app, results = build_app(processor, api_latency)
+    await app.initialize()
+    await app.start()
+
+    # Setiap user mengirim 4 langkahnya berturut-turut; admin menyelipkan /slow
+    updates = []
+    update_id = 0
+    for uid in range(2, users + 2):
+        for text in STEPS:
+            update_id += 1
+            updates.append(make_update(app, update_id, uid, text))
+        if uid % 20 == 0:
+            update_id += 1
+            updates.append(make_update(app, update_id, ADMIN_ID, "/slow"))
+
+    t0 = time.perf_counter()
+    for update in updates:
+        await app.update_queue.put(update)
+    await app.update_queue.join()
+    await app.stop()
+    elapsed = time.perf_counter() - t0
+    await app.shutdown()
+
+    finished = sorted(t - t0 for t in results["finished"])
+    p99 = f"{finished[min(len(finished) - 1, int(len(finished) * 0.99))]:.2f}s" if finished else "-"
+    print(
+        f"{label:<22}: {len(updates)} update dalam {elapsed:.2f}s ({len(updates) / elapsed:.0f} upd/s), "
+        f"p99 percakapan klien selesai {p99}, "
+        f"percakapan ok {results['ok']}/{users}, rusak/hilang {users - results['ok']}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--api-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    await run("serial (default)", None, args.users, args.api_latency)
+    await run("paralel tanpa urutan", SimpleUpdateProcessor(args.concurrency), args.users, args.api_latency)
+    await run("paralel per-chat", ChatSerializedUpdateProcessor(args.concurrency), args.users, args.api_latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+# 📍 File: bench/bench_due_dates.py
+#
+# lib.due_dates (NumPy datetime64) dibanding kode per-baris lama di
+# /infohosting, list hosting, dan reminder planner (strptime/relativedelta
+# per baris). Kode lama disalin apa adanya di bawah sebagai pembanding.
+# Jalankan dari root repo:  python -m bench.bench_due_dates --rows 100000
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+
+import numpy as np
+
+from lib.due_dates import classify, classify_columns, parse_dates
+
+
+def make_rows(n, today, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        approved = rng.random() < 0.3
+        rows.append({
+            "id": i + 1,
+            "tanggal_sewa": (today - timedelta(days=rng.randint(0, 365))).isoformat(),
+            "expired_date": (today + timedelta(days=rng.randint(-30, 60))).isoformat(),
+            "approved_date": (today - timedelta(days=rng.randint(0, 40))).isoformat() if approved else None,
+            "payment_status": "approved" if approved else rng.choice(["pending", "rejected"]),
+        })
+    return rows
+
+
+# ---------- kode lama (per baris) ----------
+def legacy_info_hosting(rows, today):
+    out = []
+    for data in rows:
+        tanggal_sewa = datetime.strptime(data["tanggal_sewa"], "%Y-%m-%d").date()
+        if data.get("payment_status") == "approved":
+            display_expired = tanggal_sewa + relativedelta(months=1)
+            status = "paid"
+        else:
+            display_expired = tanggal_sewa
+            delta_days = (display_expired - today).days
+            status = "expired" if delta_days < 0 else "due_soon" if delta_days <= 3 else "active"
+        out.append((display_expired, (display_expired - today).days, status))
+    return out
+
+
+def legacy_list_hosting(rows, today):
+    out = []
+    for item in rows:
+        display_expired = datetime.strptime(item["expired_date"], "%Y-%m-%d").date()
+        delta_days = (display_expired - today).days
+        if item.get("payment_status") == "approved":
+            status = "paid"
+        else:
+            status = "expired" if delta_days < 0 else "due_soon" if delta_days <= 3 else "active"
+        out.append((display_expired, delta_days, status))
+    return out
+
+
+def legacy_reminder(rows, today):
+    out = []
+    for svc in rows:
+        if svc.get("approved_date"):
+            display_expired = date.fromisoformat(svc["approved_date"]) + relativedelta(months=1)
+        else:
+            display_expired = date.fromisoformat(svc["expired_date"])
+        out.append((display_expired, (display_expired - today).days))
+    return out
+
+
+def best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    today = date.today()
+    rows = make_rows(args.rows, today)
+
+    # Sanity check: engine == aturan reminder lama (aturan kanonik)
+    dates = classify(rows, today)
+    for i, (expected, days_left) in enumerate(legacy_reminder(rows[:1000], today)):
+        assert dates.row(i)[:2] == (expected, days_left), (rows[i], dates.row(i))
+
+    columns = (
+        parse_dates([r["approved_date"] for r in rows]),
+        parse_dates([r["expired_date"] for r in rows]),
+        parse_dates([r["tanggal_sewa"] for r in rows]),
+        np.array([r["payment_status"] == "approved" for r in rows]),
+    )
+
+    results = {
+        "legacy info_hosting": best_of(lambda: legacy_info_hosting(rows, today), args.rounds),
+        "legacy list_hosting": best_of(lambda: legacy_list_hosting(rows, today), args.rounds),
+        "legacy reminder": best_of(lambda: legacy_reminder(rows, today), args.rounds),
+        "classify(rows)": best_of(lambda: classify(rows, today), args.rounds),
+        "classify_columns": best_of(lambda: classify_columns(*columns, today=today), args.rounds),
+    }
+    baseline = results["classify(rows)"]
+    print(f"{args.rows} baris")
+    for name, ms in results.items():
+        print(f"  {name:22s} {ms:9.2f} ms  ({ms / baseline:5.1f}x classify)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# 📍 File: bench/bench_local_replica.py
+#
+# Uji & ukur database.local_replica terhadap FakeSupabase: sync awal,
+# latensi jalur baca admin (Supabase vs replica, hasil harus sama), sync
+# inkremental pada watermark updated_at, dan cek konsistensi hash
+# (baris dihapus di sumber + baris replica yang rusak), serta write-through
+# yang diantre ke thread penulis (waktu di event loop vs sampai diterapkan).
+# Data tambahan berhuruf besar/kecil campuran, `_` di nama, dan layanan tanpa
+# expired_date memeriksa urutan, pencarian awalan, dan filter bulan replica
+# sama persis dengan jalur PostgREST.
+# Jalankan dari root repo:  python -m bench.bench_local_replica --services 100000 --latency 0.02
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# run_suite menyalakan FakeSupabase & mengisi env sebelum modul bot di-import
+from bench.run_suite import _fake as _fake_db, make_dataset
+from database.local_replica import local_replica
+from database.supabase_client import supabase, run_query
+from handlers.add_hosting import _client_buttons, _fetch_clients
+import handlers.admin_menu  # noqa: F401  (urutan import seperti main.py; admin_menu <-> delete_hosting saling import)
+from handlers.delete_hosting import hosting_picker as delete_picker
+from handlers.edit_hosting import hosting_picker as edit_picker
+from handlers.list_hosting import fetch_month_buckets, fetch_page
+
+
+def mixed_rows(services, clients):
+    """Baris yang membedakan collation/LIKE: huruf besar-kecil, `_` (wildcard LIKE), expired_date kosong."""
+    next_id, next_user = len(services) + 1, clients[-1]["user_id"] + 1
+    template = services[0]
+    domains = ["Beta_x.com", "betaYx.com", "beta_z.com", "BETA.com", "alpha.com", "Alpha-b.com", "beta.net"]
+    extra_services = [
+        {**template, "id": next_id + i, "domain": d, "status": "active",
+         "provider": "Rumah_Web" if i % 2 else "rumahweb"}
+        for i, d in enumerate(domains)
+    ]
+    # Tanpa expired_date: masuk bucket & filter bulan lewat tanggal_sewa
+    extra_services[-1].update(expired_date=None, approved_date=None, payment_status="pending")
+    names = ["Budi_x", "budiAx", "budi santoso", "BUDI", "Ani", "ani_b"]
+    extra_clients = [
+        {"user_id": next_user + i, "username": n.lower(), "full_name": n} for i, n in enumerate(names)
+    ]
+    return extra_services, extra_clients
+
+
+def read_paths(month, after, undated_month):
+    return {
+        "list: bucket bulan": fetch_month_buckets,
+        "list: halaman 1 + count": lambda: fetch_page(None, None, with_count=True),
+        "list: filter bulan": lambda: fetch_page(month, None, with_count=True),
+        "list: halaman berikut": lambda: fetch_page(month, after),
+        "edit: picker (+nama klien)": lambda: edit_picker.fetch_page("", 0, 9),
+        "delete: picker cari 'site12'": lambda: delete_picker.fetch_page("site12", 0, 9),
+        "add: picker klien + tanda ✅": lambda: _fetch_clients("", 0, 9),
+        "list: bulan tanpa expired_date": lambda: fetch_page(undated_month, None, with_count=True),
+        "edit: picker cari 'BETA'": lambda: edit_picker.fetch_page("BETA", 0, 9),
+        "delete: picker cari 'beta_'": lambda: delete_picker.fetch_page("beta_", 0, 9),
+        "delete: picker cari 'rumah_'": lambda: delete_picker.fetch_page("rumah_", 0, 9),
+        "add: picker cari 'budi'": lambda: _fetch_clients("budi", 0, 9),
+        "add: picker cari 'Budi_'": lambda: _fetch_clients("Budi_", 0, 9),
+        "add: picker cari 'ani_'": lambda: _fetch_clients("ani_", 0, 9),
+    }
+
+
+async def best_ms(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def normalize(result):
+    """Hasil jalur baca dalam bentuk yang bisa dibandingkan (urutan id / bucket)."""
+    if isinstance(result, tuple):
+        rows, count = result
+        return [r["id"] for r in rows], count
+    if result and isinstance(result[0], dict):
+        key = "id" if "id" in result[0] else "user_id"
+        return [(r[key], (r.get("HostingClients") or {}).get("full_name")) for r in result]
+    return [tuple(b) for b in result]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.02, help="round trip Supabase tersimulasi (detik)")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    services, clients = make_dataset(args.services)
+    extra_services, extra_clients = mixed_rows(services, clients)
+    _fake_db.seed(services + extra_services, clients + extra_clients)
+    local_replica.path = os.path.join(tempfile.mkdtemp(prefix="hmb-replica-"), "replica.sqlite3")
+    local_replica.enabled = True
+    # Semua baris bench berubah dalam 10 detik terakhir; tanpa ini sync inkremental menarik ulang semuanya
+    local_replica.overlap = 0
+
+    t0 = time.perf_counter()
+    loaded = await local_replica.sync()
+    print(f"{args.services} layanan, {len(clients)} klien "
+          f"(+ {len(extra_services)} layanan/{len(extra_clients)} klien campuran)")
+    print(f"  sync awal            : {loaded} baris dalam {time.perf_counter() - t0:.2f} detik")
+
+    month = (await fetch_month_buckets())[1][0]
+    rows, _ = await fetch_page(month, None)
+    after = (rows[4]["expired_date"], rows[4]["id"])
+    undated_month = extra_services[-1]["tanggal_sewa"][:7]
+    paths = read_paths(month, after, undated_month)
+
+    _fake_db.latency = args.latency
+    print(f"  {'jalur baca':30} {'supabase':>10} {'replica':>10}")
+    for name, fn in paths.items():
+        local_replica.ready = False
+        remote = await fn()
+        remote_ms = await best_ms(fn, max(1, args.rounds // 10))
+        local_replica.ready = True
+        local = await fn()
+        local_ms = await best_ms(fn, args.rounds)
+        assert normalize(remote) == normalize(local), (name, normalize(remote), normalize(local))
+        print(f"  {name:30} {remote_ms:8.2f}ms {local_ms:8.3f}ms")
+
+    # Tanda ✅ picker klien: satu query IN ke Supabase vs lookup replica
+    users = await _fetch_clients("", 0, 9)
+    local_replica.ready = False
+    remote = await _client_buttons(users)
+    local_replica.ready = True
+    assert remote == await _client_buttons(users)
+    _fake_db.latency = 0
+
+    # Sync inkremental: hanya baris yang berubah sejak watermark
+    ids = [s["id"] for s in services[:100]]
+    await asyncio.sleep(0.01)
+    await run_query(supabase.table("HostingServices").update({"provider": "baru"}).in_("id", ids))
+    t0 = time.perf_counter()
+    changed = await local_replica.sync()
+    assert changed == len(ids), changed
+    assert local_replica.service(ids[0])["provider"] == "baru"
+    print(f"  sync inkremental     : {changed} baris berubah dalam {(time.perf_counter() - t0) * 1000:.1f} ms")
+    assert await local_replica.sync() == 0
+
+    # Cek konsistensi: DELETE di sumber (tidak terlihat oleh watermark) + baris replica rusak
+    await run_query(supabase.table("HostingServices").delete().eq("id", ids[1]))
+    with local_replica._writer:
+        local_replica._writer.execute("UPDATE services SET domain = 'rusak.com' WHERE id = ?", (ids[2],))
+    t0 = time.perf_counter()
+    report = await local_replica.verify()
+    elapsed = time.perf_counter() - t0
+    assert report["HostingServices"]["extra"] == 1 and report["HostingServices"]["mismatched"] == 1, report
+    assert local_replica.service(ids[1]) is None
+    assert local_replica.service(ids[2])["domain"] == services[2]["domain"]
+    report = await local_replica.verify()
+    assert not any(r["missing"] + r["extra"] + r["mismatched"] for r in report.values()), report
+    print(f"  cek konsistensi      : {report['HostingServices']['checked']} layanan dalam {elapsed:.2f} detik, "
+          f"selisih diperbaiki")
+
+    # Write-through: event loop hanya mengantre, commit SQLite di thread penulis (urutan tetap)
+    n = len(ids)
+    t0 = time.perf_counter()
+    for i, svc_id in enumerate(ids * 10):
+        local_replica.patch_service(svc_id, {"provider": f"p{i // n}", "domain": f"d{i // n}.com"})
+    queued = time.perf_counter() - t0
+    await local_replica.flush()
+    applied = time.perf_counter() - t0
+    assert all(local_replica.service(svc_id)["provider"] == "p9" for svc_id in ids if svc_id != ids[1])
+    print(f"  write-through        : {n * 10} patch, {queued * 1000:.1f} ms di event loop, "
+          f"diterapkan dalam {applied * 1000:.1f} ms")
+
+    local_replica.close()
+    _fake_db.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
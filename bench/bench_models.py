@@ -0,0 +1,113 @@
+# 📍 File: bench/bench_models.py
+#
+# Memori dan biaya parse database.models.HostingService dibanding dict
+# PostgREST mentah untuk N baris yang di-cache. "Konsumsi" = membaca tanggal
+# & harga seperti yang dilakukan handler; dict harus parse ulang setiap kali,
+# model sudah di-parse sekali saat dimuat.
+# Jalankan dari root repo:  python -m bench.bench_models --rows 100000
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from database.models import HostingClient, HostingService
+
+
+def make_rows(n, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(n):
+        approved = rng.random() < 0.3
+        rows.append({
+            "id": i + 1,
+            "client_user_id": 1000 + rng.randrange(max(1, n // 5)),
+            "provider": rng.choice(["rumahweb", "niagahoster", "hostinger"]),
+            "domain": f"site{i}.com",
+            "service_type": "hosting",
+            "tanggal_sewa": (today - timedelta(days=rng.randint(0, 365))).isoformat(),
+            "expired_date": (today + timedelta(days=rng.randint(-30, 60))).isoformat(),
+            "approved_date": (today - timedelta(days=rng.randint(0, 40))).isoformat() if approved else None,
+            "price_buy": 100000.0,
+            "price_sell": 150000.0,
+            "status": "active",
+            "payment_status": "approved" if approved else "pending",
+            "waiting_payment_proof": not approved,
+            "payment_proof_url": None,
+        })
+    return rows
+
+
+def measure_memory(build):
+    """Byte yang dialokasikan build() dan masih hidup setelahnya."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def consume_dicts(rows, today):
+    total = 0
+    for r in rows:
+        expired = date.fromisoformat(r["expired_date"])
+        total += (expired - today).days + int(r["price_sell"])
+    return total
+
+
+def consume_models(services, today):
+    total = 0
+    for s in services:
+        total += (s.expired_date - today).days + s.price_sell
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    # Payload JSON seperti dari PostgREST: setiap bentuk di-load dari sini supaya
+    # string-nya tidak berbagi objek dengan data sumber
+    payload = json.dumps(make_rows(args.rows))
+    clients_payload = json.dumps([
+        {"user_id": i, "username": f"user{i}", "full_name": f"Klien {i}"} for i in range(args.rows)
+    ])
+
+    rows, dict_bytes = measure_memory(lambda: json.loads(payload))
+    services, model_bytes = measure_memory(lambda: HostingService.from_rows(json.loads(payload)))
+    client_rows, client_dict_bytes = measure_memory(lambda: json.loads(clients_payload))
+    clients, client_model_bytes = measure_memory(
+        lambda: [HostingClient.from_row(c) for c in json.loads(clients_payload)]
+    )
+
+    today = date.today()
+    print(f"{args.rows} baris")
+    print(f"  memori HostingServices : dict {dict_bytes / 2**20:7.1f} MiB ({dict_bytes / args.rows:5.0f} B/baris), "
+          f"model {model_bytes / 2**20:7.1f} MiB ({model_bytes / args.rows:5.0f} B/baris)")
+    print(f"  memori HostingClients  : dict {client_dict_bytes / 2**20:7.1f} MiB, "
+          f"model {client_model_bytes / 2**20:7.1f} MiB")
+    print(f"  parse sekali (from_rows)       : {best_of(lambda: HostingService.from_rows(rows), args.rounds):8.1f} ms")
+    print(f"  konsumsi dict (parse per akses): {best_of(lambda: consume_dicts(rows, today), args.rounds):8.1f} ms")
+    print(f"  konsumsi model                 : {best_of(lambda: consume_models(services, today), args.rounds):8.1f} ms")
+    assert consume_dicts(rows, today) == consume_models(services, today)
+    del client_rows, clients
+
+
+if __name__ == "__main__":
+    main()
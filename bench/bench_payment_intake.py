@@ -0,0 +1,163 @@
+# 📍 File: bench/bench_payment_intake.py
+#
+# Uji lib.payment_intake terhadap FakeSupabase & FakeBotRequest: foto yang
+# sama dikirim berulang, album, klien dengan dua layanan menunggu bukti
+# (pilih lewat tombol / domain di caption). Dicetak jumlah notifikasi admin
+# & penulisan DB per skenario, plus waktu handler (tanpa menunggu network).
+# Jalankan dari root repo:  python -m bench.bench_payment_intake
+
+import asyncio
+import os
+import time
+
+# Tiga admin supaya jumlah notifikasi per pembayaran terlihat jelas
+os.environ["ADMIN_IDS"] = "1,2,3"
+
+from bench.run_suite import _fake as _fake_db, make_dataset  # noqa: E402
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from telegram import Update  # noqa: E402
+from telegram.ext import ApplicationBuilder  # noqa: E402
+from config import ADMIN_IDS  # noqa: E402
+from database.supabase_client import supabase, run_query  # noqa: E402
+from handlers.payment_reminder import get_payment_proof_handler, get_proof_choice_handler  # noqa: E402
+from lib.payment_intake import payment_intake  # noqa: E402
+
+_update_id = 0
+
+
+def _next_id():
+    global _update_id
+    _update_id += 1
+    return _update_id
+
+
+def photo_update(app, uid, unique_id, media_group_id=None, caption=None):
+    update_id = _next_id()
+    message = {
+        "message_id": update_id, "date": int(time.time()),
+        "chat": {"id": uid, "type": "private"},
+        "from": {"id": uid, "is_bot": False, "first_name": f"user{uid}"},
+        "photo": [
+            {"file_id": f"small-{unique_id}", "file_unique_id": f"s-{unique_id}", "width": 90, "height": 90},
+            {"file_id": f"file-{unique_id}-{update_id}", "file_unique_id": unique_id, "width": 1280, "height": 720},
+        ],
+    }
+    if media_group_id:
+        message["media_group_id"] = media_group_id
+    if caption:
+        message["caption"] = caption
+    return Update.de_json({"update_id": update_id, "message": message}, app.bot)
+
+
+def callback_update(app, uid, data):
+    update_id = _next_id()
+    return Update.de_json({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id), "from": {"id": uid, "is_bot": False, "first_name": f"user{uid}"},
+            "chat_instance": "bench", "data": data,
+            "message": {"message_id": 1, "date": int(time.time()), "text": "pilih", "chat": {"id": uid, "type": "private"}},
+        },
+    }, app.bot)
+
+
+async def settle():
+    """Tunggu album selesai ditampung dan antrean intake kosong."""
+    await asyncio.sleep(payment_intake.album_wait + 0.05)
+    await payment_intake._queue.join()
+
+
+def count(bot_request, since, endpoint, chats):
+    return sum(1 for _, e, chat in bot_request.calls[since:] if e == endpoint and int(chat) in chats)
+
+
+async def scenario(name, bot_request, fn, client_id):
+    since = len(bot_request.calls)
+    _fake_db.reset_counters()
+    handler_ms = await fn()
+    await settle()
+    admin_photos = count(bot_request, since, "sendPhoto", set(ADMIN_IDS))
+    admin_albums = count(bot_request, since, "sendMediaGroup", set(ADMIN_IDS))
+    client_msgs = count(bot_request, since, "sendMessage", {client_id})
+    writes = _fake_db.requests.get("PATCH HostingServices", 0)
+    print(f"  {name:38} admin sendPhoto {admin_photos}, sendMediaGroup {admin_albums}, "
+          f"pesan klien {client_msgs}, PATCH {writes}, handler {handler_ms:.2f} ms/foto")
+    return admin_photos, admin_albums, client_msgs, writes
+
+
+async def main():
+    services, clients = make_dataset(200)
+    for s in services:
+        s["waiting_payment_proof"] = 0
+    _fake_db.seed(services, clients)
+    by_client = {}
+    for s in services:
+        by_client.setdefault(s["client_user_id"], []).append(s)
+    single = next(uid for uid, rows in by_client.items() if len(rows) == 1)
+    double = next(uid for uid, rows in by_client.items() if len(rows) >= 2)
+    double_ids = [s["id"] for s in by_client[double][:2]]
+    await run_query(supabase.table("HostingServices").update({"waiting_payment_proof": True})
+                    .in_("id", [by_client[single][0]["id"], *double_ids]))
+
+    bot_request = FakeBotRequest(latency=0.005)
+    app = ApplicationBuilder().token("123:fake").request(bot_request) \
+        .get_updates_request(FakeBotRequest(latency=0)).build()
+    app.add_handler(get_payment_proof_handler())
+    app.add_handler(get_proof_choice_handler())
+    await app.initialize()
+    payment_intake.album_wait = 0.2
+
+    async def send(updates):
+        t0 = time.perf_counter()
+        for u in updates:
+            await app.process_update(u)
+        return (time.perf_counter() - t0) * 1000 / len(updates)
+
+    print(f"{len(ADMIN_IDS)} admin")
+    r = await scenario("screenshot sama dikirim 3x", bot_request,
+                       lambda: send([photo_update(app, single, "ss-1") for _ in range(3)]), single)
+    assert r[0] == len(ADMIN_IDS), r
+
+    r = await scenario("album 3 foto (1 duplikat di dalamnya)", bot_request, lambda: send([
+        photo_update(app, single, "al-1", "grp-1"), photo_update(app, single, "al-2", "grp-1"),
+        photo_update(app, single, "al-2", "grp-1"), photo_update(app, single, "al-3", "grp-1"),
+    ]), single)
+    assert r[0] == len(ADMIN_IDS) and r[1] == len(ADMIN_IDS), r
+
+    r = await scenario("screenshot lama dikirim ulang", bot_request,
+                       lambda: send([photo_update(app, single, "ss-1")]), single)
+    assert r[0] == 0 and r[3] == 0, r
+
+    # Semua admin gagal menerima: claim dilepas, screenshot yang sama bisa dikirim ulang
+    bot_request.blocked_chats = set(ADMIN_IDS)
+    r = await scenario("semua admin gagal menerima", bot_request,
+                       lambda: send([photo_update(app, single, "ss-lost")]), single)
+    assert r[0] == 0 and r[2] == 1, r
+    bot_request.blocked_chats = set()
+    r = await scenario("  -> dikirim ulang setelah admin pulih", bot_request,
+                       lambda: send([photo_update(app, single, "ss-lost")]), single)
+    assert r[0] == len(ADMIN_IDS), r
+
+    r = await scenario("2 layanan menunggu: tanya klien", bot_request,
+                       lambda: send([photo_update(app, double, "dbl-1")]), double)
+    assert r[0] == 0 and r[2] == 1, r
+    r = await scenario("  -> klien memilih layanan", bot_request,
+                       lambda: send([callback_update(app, double, f"proofsvc_{double_ids[1]}")]), double)
+    assert r[0] == len(ADMIN_IDS), r
+    chosen = await run_query(supabase.table("HostingServices").select("payment_proof_url").eq("id", double_ids[1]))
+    assert chosen.data[0]["payment_proof_url"].startswith("file-dbl-1"), chosen.data
+
+    domain = by_client[double][0]["domain"]
+    r = await scenario("2 layanan menunggu: domain di caption", bot_request,
+                       lambda: send([photo_update(app, double, "dbl-2", caption=f"bayar {domain} ya")]), double)
+    assert r[0] == len(ADMIN_IDS), r
+    named = await run_query(supabase.table("HostingServices").select("payment_proof_url").eq("id", double_ids[0]))
+    assert named.data[0]["payment_proof_url"].startswith("file-dbl-2"), named.data
+
+    await payment_intake.stop()
+    await app.shutdown()
+    _fake_db.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+# 📍 File: bench/bench_persistence.py
+#
+# Updates/detik dengan persistence SQLite (write-behind) aktif vs mati, plus
+# cek bahwa conversation & session benar-benar pulih setelah "restart".
+# Jalankan dari root repo:  python -m bench.bench_persistence --users 500
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("ADMIN_IDS", "1")
+
+from telegram import Update  # noqa: E402
+from telegram.ext import (  # noqa: E402
+    ApplicationBuilder, ConversationHandler, CommandHandler, MessageHandler, filters,
+)
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from database.sqlite_persistence import SQLitePersistence  # noqa: E402
+from lib.session_store import SessionStore  # noqa: E402
+
+STEP_1, STEP_2, STEP_3 = range(3)
+sessions = SessionStore("bench_persistence", max_entries=100_000, max_bytes=1 << 30)
+
+
+async def begin(update, context):
+    sessions[update.effective_user.id] = {"step": 0}
+    return STEP_1
+
+
+def _step(field, next_state):
+    async def handler(update, context):
+        sessions[update.effective_user.id][field] = update.message.text
+        return next_state
+    return handler
+
+
+def build_app(persistence):
+    builder = ApplicationBuilder().token("123:fake").request(FakeBotRequest(latency=0)) \
+        .get_updates_request(FakeBotRequest(latency=0))
+    if persistence:
+        builder = builder.persistence(persistence)
+    app = builder.build()
+    text = filters.TEXT & ~filters.COMMAND
+    app.add_handler(ConversationHandler(
+        entry_points=[CommandHandler("begin", begin)],
+        states={
+            STEP_1: [MessageHandler(text, _step("provider", STEP_2))],
+            STEP_2: [MessageHandler(text, _step("domain", STEP_3))],
+            STEP_3: [MessageHandler(text, _step("service_type", STEP_3))],
+        },
+        fallbacks=[],
+        name="bench_conv",
+        persistent=persistence is not None,
+    ))
+    return app
+
+
+def make_updates(app, users):
+    updates = []
+    update_id = 0
+    for step, text in enumerate(["/begin", "rumahweb", "example.com", "hosting"]):
+        for uid in range(1, users + 1):
+            update_id += 1
+            message = {
+                "message_id": update_id, "date": int(time.time()), "text": text,
+                "chat": {"id": uid, "type": "private"},
+                "from": {"id": uid, "is_bot": False, "first_name": f"user{uid}"},
+            }
+            if step == 0:
+                message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+            updates.append(Update.de_json({"update_id": update_id, "message": message}, app.bot))
+    return updates
+
+
+async def run(users, persistence):
+    app = build_app(persistence)
+    await app.initialize()
+    if persistence:
+        await persistence.start()
+    updates = make_updates(app, users)
+
+    t0 = time.perf_counter()
+    for update in updates:
+        await app.process_update(update)
+    processing = time.perf_counter() - t0
+
+    await app.update_persistence()
+    await app.shutdown()
+    total = time.perf_counter() - t0
+    return len(updates), processing, total
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    n, processing, total = await run(args.users, None)
+    print(f"persistence OFF: {n} update, {n / processing:.0f} upd/s (total {total:.2f}s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        sessions.clear()
+        n, processing, total = await run(args.users, SQLitePersistence(path, flush_interval=1))
+        print(f"persistence ON : {n} update, {n / processing:.0f} upd/s (total termasuk flush {total:.2f}s)")
+
+        # "Restart": store dikosongkan, lalu dipulihkan dari SQLite
+        sessions.clear()
+        restored = SQLitePersistence(path)
+        conversations = await restored.get_conversations("bench_conv")
+        restored.restore_sessions()
+        print(f"restore        : {len(conversations)} conversation, {len(sessions)} session")
+        await restored.flush()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
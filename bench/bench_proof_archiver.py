@@ -0,0 +1,166 @@
+# 📍 File: bench/bench_proof_archiver.py
+#
+# Uji lib.proof_archiver terhadap pengganti lokal Bot API (getFile + unduhan
+# file) dan Supabase Storage: foto besar di-stream per potongan (puncak
+# memori tracemalloc vs ukuran file), dedup isi (sha256) & file_unique_id,
+# thumbnail di process pool (lag event loop vs thumbnail di loop), foto
+# tertunda yang dilanjutkan saat start, dan kaitan foto -> layanan ->
+# objek + keputusan admin di tabel PaymentProofs.
+# Jalankan dari root repo:  python -m bench.bench_proof_archiver --photos 8
+
+import argparse
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+os.environ["PROOF_ARCHIVE_ENABLED"] = "true"
+
+from bench.run_suite import _fake as _fake_db  # noqa: E402
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from bench.fake_storage import FakeStorage, FakeTelegramFiles  # noqa: E402
+from PIL import Image  # noqa: E402
+from storage3 import SyncStorageClient  # noqa: E402
+from telegram import Bot  # noqa: E402
+from config import SUPABASE_KEY  # noqa: E402
+from database.proof_archive import proof_archive  # noqa: E402
+from database.supabase_client import supabase, run_query  # noqa: E402
+from lib.proof_archiver import make_thumbnail, proof_archiver  # noqa: E402
+
+
+def make_photo(path, width, height):
+    """JPEG berisi noise: hampir tidak terkompresi, jadi ukurannya mendekati foto asli."""
+    Image.frombytes("RGB", (width, height), os.urandom(width * height * 3)).save(path, "JPEG", quality=90)
+
+
+def sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(65536):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def archived(unique_id):
+    """Baris PaymentProofs untuk foto ini (kaitan yang tersimpan di Supabase)."""
+    result = await run_query(supabase.table("PaymentProofs").select("*").eq("file_unique_id", unique_id).single())
+    return result.data
+
+
+async def settle():
+    await proof_archiver._queue.join()
+    while proof_archiver._uploads:
+        await asyncio.sleep(0.01)
+
+
+async def loop_lag(stop, interval=0.005):
+    """Keterlambatan terbesar event loop selama archiver bekerja (detik)."""
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - t0 - interval)
+    return worst
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=8)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="hmb-proofs-")
+    files, storage = FakeTelegramFiles(), FakeStorage()
+    files_url, storage_url = files.start(), storage.start()
+    paths = {}
+    for i in range(args.photos):
+        paths[f"photo-{i}"] = path = os.path.join(workdir, f"photo-{i}.jpg")
+        make_photo(path, args.width, args.height)
+    # Screenshot yang sama dikirim ulang sebagai foto lain (file_unique_id beda, isi sama)
+    paths["photo-copy"] = os.path.join(workdir, "photo-copy.jpg")
+    shutil.copy(paths["photo-0"], paths["photo-copy"])
+    for file_id, path in paths.items():
+        files.add(file_id, path)
+    largest = max(os.path.getsize(p) for p in paths.values())
+    total = sum(os.path.getsize(p) for p in paths.values())
+
+    bot = Bot("123:fake", request=FakeBotRequest(latency=0.005), base_file_url=f"{files_url}/file/bot")
+    await bot.initialize()
+    proof_archiver.storage = SyncStorageClient(
+        f"{storage_url}/storage/v1", {"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"}
+    )
+    photo = lambda file_id: (file_id, f"u-{file_id}")  # noqa: E731
+
+    print(f"{len(paths)} foto, terbesar {largest / 1e6:.1f} MB, total {total / 1e6:.1f} MB, "
+          f"potongan {proof_archiver.chunk_size // 1024} KB")
+
+    # Diterima saat archiver belum jalan (mis. crash sebelum upload): dilanjutkan saat start
+    await proof_archiver.submit(100, 1, [photo("photo-0"), photo("photo-1")])
+    await proof_archiver.start(bot)
+    await settle()
+    assert not await proof_archive.pending()
+    print(f"  tertunda dilanjutkan saat start : 2 foto, {storage.uploads} objek diunggah")
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    rest = [photo(f"photo-{i}") for i in range(2, args.photos)]
+    for i, p in enumerate(rest):
+        await proof_archiver.submit(200 + i, 10 + i, [p])
+    await proof_archiver.submit(300, 2, [photo("photo-copy"), photo("photo-1")])
+    await settle()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop.set()
+    worst_lag = await lag
+
+    uniques = args.photos
+    assert storage.uploads == 2 * uniques, storage.uploads  # asli + thumbnail per isi unik
+    assert not await proof_archive.pending()
+    copy, original = await archived("u-photo-copy"), await archived("u-photo-0")
+    assert copy["path"] == original["path"]
+    # photo-1 dikirim ulang untuk layanan 2: kaitannya ikut pindah
+    assert (copy["service_id"], copy["user_id"]) == ("2", 300), copy
+    assert (await archived("u-photo-1"))["service_id"] == "2"
+    for file_id, path in paths.items():
+        row = await archived(f"u-{file_id}")
+        stored = storage.object_path(proof_archiver.bucket, row["path"])
+        assert sha256_of(stored) == sha256_of(path), file_id
+        assert row["sha256"] == sha256_of(path) and row["size"] == os.path.getsize(path), file_id
+        with Image.open(storage.object_path(proof_archiver.bucket, row["thumb_path"])) as img:
+            assert max(img.size) <= proof_archiver.thumb_size, img.size
+    # Puncak tergantung ukuran potongan & jumlah worker, bukan ukuran file (sama untuk foto 5 MB / 17 MB)
+    assert peak < 32 * proof_archiver.chunk_size, (peak, largest)
+
+    await proof_archiver.decide(2, "approved")
+    assert (await archived("u-photo-copy"))["decision"] == "approved"
+    assert (await archived("u-photo-0"))["decision"] is None
+
+    print(f"  {len(rest) + 1} foto baru (1 isi duplikat, 1 file_unique_id lama) dalam {elapsed:.2f} detik")
+    print(f"  objek di storage                : {storage.uploads} ({uniques} asli + {uniques} thumbnail), "
+          f"{storage.bytes_received / 1e6:.1f} MB")
+    print(f"  puncak memori Python (tracemalloc): {peak / 1e6:.2f} MB vs file terbesar {largest / 1e6:.1f} MB")
+    print(f"  lag event loop terburuk         : {worst_lag * 1000:.1f} ms (thumbnail di process pool)")
+
+    t0 = time.perf_counter()
+    make_thumbnail(paths["photo-0"], os.path.join(workdir, "thumb.jpg"), proof_archiver.thumb_size)
+    print(f"  pembanding: 1 thumbnail di event loop memblokir {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    await proof_archiver.stop()
+    await bot.shutdown()
+    files.stop()
+    storage.stop()
+    _fake_db.stop()
+    shutil.rmtree(workdir)
+    shutil.rmtree(storage.root)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+# 📍 File: bench/bench_run_query.py
+#
+# N query Supabase lambat sekaligus terhadap FakeSupabase: .execute() langsung
+# di event loop (cara lama) vs run_query (thread pool). Diukur total waktu,
+# lag event loop terburuk (ticker tiap 5 ms), dan jumlah tick selama query
+# berjalan: dengan run_query loop tetap responsif untuk update lain.
+# Jalankan dari root repo:  python -m bench.bench_run_query --queries 32 --latency 0.2
+
+import argparse
+import asyncio
+import math
+import time
+
+from bench.run_suite import _fake as _fake_db, make_dataset
+from config import DB_MAX_WORKERS
+from database.supabase_client import supabase, run_query
+
+TICK = 0.005
+
+
+def slow_query():
+    return supabase.table("HostingServices").select("id, domain, expired_date").eq("status", "active").limit(20)
+
+
+async def blocking(query):
+    # Cara lama: HTTP sinkron dijalankan di dalam coroutine
+    return query.execute()
+
+
+async def ticker(stop, stats):
+    """Hitung tick & keterlambatan terbesar event loop sampai stop di-set."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stats["ticks"] += 1
+        stats["worst_lag"] = max(stats["worst_lag"], time.perf_counter() - t0 - TICK)
+
+
+async def measure(runner, queries):
+    stop = asyncio.Event()
+    stats = {"ticks": 0, "worst_lag": 0.0}
+    tick_task = asyncio.create_task(ticker(stop, stats))
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(runner(slow_query()) for _ in range(queries)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await tick_task
+    assert all(r.data for r in results)
+    return elapsed, stats
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="round trip Supabase tersimulasi (detik)")
+    args = parser.parse_args()
+
+    services, clients = make_dataset(1000)
+    _fake_db.seed(services, clients)
+    _fake_db.latency = args.latency
+    # Pemanasan: koneksi HTTP & thread pool sudah siap sebelum diukur
+    await run_query(slow_query())
+    print(f"{args.queries} query bersamaan, latensi {args.latency * 1000:.0f} ms, DB_MAX_WORKERS={DB_MAX_WORKERS}")
+
+    old_elapsed, old = await measure(blocking, args.queries)
+    print(f"  execute() di event loop : {old_elapsed:.2f} detik, lag terburuk {old['worst_lag'] * 1000:.0f} ms, "
+          f"{old['ticks']} tick")
+
+    new_elapsed, new = await measure(run_query, args.queries)
+    print(f"  run_query (thread pool) : {new_elapsed:.2f} detik, lag terburuk {new['worst_lag'] * 1000:.0f} ms, "
+          f"{new['ticks']} tick")
+
+    # Query berjalan paralel sebanyak worker, dan loop tidak pernah tertahan selama satu round trip
+    expected = math.ceil(args.queries / DB_MAX_WORKERS) * args.latency
+    assert new_elapsed < expected + 0.5 * args.latency + 0.2, (new_elapsed, expected)
+    assert new["worst_lag"] < args.latency / 2, new["worst_lag"]
+    assert old["worst_lag"] >= args.latency * 0.9, old["worst_lag"]
+    print(f"  -> {old_elapsed / new_elapsed:.1f}x lebih cepat, event loop tetap berdetak "
+          f"({new['ticks'] / new_elapsed:.0f} tick/detik vs {old['ticks'] / old_elapsed:.1f})")
+    _fake_db.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+# 📍 File: bench/bench_search_index.py
+#
+# Waktu build SearchIndex dan latensi query (p50/p99) untuk data sintetis.
+# Jalankan dari root repo:  python -m bench.bench_search_index --services 100000
+
+import argparse
+import os
+import random
+import string
+import time
+
+os.environ.setdefault("ADMIN_IDS", "1")
+# lib.search_index meng-import client Supabase (dibuat saat import); bench ini tidak pernah query,
+# cukup nilai dummy yang lolos validasi seperti di bench/run_suite.py
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.bench")
+
+from database.models import HostingService  # noqa: E402
+from lib.search_index import SearchIndex  # noqa: E402
+
+PROVIDERS = ["rumahweb", "niagahoster", "hostinger", "idcloudhost", "dewaweb", "jagoanhosting", "domainesia"]
+TLDS = [".com", ".id", ".co.id", ".net", ".org", ".my.id", ".web.id"]
+WORDS = ["toko", "batik", "kopi", "sekolah", "klinik", "travel", "jaya", "makmur", "digital", "studio",
+         "sentosa", "abadi", "media", "tekno", "bakery", "furniture", "rental", "laundry", "cafe", "print"]
+
+
+def make_data(n_services, n_clients, seed=42):
+    rng = random.Random(seed)
+    clients = [
+        (uid, f"user{uid}", f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}")
+        for uid in range(1, n_clients + 1)
+    ]
+    services = []
+    for i in range(1, n_services + 1):
+        suffix = "".join(rng.choices(string.ascii_lowercase, k=3))
+        services.append({
+            "id": i,
+            "domain": f"{rng.choice(WORDS)}{rng.choice(WORDS)}{suffix}{rng.choice(TLDS)}",
+            "provider": rng.choice(PROVIDERS),
+            "service_type": "hosting",
+            "client_user_id": rng.randint(1, n_clients),
+            "expired_date": "2025-01-01",
+            "status": "active",
+        })
+    return services, clients
+
+
+def make_queries(services, rng):
+    queries = []
+    for _ in range(500):
+        domain = rng.choice(services)["domain"]
+        start = rng.randint(0, max(0, len(domain) - 4))
+        # Simulasi ketikan: 1..n huruf pertama dari potongan domain
+        fragment = domain[start:start + rng.randint(1, 8)]
+        queries.append(fragment)
+    queries += ["niaga", "rumah", "kopi", "toko.com", "sentosa", "user12", "batik jaya", "x", "zz", ".id"]
+    return queries
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    args = parser.parse_args()
+
+    services, clients = make_data(args.services, args.clients)
+    index = SearchIndex()
+
+    t0 = time.perf_counter()
+    index.build(HostingService.from_rows(services), clients)
+    print(f"build          : {len(services)} layanan, {len(clients)} klien dalam {time.perf_counter() - t0:.2f}s")
+
+    rng = random.Random(7)
+    queries = make_queries(services, rng)
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(
+        f"query          : {len(queries)} query, p50 {percentile(latencies, 0.5):.2f} ms, "
+        f"p99 {percentile(latencies, 0.99):.2f} ms, max {max(latencies):.2f} ms"
+    )
+
+    # Update incremental seperti yang dilakukan handler add/edit/delete
+    t0 = time.perf_counter()
+    for i in range(1, 1001):
+        index.patch_service(i, {"domain": f"baru{i}.com"})
+    for i in range(1001, 2001):
+        index.remove_service(i)
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"incremental    : 2000 patch/hapus, {elapsed / 2000:.3f} ms per operasi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# 📍 File: bench/bench_webhook.py
+#
+# Load test mode webhook vs polling: update sintetis dikirim dengan laju tetap,
+# diukur updates/detik dan latensi ujung-ke-ujung (dikirim -> handler selesai).
+# Webhook: POST ke WebhookServer lokal. Polling: getUpdates long-poll ke
+# FakeBotRequest dengan round trip `--rtt` (mensimulasikan api.telegram.org).
+# Jalankan dari root repo:  python -m bench.bench_webhook --updates 2000 --rate 500
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ADMIN_IDS", "1")
+
+import aiohttp  # noqa: E402
+from telegram.ext import ApplicationBuilder, MessageHandler, filters  # noqa: E402
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from lib.webhook_server import WebhookServer, SECRET_HEADER  # noqa: E402
+
+SECRET = "bench-secret"
+
+
+def make_update(update_id):
+    uid = update_id % 200 + 1
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": int(time.time()), "text": f"pesan {update_id}",
+            "chat": {"id": uid, "type": "private"},
+            "from": {"id": uid, "is_bot": False, "first_name": f"user{uid}"},
+        },
+    }
+
+
+def build_app(get_updates_request):
+    app = ApplicationBuilder().token("123:fake").request(FakeBotRequest(latency=0)) \
+        .get_updates_request(get_updates_request).build()
+    sent_at = {}
+    latencies = []
+
+    async def record(update, context):
+        latencies.append(time.perf_counter() - sent_at.pop(update.update_id))
+
+    app.add_handler(MessageHandler(filters.TEXT, record))
+    return app, sent_at, latencies
+
+
+async def paced(n, rate, send):
+    """Panggil send(i) untuk i=1..n dengan laju `rate` per detik (open loop)."""
+    start = time.perf_counter()
+    tasks = []
+    for i in range(1, n + 1):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(i)))
+    await asyncio.gather(*tasks)
+
+
+async def wait_done(latencies, n, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while len(latencies) < n and time.perf_counter() < deadline:
+        await asyncio.sleep(0.005)
+
+
+async def bench_webhook(n, rate, port):
+    app, sent_at, latencies = build_app(FakeBotRequest(latency=0))
+    server = WebhookServer(app, path="/telegram", secret_token=SECRET, host="127.0.0.1", port=port)
+    await app.initialize()
+    await app.start()
+    await server.start()
+    url = f"http://127.0.0.1:{port}/telegram"
+    rejected = 0
+
+    async with aiohttp.ClientSession() as session:
+        async def send(i):
+            nonlocal rejected
+            sent_at[i] = time.perf_counter()
+            async with session.post(url, json=make_update(i), headers={SECRET_HEADER: SECRET}) as resp:
+                if resp.status != 200:
+                    rejected += 1
+
+        t0 = time.perf_counter()
+        await paced(n, rate, send)
+        await wait_done(latencies, n)
+        elapsed = time.perf_counter() - t0
+
+        async with session.post(url, json=make_update(n + 1), headers={SECRET_HEADER: "salah"}) as resp:
+            bad_secret = resp.status
+        async with session.get(f"http://127.0.0.1:{port}/healthz") as resp:
+            health = resp.status
+
+    await server.drain()
+    await app.stop()
+    await server.stop()
+    await app.shutdown()
+    return elapsed, latencies, rejected, bad_secret, health
+
+
+async def bench_polling(n, rate, rtt):
+    fake = FakeBotRequest(latency=rtt)
+    app, sent_at, latencies = build_app(fake)
+    await app.initialize()
+    await app.updater.start_polling(poll_interval=0, timeout=10)
+    await app.start()
+
+    async def send(i):
+        sent_at[i] = time.perf_counter()
+        fake.push_update(make_update(i))
+
+    t0 = time.perf_counter()
+    await paced(n, rate, send)
+    await wait_done(latencies, n)
+    elapsed = time.perf_counter() - t0
+
+    await app.updater.stop()
+    await app.stop()
+    await app.shutdown()
+    return elapsed, latencies
+
+
+def summary(label, n, elapsed, latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return f"{label}: tidak ada update yang diproses"
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return (
+        f"{label}: {len(latencies)}/{n} update, {len(latencies) / elapsed:.0f} upd/s, "
+        f"p50 {p50:.1f} ms, p99 {p99:.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500, help="update per detik yang dikirim")
+    parser.add_argument("--rtt", type=float, default=0.05, help="round trip getUpdates (detik)")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    elapsed, latencies = await bench_polling(args.updates, args.rate, args.rtt)
+    print(summary(f"polling (rtt {args.rtt * 1000:.0f} ms)", args.updates, elapsed, latencies))
+
+    elapsed, latencies, rejected, bad_secret, health = await bench_webhook(args.updates, args.rate, args.port)
+    print(summary("webhook           ", args.updates, elapsed, latencies))
+    print(f"webhook ditolak   : {rejected}, secret salah -> HTTP {bad_secret}, /healthz -> HTTP {health}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
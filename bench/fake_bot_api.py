@@ -0,0 +1,133 @@
+# 📍 File: bench/fake_bot_api.py
+
+import asyncio
+import json
+import random
+import time
+from telegram.request import BaseRequest
+
+
+class FakeBotRequest(BaseRequest):
+    """Pengganti Bot API untuk benchmark: tidak ada network sama sekali.
+
+    Setiap panggilan ditunda `latency` detik (mensimulasikan round trip ke
+    api.telegram.org). Jika `flood_rate` diisi, request yang melebihi batas
+    global per detik dibalas 429 + retry_after seperti Telegram asli.
+    Update untuk mode polling dimasukkan lewat push_update() dan dibalas
+    oleh getUpdates dengan semantik long-poll. Chat di `blocked_chats`
+    dibalas 403 seperti bot yang diblokir user.
+    """
+
+    def __init__(self, latency=0.05, flood_rate=None, retry_after=1, jitter=0.0):
+        self.latency = latency
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.jitter = jitter
+        self.calls = []
+        self.flood_errors = 0
+        self.blocked_chats = set()
+        self._window = []
+        self._message_id = 0
+        self._updates = []
+        self._update_event = None
+
+    @property
+    def read_timeout(self):
+        return 5.0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def push_update(self, update):
+        """Antrekan dict update untuk dikirim lewat getUpdates berikutnya."""
+        self._updates.append(update)
+        if self._update_event is not None:
+            self._update_event.set()
+
+    async def _get_updates(self, params):
+        if self._update_event is None:
+            self._update_event = asyncio.Event()
+        if not self._updates:
+            self._update_event.clear()
+            try:
+                await asyncio.wait_for(self._update_event.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        limit = int(params.get("limit") or 100)
+        batch, self._updates = self._updates[:limit], self._updates[limit:]
+        # Balasan long-poll tetap butuh satu perjalanan jaringan
+        await asyncio.sleep(self.latency)
+        return batch
+
+    def _reply(self, result):
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+
+        if endpoint == "getUpdates":
+            return self._reply(await self._get_updates(params))
+
+        if self.flood_rate:
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 1]
+            if len(self._window) >= self.flood_rate:
+                self.flood_errors += 1
+                return 429, json.dumps({
+                    "ok": False, "error_code": 429,
+                    "description": "Too Many Requests",
+                    "parameters": {"retry_after": self.retry_after},
+                }).encode()
+            self._window.append(now)
+
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if params.get("chat_id") is not None and int(params["chat_id"]) in self.blocked_chats:
+            return 403, json.dumps({
+                "ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user",
+            }).encode()
+        self.calls.append((time.monotonic(), endpoint, params.get("chat_id")))
+
+        if endpoint == "getMe":
+            return self._reply({
+                "id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot",
+                "can_join_groups": False, "can_read_all_group_messages": False,
+                "supports_inline_queries": True,
+            })
+
+        if endpoint in ("sendMessage", "sendPhoto"):
+            self._message_id += 1
+            message = {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+            }
+            if endpoint == "sendMessage":
+                message["text"] = params.get("text", "")
+            else:
+                message["photo"] = [{"file_id": "fake", "file_unique_id": "fake", "width": 1, "height": 1}]
+            return self._reply(message)
+
+        if endpoint == "sendMediaGroup":
+            messages = []
+            for _ in params.get("media", []):
+                self._message_id += 1
+                messages.append({
+                    "message_id": self._message_id, "date": int(time.time()),
+                    "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+                    "photo": [{"file_id": "fake", "file_unique_id": "fake", "width": 1, "height": 1}],
+                })
+            return self._reply(messages)
+
+        if endpoint == "getFile":
+            # Unduhan file lewat base_file_url (bench/fake_storage.py FakeTelegramFiles)
+            file_id = params.get("file_id")
+            return self._reply({
+                "file_id": file_id, "file_unique_id": f"u-{file_id}", "file_path": f"photos/{file_id}.jpg",
+            })
+
+        return self._reply(True)
@@ -0,0 +1,110 @@
+# 📍 File: bench/fake_realtime.py
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+
+class FakeRealtime:
+    """Pengganti server Supabase Realtime (protokol Phoenix) untuk benchmark/uji lokal.
+
+    Menerima phx_join dengan konfigurasi postgres_changes, membalas heartbeat,
+    dan mengirim event lewat emit(). drop_connections() memutus semua klien
+    untuk menguji reconnect; selama `paused`, koneksi baru langsung ditolak.
+    """
+
+    def __init__(self):
+        self.url = None
+        self.paused = False
+        self.joins = 0
+        self._server = None
+        # websocket -> (topic, [(binding_id, table, event)])
+        self._subscribers = {}
+        self._next_binding = 0
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await serve(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        # AsyncRealtimeClient menambahkan /websocket sendiri
+        self.url = f"ws://{host}:{port}/realtime/v1"
+        return self.url
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws):
+        if self.paused:
+            await ws.close(code=1013, reason="paused")
+            return
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                event, topic, ref = msg["event"], msg["topic"], msg.get("ref")
+                if event == "heartbeat":
+                    await self._reply(ws, "phoenix", ref, {})
+                elif event == "phx_join":
+                    await self._join(ws, topic, ref, msg["payload"])
+                elif event == "phx_leave":
+                    self._subscribers.pop(ws, None)
+                    await self._reply(ws, topic, ref, {})
+                elif event == "access_token":
+                    pass
+        except ConnectionClosed:
+            pass
+        finally:
+            self._subscribers.pop(ws, None)
+
+    async def _join(self, ws, topic, ref, payload):
+        bindings = []
+        server_bindings = []
+        for change in payload["config"].get("postgres_changes", []):
+            self._next_binding += 1
+            bindings.append((self._next_binding, change["table"], change["events"]))
+            server_bindings.append({"id": self._next_binding, **change})
+        self._subscribers[ws] = (topic, bindings)
+        self.joins += 1
+        await self._reply(ws, topic, ref, {"postgres_changes": server_bindings})
+
+    @staticmethod
+    async def _reply(ws, topic, ref, response):
+        await ws.send(json.dumps({
+            "event": "phx_reply", "topic": topic, "ref": ref,
+            "payload": {"status": "ok", "response": response},
+        }))
+
+    async def emit(self, table, kind, record=None, old_record=None):
+        """Kirim satu event postgres_changes ke semua subscriber tabel ini."""
+        for ws, (topic, bindings) in list(self._subscribers.items()):
+            ids = [bid for bid, t, ev in bindings if t == table and ev in ("*", kind)]
+            if not ids:
+                continue
+            data = {
+                "schema": "public", "table": table, "type": kind, "errors": None, "columns": [],
+                "commit_timestamp": datetime.now(timezone.utc).isoformat(),
+                "record": record or {}, "old_record": old_record or {},
+            }
+            await ws.send(json.dumps({
+                "event": "postgres_changes", "topic": topic, "ref": None,
+                "payload": {"data": data, "ids": ids},
+            }))
+
+    async def drop_connections(self):
+        for ws in list(self._subscribers):
+            await ws.close(code=1011, reason="test drop")
+        self._subscribers.clear()
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+
+async def wait_until(predicate, timeout=10.0, interval=0.005):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise TimeoutError("kondisi tidak terpenuhi")
+        await asyncio.sleep(interval)
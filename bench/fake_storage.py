@@ -0,0 +1,162 @@
+# 📍 File: bench/fake_storage.py
+
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+_CHUNK = 65536
+
+
+class _Server:
+    """ThreadingHTTPServer di thread daemon; subclass mengisi handle(request)."""
+
+    def __init__(self):
+        self._server = None
+        self._lock = threading.Lock()
+        self.requests = {}
+
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                with fake._lock:
+                    key = f"{self.command} {urlsplit(self.path).path.split('/')[1]}"
+                    fake.requests[key] = fake.requests.get(key, 0) + 1
+                fake.handle(self)
+
+            do_GET = do_POST = do_PUT = do_HEAD = _handle
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @staticmethod
+    def reply_json(request, status, payload):
+        data = json.dumps(payload).encode()
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+class FakeTelegramFiles(_Server):
+    """Pengganti https://api.telegram.org/file/bot<token>/<file_path>.
+
+    FakeBotRequest menjawab getFile dengan file_path photos/<file_id>.jpg;
+    file yang didaftarkan lewat add() dikirim dari disk per potongan, sama
+    seperti server Telegram (Content-Length diketahui, body di-stream).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}
+        self.bytes_sent = 0
+
+    def add(self, file_id, path):
+        self.files[file_id] = path
+
+    def handle(self, request):
+        name = unquote(urlsplit(request.path).path.rsplit("/", 1)[-1])
+        path = self.files.get(name[:-len(".jpg")] if name.endswith(".jpg") else name)
+        if request.command != "GET" or path is None:
+            return self.reply_json(request, 404, {"ok": False, "error_code": 404, "description": "Not Found"})
+        request.send_response(200)
+        request.send_header("Content-Type", "application/octet-stream")
+        request.send_header("Content-Length", str(os.path.getsize(path)))
+        request.end_headers()
+        with open(path, "rb") as f:
+            while chunk := f.read(_CHUNK):
+                request.wfile.write(chunk)
+                with self._lock:
+                    self.bytes_sent += len(chunk)
+
+
+class FakeStorage(_Server):
+    """Pengganti Supabase Storage (/storage/v1/object/<bucket>/<path>) untuk storage3.
+
+    Upload multipart ditulis ke disk per potongan; objek yang sudah ada
+    ditolak 409 Duplicate kecuali x-upsert: true, seperti Storage asli.
+    """
+
+    def __init__(self, root=None):
+        super().__init__()
+        self.root = root or tempfile.mkdtemp(prefix="hmb-storage-")
+        self.uploads = 0
+        self.bytes_received = 0
+
+    def object_path(self, bucket, path):
+        return os.path.join(self.root, bucket, path)
+
+    def handle(self, request):
+        match = re.match(r"^/storage/v1/object/([^/]+)/(.+)$", urlsplit(request.path).path)
+        if not match:
+            return self.reply_json(request, 404, {"statusCode": "404", "error": "not_found", "message": "Not Found"})
+        bucket, path = match.group(1), unquote(match.group(2))
+        target = self.object_path(bucket, path)
+        if request.command in ("GET", "HEAD"):
+            exists = os.path.exists(target)
+            request.send_response(200 if exists else 400)
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        if os.path.exists(target) and request.headers.get("x-upsert") != "true":
+            # Storage asli menjawab HTTP 400 dengan statusCode "409" di body
+            return self.reply_json(request, 400, {
+                "statusCode": "409", "error": "Duplicate", "message": "The resource already exists",
+            })
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        boundary = re.search(r"boundary=(\S+)", request.headers["Content-Type"]).group(1).encode()
+        size = self._save_file_part(request.rfile, int(request.headers["Content-Length"]), boundary, target)
+        with self._lock:
+            self.uploads += 1
+            self.bytes_received += size
+        self.reply_json(request, 200, {"Key": f"{bucket}/{path}", "Id": path})
+
+    @staticmethod
+    def _save_file_part(rfile, length, boundary, target):
+        """Salin isi part `file` dari body multipart ke target tanpa menampung seluruh body."""
+        raw = f"{target}.part"
+        with open(raw, "wb") as out:
+            remaining = length
+            while remaining:
+                chunk = rfile.read(min(_CHUNK, remaining))
+                out.write(chunk)
+                remaining -= len(chunk)
+        # httpx menulis field data dulu, part file terakhir: isi = setelah header part file
+        # sampai sebelum "\r\n--boundary--\r\n"
+        with open(raw, "rb") as src:
+            head = src.read(_CHUNK)
+            start = head.index(b"\r\n\r\n", head.index(b'filename="')) + 4
+            end = length - len(b"\r\n--" + boundary + b"--\r\n")
+            src.seek(start)
+            with open(target, "wb") as out:
+                remaining = end - start
+                while remaining:
+                    chunk = src.read(min(_CHUNK, remaining))
+                    out.write(chunk)
+                    remaining -= len(chunk)
+        os.unlink(raw)
+        return end - start
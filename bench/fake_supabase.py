@@ -0,0 +1,406 @@
+# 📍 File: bench/fake_supabase.py
+
+import json
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# Skema minimal yang dipakai bot (kolom yang tidak disebut di sini tidak dikenal)
+SCHEMA = """
+CREATE TABLE "HostingClients" (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    full_name TEXT,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE TABLE "HostingServices" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_user_id INTEGER,
+    provider TEXT,
+    domain TEXT,
+    service_type TEXT,
+    tanggal_sewa TEXT,
+    expired_date TEXT,
+    price_buy REAL,
+    price_sell REAL,
+    status TEXT,
+    payment_status TEXT,
+    approved_date TEXT,
+    waiting_payment_proof INTEGER DEFAULT 0,
+    payment_proof_url TEXT,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE TABLE "PaymentProofs" (
+    file_unique_id TEXT PRIMARY KEY,
+    service_id TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    sha256 TEXT,
+    path TEXT,
+    thumb_path TEXT,
+    size INTEGER,
+    submitted_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    archived_at TEXT,
+    decision TEXT,
+    decided_at TEXT
+);
+CREATE INDEX hosting_services_expired_id_idx ON "HostingServices" (expired_date, id);
+CREATE INDEX hosting_services_client_idx ON "HostingServices" (client_user_id);
+CREATE INDEX hosting_services_domain_idx ON "HostingServices" (domain, id);
+CREATE INDEX hosting_services_updated_at_idx ON "HostingServices" (updated_at, id);
+-- Padanan trigger touch_updated_at (database/sql/replica_updated_at.sql)
+CREATE TRIGGER hosting_services_touch AFTER UPDATE ON "HostingServices"
+WHEN NEW.updated_at = OLD.updated_at BEGIN
+    UPDATE "HostingServices" SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+CREATE TRIGGER hosting_clients_touch AFTER UPDATE ON "HostingClients"
+WHEN NEW.updated_at = OLD.updated_at BEGIN
+    UPDATE "HostingClients" SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE user_id = NEW.user_id;
+END;
+"""
+
+BOOL_COLUMNS = {"waiting_payment_proof"}
+# Relasi embed PostgREST: tabel -> {tabel_embed: (kolom_fk, kolom_tujuan)}
+RELATIONS = {"HostingServices": {"HostingClients": ("client_user_id", "user_id")}}
+
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class PostgrestError(Exception):
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": None, "hint": None}
+
+
+def _split_top(text):
+    """Pisah dengan koma di level teratas (koma di dalam kurung tidak dihitung)."""
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _value(column, raw):
+    if column in BOOL_COLUMNS and raw.lower() in ("true", "false"):
+        return 1 if raw.lower() == "true" else 0
+    return raw
+
+
+def _condition(column, expr):
+    """'op.value' PostgREST -> (SQL, params)."""
+    op, _, raw = expr.partition(".")
+    col = f'"{column}"'
+    if op == "not":
+        sql, params = _condition(column, raw)
+        return f"NOT ({sql})", params
+    if op in _OPS:
+        return f"{col} {_OPS[op]} ?", [_value(column, raw)]
+    if op == "is":
+        if raw == "null":
+            return f"{col} IS NULL", []
+        return f"{col} = ?", [1 if raw.lower() == "true" else 0]
+    if op == "in":
+        values = [v.strip('"') for v in _split_top(raw[1:-1])]
+        return f"{col} IN ({','.join('?' * len(values))})", [_value(column, v) for v in values]
+    if op in ("like", "ilike"):
+        # SQLite LIKE sudah case-insensitive untuk ASCII; escape default Postgres adalah backslash
+        return f"{col} LIKE ? ESCAPE '\\'", [raw.replace("*", "%")]
+    raise PostgrestError(400, "PGRST100", f"operator tidak didukung: {op}")
+
+
+def _logic(kind, body):
+    """Isi or=(...) / and(...) -> (SQL, params)."""
+    sqls, params = [], []
+    for item in _split_top(body):
+        if item.startswith(("and(", "or(")):
+            inner_kind, _, rest = item.partition("(")
+            sql, p = _logic(inner_kind, rest[:-1])
+        else:
+            column, _, expr = item.partition(".")
+            sql, p = _condition(column, expr)
+        sqls.append(f"({sql})")
+        params.extend(p)
+    return f" {kind.upper()} ".join(sqls), params
+
+
+def _order(spec):
+    clauses = []
+    for item in spec.split(","):
+        parts = item.split(".")
+        direction = "DESC" if "desc" in parts[1:] else "ASC"
+        nulls = "NULLS FIRST" if "nullsfirst" in parts[1:] else "NULLS LAST"
+        # Collation Postgres (en_US) tidak memisahkan huruf besar/kecil; NOCASE tidak mengubah urutan angka
+        clauses.append(f'"{parts[0]}" COLLATE NOCASE {direction} {nulls}')
+    return ", ".join(clauses)
+
+
+def _parse_select(spec):
+    """'a, b, Rel(c)' -> (kolom | None untuk *, {relasi: kolom})."""
+    columns, embeds, star = [], {}, False
+    for item in _split_top(spec or "*"):
+        item = item.strip()
+        if "(" in item:
+            name, _, inner = item.partition("(")
+            embeds[name] = [c.strip() for c in inner[:-1].split(",")]
+        elif item == "*":
+            star = True
+        else:
+            columns.append(item)
+    return (None if star else columns), embeds
+
+
+class FakeSupabase:
+    """Pengganti PostgREST lokal (SQLite in-memory) untuk benchmark offline.
+
+    Mengimplementasikan subset PostgREST yang dipakai bot: select dengan
+    embed, filter eq/neq/gt/gte/lt/lte/is/in/ilike, or=(and(...)), order,
+    limit/offset, count=exact, insert/upsert(on_conflict), update, delete,
+    single() dan RPC hosting_month_buckets. Client supabase-py dipakai apa
+    adanya cukup dengan mengarahkan SUPABASE_URL ke url server ini.
+
+    `latency` (detik) ditambahkan ke setiap request untuk mensimulasikan
+    round trip ke Supabase; jumlah request dicatat di `requests`.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._server = None
+        self._thread = None
+
+    # ---------- data ----------
+    def seed(self, services, clients):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM "HostingServices"')
+            self._conn.execute('DELETE FROM "HostingClients"')
+            self._insert_many("HostingClients", clients)
+            self._insert_many("HostingServices", services)
+
+    def _insert_many(self, table, rows):
+        if not rows:
+            return
+        columns = list(rows[0])
+        self._conn.executemany(
+            f'INSERT INTO "{table}" ({",".join(columns)}) VALUES ({",".join("?" * len(columns))})',
+            [[row.get(c) for c in columns] for row in rows],
+        )
+
+    def reset_counters(self):
+        self.requests = {}
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    # ---------- server ----------
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Header & body ditulis terpisah; tanpa NODELAY tiap respons kena delayed ACK ~40 ms
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, headers, payload = fake.handle(self.command, self.path, self.headers, body)
+                data = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = _handle
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---------- PostgREST ----------
+    def handle(self, method, path, headers, body):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlsplit(path)
+        parts = url.path.strip("/").split("/")  # rest/v1/<table> atau rest/v1/rpc/<fn>
+        resource = parts[-1]
+        key = f"{method} {'rpc/' if parts[-2] == 'rpc' else ''}{resource}"
+
+        try:
+            with self._lock:
+                self.requests[key] = self.requests.get(key, 0) + 1
+                if parts[-2] == "rpc":
+                    return 200, {}, self._rpc(resource)
+                return self._table(method, resource, parse_qsl(url.query, keep_blank_values=True), headers, body)
+        except PostgrestError as e:
+            return e.status, {}, e.body
+        except sqlite3.Error as e:
+            return 400, {}, {"code": "42000", "message": str(e), "details": None, "hint": None}
+
+    def _rpc(self, name):
+        if name != "hosting_month_buckets":
+            raise PostgrestError(404, "PGRST202", f"Could not find the function public.{name}")
+        rows = self._conn.execute(
+            'SELECT substr(coalesce(expired_date, tanggal_sewa), 1, 7) AS month,'
+            ' count(DISTINCT client_user_id) AS client_count, min(client_user_id) AS sample_client'
+            ' FROM "HostingServices" WHERE coalesce(expired_date, tanggal_sewa) IS NOT NULL'
+            ' GROUP BY 1 ORDER BY 1'
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _table(self, method, table, params, headers, body):
+        select, order, limit, offset, on_conflict = None, None, None, 0, None
+        where, where_params = [], []
+        for key, value in params:
+            if key == "select":
+                select = value
+            elif key == "order":
+                order = value
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            elif key == "on_conflict":
+                on_conflict = value
+            elif key == "columns":
+                continue
+            elif key in ("or", "and"):
+                sql, p = _logic(key, value[1:-1])
+                where.append(f"({sql})")
+                where_params.extend(p)
+            else:
+                sql, p = _condition(key, value)
+                where.append(sql)
+                where_params.extend(p)
+
+        prefer = headers.get("Prefer", "")
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+        representation = "return=representation" in prefer or method == "GET"
+        count = None
+        out_headers = {}
+
+        if method in ("GET", "HEAD"):
+            sql = f'SELECT * FROM "{table}"{where_sql}'
+            if order:
+                sql += f" ORDER BY {_order(order)}"
+            if limit is not None or offset:
+                sql += f" LIMIT {limit if limit is not None else -1} OFFSET {offset}"
+            rows = self._conn.execute(sql, where_params).fetchall()
+            if "count=exact" in prefer:
+                count = self._conn.execute(f'SELECT count(*) FROM "{table}"{where_sql}', where_params).fetchone()[0]
+        elif method == "POST":
+            rows = self._upsert(table, body if isinstance(body, list) else [body],
+                                on_conflict if "resolution=merge-duplicates" in prefer else None)
+            count = len(rows)
+        elif method == "PATCH":
+            assignments = ", ".join(f'"{c}" = ?' for c in body)
+            values = [self._store(c, v) for c, v in body.items()]
+            with self._conn:
+                rows = self._conn.execute(
+                    f'UPDATE "{table}" SET {assignments}{where_sql} RETURNING *', values + where_params
+                ).fetchall()
+            count = len(rows)
+        elif method == "DELETE":
+            with self._conn:
+                rows = self._conn.execute(f'DELETE FROM "{table}"{where_sql} RETURNING *', where_params).fetchall()
+            count = len(rows)
+        else:
+            raise PostgrestError(405, "PGRST000", f"method {method} tidak didukung")
+
+        if "count=exact" in prefer and count is not None:
+            end = offset + len(rows) - 1
+            out_headers["Content-Range"] = f"{offset}-{end}/{count}" if rows else f"*/{count}"
+
+        if not representation:
+            return (200 if method == "PATCH" else 201 if method == "POST" else 204), out_headers, None
+
+        data = self._project(table, rows, select)
+        if "vnd.pgrst.object" in headers.get("Accept", ""):
+            if len(data) != 1:
+                raise PostgrestError(
+                    406, "PGRST116",
+                    f"JSON object requested, multiple (or no) rows returned ({len(data)} rows)",
+                )
+            return 200, out_headers, data[0]
+        return (201 if method == "POST" else 200), out_headers, data
+
+    def _store(self, column, value):
+        if column in BOOL_COLUMNS and isinstance(value, bool):
+            return int(value)
+        return value
+
+    def _upsert(self, table, rows, on_conflict):
+        out = []
+        with self._conn:
+            for row in rows:
+                columns = list(row)
+                sql = (
+                    f'INSERT INTO "{table}" ({",".join(f"{chr(34)}{c}{chr(34)}" for c in columns)})'
+                    f' VALUES ({",".join("?" * len(columns))})'
+                )
+                if on_conflict:
+                    updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns if c != on_conflict)
+                    sql += f' ON CONFLICT ("{on_conflict}") DO UPDATE SET {updates}'
+                out.extend(self._conn.execute(sql + " RETURNING *", [self._store(c, row[c]) for c in columns]).fetchall())
+        return out
+
+    def _project(self, table, rows, select):
+        columns, embeds = _parse_select(select)
+        data = []
+        for row in rows:
+            item = dict(row)
+            for column in BOOL_COLUMNS & item.keys():
+                if item[column] is not None:
+                    item[column] = bool(item[column])
+            data.append(item)
+
+        for name, embed_columns in embeds.items():
+            fk, target = RELATIONS[table][name]
+            ids = {item[fk] for item in data if item.get(fk) is not None}
+            related = {}
+            if ids:
+                rows = self._conn.execute(
+                    f'SELECT * FROM "{name}" WHERE "{target}" IN ({",".join("?" * len(ids))})', list(ids)
+                ).fetchall()
+                related = {r[target]: {c: r[c] for c in embed_columns} for r in rows}
+            for item in data:
+                item[name] = related.get(item.get(fk))
+
+        if columns is None:
+            return data
+        keep = set(columns) | set(embeds)
+        return [{k: v for k, v in item.items() if k in keep} for item in data]
@@ -0,0 +1,261 @@
+# 📍 File: bench/run_suite.py
+#
+# Benchmark offline jalur utama bot terhadap FakeSupabase (PostgREST lokal)
+# dan FakeBotRequest (Bot API palsu), untuk 1k/10k/100k layanan.
+# Hasil ditulis sebagai JSON supaya regresi bisa dibandingkan antar commit.
+# Jalankan dari root repo:
+#   python -m bench.run_suite --sizes 1000,10000,100000 --out bench-results.json
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import date, timedelta
+
+from bench.fake_supabase import FakeSupabase
+
+# FakeSupabase harus jalan dan env terisi sebelum modul bot di-import
+# (client Supabase & ledger dibuat saat import).
+_fake = FakeSupabase()
+os.environ["SUPABASE_URL"] = _fake.start()
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.bench")
+os.environ.setdefault("BOT_TOKEN", "123:fake")
+os.environ.setdefault("ADMIN_IDS", "1")
+os.environ["LOCAL_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="hmb-bench-"), "bench.sqlite3")
+# Suite mengukur biaya di sisi bot, bukan rate limit Telegram
+os.environ.setdefault("BROADCAST_GLOBAL_RATE", "1000000")
+os.environ.setdefault("BROADCAST_PER_CHAT_RATE", "1000000")
+
+from telegram import Update  # noqa: E402
+from telegram.ext import ApplicationBuilder  # noqa: E402
+from bench.fake_bot_api import FakeBotRequest  # noqa: E402
+from config import ADMIN_IDS  # noqa: E402
+from database.reminder_ledger import reminder_ledger  # noqa: E402
+from lib.client_directory import client_directory  # noqa: E402
+from lib.reminder_planner import reminder_planner  # noqa: E402
+from handlers.payment_reminder import (  # noqa: E402
+    send_payment_reminders, reset_monthly_status, get_admin_validation_handler,
+)
+from handlers.list_hosting import get_list_hosting_handler  # noqa: E402
+from handlers.info_hosting import get_info_hosting_handler  # noqa: E402
+
+ADMIN_ID = ADMIN_IDS[0]
+PROVIDERS = ["rumahweb", "niagahoster", "hostinger", "idcloudhost", "dewaweb"]
+
+
+# ---------- data sintetis ----------
+def make_dataset(n_services, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    n_clients = max(10, n_services // 5)
+    clients = [
+        {"user_id": 1000 + i, "username": f"user{i}" if i % 3 else None, "full_name": f"Klien {i}"}
+        for i in range(n_clients)
+    ]
+    services = []
+    for i in range(n_services):
+        sewa = today - timedelta(days=rng.randint(0, 365))
+        expired = today + timedelta(days=rng.randint(-30, 60))
+        roll = rng.random()
+        payment_status = "approved" if roll < 0.3 else "rejected" if roll < 0.35 else "pending"
+        services.append({
+            "id": i + 1,
+            "client_user_id": 1000 + rng.randrange(n_clients),
+            "provider": rng.choice(PROVIDERS),
+            "domain": f"site{i}.com",
+            "service_type": "hosting",
+            "tanggal_sewa": sewa.isoformat(),
+            "expired_date": expired.isoformat(),
+            "price_buy": 100000,
+            "price_sell": 150000,
+            "status": "active" if rng.random() < 0.95 else "inactive",
+            "payment_status": payment_status,
+            "approved_date": (today - timedelta(days=rng.randint(0, 40))).isoformat()
+            if payment_status == "approved" else None,
+            "waiting_payment_proof": 1 if payment_status != "approved" else 0,
+            "payment_proof_url": None,
+        })
+    return services, clients
+
+
+# ---------- update sintetis ----------
+_update_id = 0
+
+
+def _user(uid):
+    return {"id": uid, "is_bot": False, "first_name": f"user{uid}"}
+
+
+def callback_update(app, uid, data):
+    global _update_id
+    _update_id += 1
+    return Update.de_json({
+        "update_id": _update_id,
+        "callback_query": {
+            "id": str(_update_id), "from": _user(uid), "chat_instance": "bench", "data": data,
+            "message": {
+                "message_id": 1, "date": int(time.time()), "text": "menu",
+                "chat": {"id": uid, "type": "private"},
+            },
+        },
+    }, app.bot)
+
+
+def command_update(app, uid, text):
+    global _update_id
+    _update_id += 1
+    return Update.de_json({
+        "update_id": _update_id,
+        "message": {
+            "message_id": _update_id, "date": int(time.time()), "text": text,
+            "chat": {"id": uid, "type": "private"}, "from": _user(uid),
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }, app.bot)
+
+
+# ---------- pengukuran ----------
+def _stats(samples, db_requests, api_calls):
+    samples = sorted(samples)
+    n = len(samples)
+    return {
+        "iterations": n,
+        "mean_ms": round(sum(samples) / n * 1000, 3),
+        "p50_ms": round(samples[n // 2] * 1000, 3),
+        "p95_ms": round(samples[min(n - 1, int(n * 0.95))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "supabase_requests": round(db_requests / n, 2),
+        "bot_api_calls": round(api_calls / n, 2),
+    }
+
+
+async def measure(bot_request, fn, iterations=1):
+    samples, db_requests, api_calls = [], 0, 0
+    for i in range(iterations):
+        _fake.reset_counters()
+        calls_before = len(bot_request.calls)
+        t0 = time.perf_counter()
+        await fn(i)
+        samples.append(time.perf_counter() - t0)
+        db_requests += _fake.total_requests
+        api_calls += len(bot_request.calls) - calls_before
+    return _stats(samples, db_requests, api_calls)
+
+
+async def run_size(n_services, args):
+    services, clients = make_dataset(n_services)
+    _fake.seed(services, clients)
+    today = date.today()
+
+    bot_request = FakeBotRequest(latency=args.bot_latency)
+    app = ApplicationBuilder().token("123:fake").request(bot_request) \
+        .get_updates_request(FakeBotRequest(latency=0)).build()
+    for h in get_list_hosting_handler():
+        app.add_handler(h)
+    app.add_handler(get_info_hosting_handler())
+    app.add_handler(get_admin_validation_handler())
+    await app.initialize()
+
+    # Kondisi seperti setelah on_startup
+    await client_directory.load_all()
+    reminder_planner.invalidate()
+    await reminder_ledger.prune(today + timedelta(days=1))
+
+    results = {}
+
+    async def reminders(_):
+        await send_payment_reminders(app.bot)
+
+    results["send_payment_reminders_cold"] = await measure(bot_request, reminders)
+    results["send_payment_reminders_warm"] = await measure(bot_request, reminders, args.iterations)
+
+    async def listhosting_menu(_):
+        await app.process_update(callback_update(app, ADMIN_ID, "listhosting"))
+
+    results["listhosting_menu"] = await measure(bot_request, listhosting_menu, args.iterations)
+
+    async def listhosting_first_page(_):
+        await app.process_update(callback_update(app, ADMIN_ID, "filter_all"))
+
+    results["listhosting_first_page"] = await measure(bot_request, listhosting_first_page, args.iterations)
+
+    async def listhosting_next_page(_):
+        await app.process_update(callback_update(app, ADMIN_ID, "page_next"))
+
+    await app.process_update(callback_update(app, ADMIN_ID, "filter_all"))
+    results["listhosting_next_page"] = await measure(bot_request, listhosting_next_page, args.iterations)
+
+    rng = random.Random(1)
+
+    async def infohosting(_):
+        uid = rng.choice(clients)["user_id"]
+        await app.process_update(command_update(app, uid, "/infohosting"))
+
+    results["infohosting"] = await measure(bot_request, infohosting, args.iterations)
+
+    waiting = [s["id"] for s in services if s["waiting_payment_proof"]]
+    approve_ids = rng.sample(waiting, min(args.iterations, len(waiting)))
+
+    async def approve(i):
+        await app.process_update(callback_update(app, ADMIN_ID, f"approve_{approve_ids[i]}"))
+
+    results["approve"] = await measure(bot_request, approve, len(approve_ids))
+
+    async def reset(_):
+        await reset_monthly_status()
+
+    results["reset_monthly_status"] = await measure(bot_request, reset)
+
+    await app.shutdown()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--db-latency", type=float, default=0.005, help="round trip per request Supabase (detik)")
+    parser.add_argument("--bot-latency", type=float, default=0.0, help="round trip per request Bot API (detik)")
+    parser.add_argument("--out", help="file JSON hasil (default: stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    _fake.latency = args.db_latency
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "db_latency_s": args.db_latency,
+        "bot_latency_s": args.bot_latency,
+        "results": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        t0 = time.perf_counter()
+        report["results"][str(size)] = await run_size(size, args)
+        logging.warning(f"ukuran {size}: selesai dalam {time.perf_counter() - t0:.1f}s")
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    _fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
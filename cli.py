@@ -0,0 +1,206 @@
+# 📍 File: cli.py
+#
+# Import massal & export layanan hosting tanpa lewat percakapan bot.
+#   python cli.py import layanan.csv [--batch 500] [--dry-run] [--skip-invalid]
+#   python cli.py export layanan.csv [--batch 1000]
+# Format dari ekstensi file (.csv, .jsonl, .json untuk import) atau --format;
+# "-" = stdin/stdout. Kolom import sama dengan isian add hosting:
+# client_user_id, provider, domain, service_type, tanggal_sewa, price_buy,
+# price_sell (+ expired_date opsional). Hasil export bisa langsung di-import.
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+import time
+from database.supabase_client import supabase, run_query
+from lib.validators import SERVICE_FIELDS, service_row
+
+logger = logging.getLogger("cli")
+
+EXPORT_COLUMNS = (
+    "id", "client_user_id", "username", "full_name", "provider", "domain", "service_type",
+    "tanggal_sewa", "expired_date", "price_buy", "price_sell", "status", "payment_status", "approved_date",
+)
+_EXPORT_SELECT = ", ".join(c for c in EXPORT_COLUMNS if c not in ("username", "full_name")) \
+    + ", HostingClients(username, full_name)"
+
+# Batas parameter filter in_() per request (panjang URL)
+_IN_CHUNK = 500
+# Jumlah baris error yang dicetak; sisanya hanya dihitung
+_MAX_ERRORS_SHOWN = 20
+
+
+def _format(path, fmt):
+    if fmt:
+        return fmt
+    for ext in ("csv", "jsonl", "json"):
+        if path.lower().endswith(f".{ext}"):
+            return ext
+    raise SystemExit(f"❌ Format {path} tidak dikenali, pakai --format csv/jsonl")
+
+
+def _open(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8-sig" if "r" in mode else "utf-8")
+
+
+def read_rows(path, fmt):
+    """Generator (nomor_baris, dict) dari file CSV (dengan header), JSONL, atau array JSON."""
+    with _open(path, "r") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            yield from enumerate(json.load(f), 1)
+
+
+async def _unknown_clients(user_ids):
+    """user_id yang belum ada di HostingClients (klien harus /start dulu, sama seperti add hosting)."""
+    ids = sorted(user_ids)
+    known = set()
+    for i in range(0, len(ids), _IN_CHUNK):
+        result = await run_query(
+            supabase.table("HostingClients").select("user_id").in_("user_id", ids[i:i + _IN_CHUNK])
+        )
+        known.update(r["user_id"] for r in result.data or [])
+    return set(ids) - known
+
+
+async def import_services(path, fmt=None, batch=500, dry_run=False, skip_invalid=False):
+    """Validasi semua baris dulu, lalu insert per batch. Mengembalikan dict ringkasan."""
+    fmt = _format(path, fmt)
+    rows, errors = [], []
+    for line_no, raw in read_rows(path, fmt):
+        try:
+            rows.append((line_no, service_row(raw)))
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+
+    unknown = await _unknown_clients({row["client_user_id"] for _, row in rows})
+    if unknown:
+        errors.extend(
+            (line_no, f"client_user_id: {row['client_user_id']} belum pernah /start")
+            for line_no, row in rows if row["client_user_id"] in unknown
+        )
+        rows = [(line_no, row) for line_no, row in rows if row["client_user_id"] not in unknown]
+    errors.sort()
+
+    for line_no, message in errors[:_MAX_ERRORS_SHOWN]:
+        print(f"⚠️ Baris {line_no}: {message}", file=sys.stderr)
+    if len(errors) > _MAX_ERRORS_SHOWN:
+        print(f"⚠️ ... dan {len(errors) - _MAX_ERRORS_SHOWN} baris lain tidak valid", file=sys.stderr)
+
+    summary = {"valid": len(rows), "invalid": len(errors), "inserted": 0}
+    if (errors and not skip_invalid) or dry_run:
+        return summary
+
+    for i in range(0, len(rows), batch):
+        chunk = rows[i:i + batch]
+        try:
+            await run_query(
+                supabase.table("HostingServices").insert([row for _, row in chunk], returning="minimal")
+            )
+        except Exception as e:
+            # Batch sebelumnya sudah tersimpan: file bisa dilanjutkan mulai baris ini
+            print(f"❌ Insert gagal mulai baris {chunk[0][0]} ({summary['inserted']} layanan sudah tersimpan): {e}",
+                  file=sys.stderr)
+            summary["failed_at_line"] = chunk[0][0]
+            return summary
+        summary["inserted"] += len(chunk)
+    return summary
+
+
+async def iter_services(batch=1000):
+    """Semua HostingServices + nama klien, halaman keyset (id > terakhir) berukuran `batch`.
+
+    Halaman berikutnya sudah diminta selagi halaman ini diproses pemanggil,
+    dan hanya satu halaman yang ditahan di memori.
+    """
+    def fetch(after):
+        q = supabase.table("HostingServices").select(_EXPORT_SELECT).order("id").limit(batch)
+        if after is not None:
+            q = q.gt("id", after)
+        return asyncio.ensure_future(run_query(q))
+
+    pending = fetch(None)
+    try:
+        while pending is not None:
+            rows = (await pending).data or []
+            pending = fetch(rows[-1]["id"]) if len(rows) == batch else None
+            for row in rows:
+                client = row.pop("HostingClients", None) or {}
+                row["username"] = client.get("username")
+                row["full_name"] = client.get("full_name")
+                yield row
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def export_services(path, fmt=None, batch=1000):
+    """Tulis semua layanan ke CSV/JSONL secara streaming; mengembalikan jumlah baris."""
+    fmt = _format(path, fmt)
+    if fmt == "json":
+        raise SystemExit("❌ Export memakai CSV atau JSONL (satu baris per layanan)")
+    count = 0
+    with _open(path, "w") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(row):
+                f.write(json.dumps({c: row.get(c) for c in EXPORT_COLUMNS}, ensure_ascii=False) + "\n")
+        async for row in iter_services(batch):
+            write(row)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import/export layanan hosting (HostingServices)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="import layanan dari CSV/JSONL/JSON")
+    p_import.add_argument("path")
+    p_import.add_argument("--format", choices=("csv", "jsonl", "json"))
+    p_import.add_argument("--batch", type=int, default=500, help="baris per request insert")
+    p_import.add_argument("--dry-run", action="store_true", help="hanya validasi, tidak menulis")
+    p_import.add_argument("--skip-invalid", action="store_true", help="tetap import baris yang valid")
+
+    p_export = sub.add_parser("export", help="export layanan + nama klien ke CSV/JSONL")
+    p_export.add_argument("path")
+    p_export.add_argument("--format", choices=("csv", "jsonl"))
+    p_export.add_argument("--batch", type=int, default=1000, help="baris per halaman (<= max-rows PostgREST)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    started = time.perf_counter()
+
+    if args.command == "import":
+        summary = asyncio.run(import_services(args.path, args.format, args.batch, args.dry_run, args.skip_invalid))
+        elapsed = time.perf_counter() - started
+        print(f"{'✅' if not summary['invalid'] else '⚠️'} {summary['valid']} baris valid, "
+              f"{summary['invalid']} tidak valid, {summary['inserted']} layanan disimpan ({elapsed:.1f} detik)",
+              file=sys.stderr)
+        if summary["invalid"] and not args.skip_invalid and not args.dry_run:
+            print(f"Tidak ada yang disimpan. Perbaiki file atau pakai --skip-invalid. "
+                  f"Kolom: {', '.join(SERVICE_FIELDS)}", file=sys.stderr)
+        return 1 if summary["invalid"] or "failed_at_line" in summary else 0
+
+    count = asyncio.run(export_services(args.path, args.format, args.batch))
+    print(f"✅ {count} layanan diexport ({time.perf_counter() - started:.1f} detik)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,3 +15,84 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 # Admin Telegram user IDs (dipisah dengan koma di .env)
 ADMIN_IDS = list(map(int, os.getenv("ADMIN_IDS", "").split(",")))
+
+# Jumlah thread untuk query Supabase (client sinkron dijalankan di thread pool)
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "8"))
+
+# File SQLite lokal (ledger reminder, dll.)
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", "data/hostmanagebot.sqlite3")
+
+# Broadcast Telegram: konkurensi & rate limit (Telegram ~30 pesan/detik global, ~1/detik per chat)
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+BROADCAST_GLOBAL_RATE = float(os.getenv("BROADCAST_GLOBAL_RATE", "25"))
+BROADCAST_PER_CHAT_RATE = float(os.getenv("BROADCAST_PER_CHAT_RATE", "1"))
+
+# Session store percakapan admin (pengganti dict global)
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "500"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", "1800"))  # detik
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(4 * 1024 * 1024)))
+
+# Persistence percakapan & session ke SQLite (write-behind)
+PERSISTENCE_ENABLED = os.getenv("PERSISTENCE_ENABLED", "true").lower() == "true"
+PERSISTENCE_FLUSH_INTERVAL = float(os.getenv("PERSISTENCE_FLUSH_INTERVAL", "5"))
+
+# Cache nama klien (HostingClients) di memori, detik sebelum di-refresh
+CLIENT_CACHE_TTL = int(os.getenv("CLIENT_CACHE_TTL", "900"))
+# Interval (detik) penulisan batch perubahan username/full_name klien
+CLIENT_WRITE_FLUSH_INTERVAL = int(os.getenv("CLIENT_WRITE_FLUSH_INTERVAL", "30"))
+
+# Search index inline: detik sebelum dibangun ulang di latar belakang selama change feed
+# tidak tersambung (menangkap perubahan di luar bot, mis. import lewat cli.py)
+SEARCH_INDEX_TTL = int(os.getenv("SEARCH_INDEX_TTL", "900"))
+
+# Jumlah tombol per halaman di picker klien/hosting (add/edit/delete)
+PICKER_PAGE_SIZE = int(os.getenv("PICKER_PAGE_SIZE", "8"))
+
+# Mode webhook: aktif jika WEBHOOK_URL (URL publik https, tanpa path) diisi; selain itu polling
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")  # kosong = dibuat acak saat startup
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))
+
+# Jumlah update yang diproses bersamaan (update dari chat yang sama tetap berurutan); 1 = serial
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "16"))
+
+# Prometheus metrics (/metrics di port terpisah dari webhook)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+# Default hanya localhost (tanpa autentikasi); 0.0.0.0 jika Prometheus mengambil dari host lain
+METRICS_ADDR = os.getenv("METRICS_ADDR", "127.0.0.1")
+
+# Tracer query Supabase per update/job (diagnostik N+1, default mati)
+QUERY_TRACE_ENABLED = os.getenv("QUERY_TRACE_ENABLED", "false").lower() == "true"
+QUERY_TRACE_REPEAT_THRESHOLD = int(os.getenv("QUERY_TRACE_REPEAT_THRESHOLD", "5"))
+QUERY_TRACE_FILE = os.getenv("QUERY_TRACE_FILE", "")  # mis. data/query_trace.jsonl
+
+# Change feed Supabase Realtime (HostingServices & HostingClients); butuh tabel
+# ada di publication supabase_realtime (lihat database/sql/realtime_publication.sql)
+REALTIME_ENABLED = os.getenv("REALTIME_ENABLED", "false").lower() == "true"
+REALTIME_URL = os.getenv("REALTIME_URL", "")  # kosong = SUPABASE_URL + /realtime/v1
+REALTIME_RECONNECT_MAX_DELAY = float(os.getenv("REALTIME_RECONNECT_MAX_DELAY", "60"))
+
+# Replica baca lokal HostingServices & HostingClients (SQLite); butuh kolom updated_at
+# di kedua tabel (lihat database/sql/replica_updated_at.sql)
+REPLICA_ENABLED = os.getenv("REPLICA_ENABLED", "false").lower() == "true"
+REPLICA_DB_PATH = os.getenv("REPLICA_DB_PATH", "data/replica.sqlite3")
+REPLICA_SYNC_INTERVAL = int(os.getenv("REPLICA_SYNC_INTERVAL", "30"))  # detik
+REPLICA_SYNC_BATCH = int(os.getenv("REPLICA_SYNC_BATCH", "1000"))  # <= max-rows PostgREST
+REPLICA_SYNC_OVERLAP = float(os.getenv("REPLICA_SYNC_OVERLAP", "10"))  # detik mundur dari watermark
+REPLICA_VERIFY_INTERVAL = int(os.getenv("REPLICA_VERIFY_INTERVAL", "3600"))  # cek hash vs sumber
+
+# Intake bukti transfer: tunggu foto lain dari album yang sama (detik) & jumlah worker antrean
+PROOF_ALBUM_WAIT = float(os.getenv("PROOF_ALBUM_WAIT", "1.5"))
+PROOF_WORKERS = int(os.getenv("PROOF_WORKERS", "2"))
+
+# Arsip bukti transfer ke Supabase Storage (bucket privat, lihat database/sql/proof_archive_bucket.sql)
+PROOF_ARCHIVE_ENABLED = os.getenv("PROOF_ARCHIVE_ENABLED", "false").lower() == "true"
+PROOF_ARCHIVE_BUCKET = os.getenv("PROOF_ARCHIVE_BUCKET", "payment-proofs")
+PROOF_ARCHIVE_WORKERS = int(os.getenv("PROOF_ARCHIVE_WORKERS", "2"))
+PROOF_ARCHIVE_CHUNK = int(os.getenv("PROOF_ARCHIVE_CHUNK", "65536"))  # byte per potongan download
+PROOF_THUMB_SIZE = int(os.getenv("PROOF_THUMB_SIZE", "320"))  # sisi terpanjang thumbnail (px)
+PROOF_THUMB_WORKERS = int(os.getenv("PROOF_THUMB_WORKERS", "2"))  # proses Pillow
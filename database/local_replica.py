@@ -0,0 +1,463 @@
+# 📍 File: database/local_replica.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from config import (
+    REPLICA_ENABLED, REPLICA_DB_PATH, REPLICA_SYNC_BATCH, REPLICA_SYNC_OVERLAP,
+)
+from database.models import HostingClient, HostingService
+from database.supabase_client import supabase, run_query
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS services (
+    id INTEGER PRIMARY KEY,
+    client_user_id INTEGER,
+    provider TEXT,
+    domain TEXT,
+    service_type TEXT,
+    tanggal_sewa TEXT,
+    expired_date TEXT,
+    approved_date TEXT,
+    price_buy NUMERIC,
+    price_sell NUMERIC,
+    status TEXT,
+    payment_status TEXT,
+    waiting_payment_proof INTEGER,
+    payment_proof_url TEXT,
+    updated_at TEXT
+);
+-- List hosting: keyset (expired_date, id), filter bulan = rentang expired_date
+CREATE INDEX IF NOT EXISTS services_expired_id_idx ON services (expired_date, id);
+-- Picker edit/delete: layanan aktif urut domain
+CREATE INDEX IF NOT EXISTS services_status_domain_idx ON services (status, domain, id);
+CREATE INDEX IF NOT EXISTS services_client_idx ON services (client_user_id);
+
+CREATE TABLE IF NOT EXISTS clients (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    full_name TEXT,
+    updated_at TEXT
+);
+-- Picker klien add hosting: urut full_name
+CREATE INDEX IF NOT EXISTS clients_full_name_idx ON clients (full_name, user_id);
+
+-- Watermark sync per tabel: (updated_at, pk) baris terakhir yang sudah diterapkan
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    updated_at TEXT NOT NULL,
+    last_key INTEGER NOT NULL
+);
+"""
+
+
+class _Table:
+    def __init__(self, source, local, key, columns):
+        self.source = source
+        self.local = local
+        self.key = key
+        self.columns = columns
+        self.select = ",".join(columns) + ",updated_at"
+        names = (*columns, "updated_at")
+        self.upsert_sql = (
+            f"INSERT OR REPLACE INTO {local} ({','.join(names)}) VALUES ({','.join('?' * len(names))})"
+        )
+
+
+SERVICES = _Table("HostingServices", "services", "id", HostingService.__slots__)
+CLIENTS = _Table("HostingClients", "clients", "user_id", HostingClient.__slots__)
+TABLES = (SERVICES, CLIENTS)
+_BOOL_COLUMNS = {"waiting_payment_proof"}
+# Filter bulan list hosting: expired_date, atau tanggal_sewa jika expired_date kosong (sama dengan bucket)
+_MONTH_SQL = "coalesce(expired_date, tanggal_sewa) >= ? AND coalesce(expired_date, tanggal_sewa) < ?"
+
+
+def _like_prefix(search):
+    """Pola LIKE 'berawalan search' (dipakai dengan ESCAPE '\\'): % dan _ di input dicari apa adanya."""
+    return search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _norm(value):
+    """Nilai kolom dalam bentuk kanonik: 150000 == 150000.0, date == 'YYYY-MM-DD'."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)) and float(value).is_integer():
+        return int(value)
+    return value
+
+
+def row_hash(row, columns):
+    """Hash isi baris (tanpa updated_at), sama untuk baris dari PostgREST, Realtime, maupun replica."""
+    payload = json.dumps([_norm(row.get(c)) for c in columns], separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _log_write_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Replica lokal: write-through gagal: {future.exception()!r}")
+
+
+class LocalReplica:
+    """Replica baca lokal (SQLite, WAL) dari HostingServices & HostingClients.
+
+    Semua jalur baca admin (list hosting, picker add/edit/delete, detail
+    layanan) dilayani dari sini tanpa round trip ke Supabase. Replica dijaga
+    tetap baru dengan sync inkremental pada watermark (updated_at, pk):
+    setiap sync hanya mengambil baris yang berubah sejak sync terakhir,
+    dimulai REPLICA_SYNC_OVERLAP detik sebelum watermark supaya transaksi
+    yang commit terlambat tidak terlewat. Penulisan dari bot sendiri
+    langsung diterapkan (write-through), dan DELETE dari luar bot ditangkap
+    oleh verify(), yang membandingkan hash isi setiap baris replica dengan
+    sumbernya.
+
+    Semua penulisan (sync, verify, write-through) dijalankan berurutan di
+    satu thread penulis khusus lewat koneksi penulis, jadi event loop tidak
+    pernah menunggu commit SQLite; pembacaan memakai koneksi sendiri di
+    event loop (WAL: pembaca tidak menunggu penulis).
+    Sebelum sync pertama berhasil, `ready` False dan pemanggil tetap query
+    ke Supabase.
+    """
+
+    def __init__(self, path=REPLICA_DB_PATH, enabled=REPLICA_ENABLED,
+                 batch=REPLICA_SYNC_BATCH, overlap=REPLICA_SYNC_OVERLAP):
+        self.path = path
+        self.enabled = enabled
+        self.batch = batch
+        self.overlap = overlap
+        self.ready = False
+        # Naik setiap ada perubahan; dipakai untuk cache hasil agregat (bucket bulan)
+        self.version = 0
+        self.last_sync_at = None
+        self.last_check = None
+        self._writer = None
+        self._reader = None
+        self._write_lock = threading.Lock()
+        # Satu thread: write-through diterapkan sesuai urutan pemanggilan, juga terhadap batch sync
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replica-writer")
+        self._sync_lock = asyncio.Lock()
+        self._buckets = (None, None)
+        self._counts = (None, {})
+
+    # ---------- koneksi ----------
+    def _open(self):
+        if self._writer is not None:
+            return
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._writer = sqlite3.connect(self.path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.executescript(SCHEMA)
+        self._writer.commit()
+        # Database :memory: tidak bisa dibuka dua kali; pembaca memakai koneksi yang sama
+        self._reader = self._writer if self.path == ":memory:" else sqlite3.connect(self.path, check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+
+    def close(self):
+        if self._writer is not None:
+            # Tunggu write-through yang masih antre sebelum koneksi ditutup
+            self._executor.submit(lambda: None).result()
+            if self._reader is not self._writer:
+                self._reader.close()
+            self._writer.close()
+            self._writer = self._reader = None
+            self.ready = False
+
+    # ---------- tulis (thread & koneksi penulis) ----------
+    async def _in_writer(self, func, *args):
+        return await asyncio.wrap_future(self._executor.submit(func, *args))
+
+    def _submit(self, func, *args):
+        # Write-through: tidak ditunggu pemanggil, error cukup di-log (sync berikutnya memperbaiki)
+        self._executor.submit(func, *args).add_done_callback(_log_write_error)
+
+    async def flush(self):
+        """Tunggu sampai semua write-through yang sudah diantrekan diterapkan."""
+        await self._in_writer(lambda: None)
+
+    def _params(self, table, row):
+        values = []
+        for c in table.columns:
+            value = row.get(c)
+            values.append(value.isoformat() if isinstance(value, date) else value)
+        return (*values, row.get("updated_at"))
+
+    def _write(self, table, rows=(), deletes=(), watermark=None):
+        with self._write_lock, self._writer:
+            if rows:
+                self._writer.executemany(table.upsert_sql, [self._params(table, r) for r in rows])
+            if deletes:
+                self._writer.executemany(f"DELETE FROM {table.local} WHERE {table.key} = ?", [(k,) for k in deletes])
+            if watermark:
+                self._writer.execute(
+                    "INSERT OR REPLACE INTO sync_state (source, updated_at, last_key) VALUES (?, ?, ?)",
+                    (table.source, *watermark),
+                )
+        if rows or deletes:
+            self.version += 1
+
+    def _watermark(self, table):
+        with self._write_lock:
+            row = self._writer.execute(
+                "SELECT updated_at, last_key FROM sync_state WHERE source = ?", (table.source,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    # ---------- sync inkremental ----------
+    async def sync(self):
+        """Tarik baris yang berubah sejak watermark untuk kedua tabel. Mengembalikan jumlah baris."""
+        if not self.enabled:
+            return 0
+        async with self._sync_lock:
+            started = time.perf_counter()
+            self._open()
+            changed = 0
+            for table in TABLES:
+                changed += await self._sync_table(table)
+            self.ready = True
+            self.last_sync_at = time.time()
+        if changed:
+            logger.info(f"Replica lokal: {changed} baris disinkronkan dalam {time.perf_counter() - started:.2f} detik")
+        return changed
+
+    async def _sync_table(self, table):
+        watermark = await self._in_writer(self._watermark, table)
+        # Lewat pertama mundur `overlap` detik dari watermark (idempoten: baris di-upsert ulang)
+        since = self._since(watermark[0]) if watermark else None
+        cursor = None
+        total = 0
+        while True:
+            q = supabase.table(table.source).select(table.select) \
+                .order("updated_at").order(table.key).limit(self.batch)
+            if cursor:
+                ts, key = cursor
+                q = q.or_(f"updated_at.gt.{ts},and(updated_at.eq.{ts},{table.key}.gt.{key})")
+            elif since:
+                q = q.gte("updated_at", since)
+            result = await run_query(q)
+            rows = result.data or []
+            if not rows:
+                break
+            last = rows[-1]
+            cursor = (last["updated_at"], last[table.key])
+            new_mark = cursor if watermark is None or cursor > watermark else None
+            await self._in_writer(self._write, table, rows, (), new_mark)
+            total += len(rows)
+            if len(rows) < self.batch:
+                break
+        return total
+
+    def _since(self, updated_at):
+        try:
+            return (datetime.fromisoformat(updated_at) - timedelta(seconds=self.overlap)).isoformat()
+        except ValueError:
+            return updated_at
+
+    # ---------- write-through dari bot & change feed ----------
+    def upsert(self, source, row):
+        """Terapkan satu baris (hasil insert bot atau event Realtime) ke replica."""
+        if self._writer is None:
+            return
+        self._submit(self._write, SERVICES if source == SERVICES.source else CLIENTS, [row])
+
+    def patch_service(self, service_id, fields):
+        """Terapkan UPDATE parsial bot; sync berikutnya membawa updated_at dari sumber."""
+        if self._writer is None:
+            return
+        self._submit(self._patch_service, service_id, dict(fields))
+
+    def _patch_service(self, service_id, fields):
+        # Dibaca di thread penulis supaya patch yang masih antre sebelumnya ikut terlihat
+        with self._write_lock:
+            cur = self._writer.execute("SELECT * FROM services WHERE id = ?", (service_id,))
+            names = [d[0] for d in cur.description]
+            values = cur.fetchone()
+        if values is not None:
+            self._write(SERVICES, [{**dict(zip(names, values)), **fields}])
+
+    def remove(self, source, key):
+        if self._writer is None:
+            return
+        self._submit(self._write, SERVICES if source == SERVICES.source else CLIENTS, (), [key])
+
+    # ---------- konsistensi ----------
+    async def verify(self, repair=True):
+        """Bandingkan hash setiap baris replica dengan sumbernya.
+
+        Mengembalikan {tabel: {"checked", "missing", "extra", "mismatched"}}.
+        Dengan repair=True, baris yang hilang/berbeda ditulis ulang dari
+        sumber dan baris yang sudah dihapus di sumber ikut dihapus.
+        """
+        if not self.enabled:
+            return {}
+        async with self._sync_lock:
+            started = time.perf_counter()
+            self._open()
+            report = {}
+            for table in TABLES:
+                report[table.source] = await self._verify_table(table, repair)
+        self.last_check = report
+        diffs = sum(r["missing"] + r["extra"] + r["mismatched"] for r in report.values())
+        log = logger.warning if diffs else logger.info
+        log(f"Replica lokal: cek konsistensi {report} ({time.perf_counter() - started:.2f} detik)")
+        return report
+
+    async def _verify_table(self, table, repair):
+        local = await self._in_writer(self._local_hashes, table)
+        stale = []
+        checked = missing = mismatched = 0
+        last_key = None
+        while True:
+            q = supabase.table(table.source).select(table.select).order(table.key).limit(self.batch)
+            if last_key is not None:
+                q = q.gt(table.key, last_key)
+            rows = (await run_query(q)).data or []
+            for row in rows:
+                checked += 1
+                local_hash = local.pop(row[table.key], None)
+                if local_hash is None:
+                    missing += 1
+                    stale.append(row)
+                elif local_hash != row_hash(row, table.columns):
+                    mismatched += 1
+                    stale.append(row)
+            if len(rows) < self.batch:
+                break
+            last_key = rows[-1][table.key]
+        # Sisa `local` = baris yang sudah tidak ada di sumber
+        if repair and (stale or local):
+            await self._in_writer(self._write, table, stale, list(local))
+        return {"checked": checked, "missing": missing, "extra": len(local), "mismatched": mismatched}
+
+    def _local_hashes(self, table):
+        # Di-hash dari isi replica (bukan hash yang disimpan) supaya kerusakan lokal ikut terdeteksi
+        with self._write_lock:
+            cur = self._writer.execute(f"SELECT {','.join(table.columns)} FROM {table.local}")
+            names = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+        out = {}
+        for values in rows:
+            row = dict(zip(names, values))
+            for column in _BOOL_COLUMNS & row.keys():
+                if row[column] is not None:
+                    row[column] = bool(row[column])
+            out[row[table.key]] = row_hash(row, table.columns)
+        return out
+
+    # ---------- baca (koneksi pembaca, < 1 ms dengan index) ----------
+    def _records(self, rows):
+        out = []
+        for r in rows:
+            item = dict(r)
+            for column in _BOOL_COLUMNS & item.keys():
+                if item[column] is not None:
+                    item[column] = bool(item[column])
+            out.append(item)
+        return out
+
+    def service(self, service_id):
+        """Satu baris HostingServices (dict seperti PostgREST) atau None."""
+        rows = self._reader.execute("SELECT * FROM services WHERE id = ?", (service_id,)).fetchall()
+        return self._records(rows)[0] if rows else None
+
+    def services_page(self, start=None, end=None, after=None, limit=20, with_count=False):
+        """Satu halaman urut (expired_date, id), opsional dibatasi bulan [start, end) seperti month_buckets()."""
+        where, params = [], []
+        if start:
+            where.append(_MONTH_SQL)
+            params += [start, end]
+        if after and after[0] is None:
+            # Cursor di bagian NULL (paling akhir): lanjut urut id saja
+            where.append("expired_date IS NULL AND id > ?")
+            params.append(after[1])
+        elif after:
+            where.append("((expired_date, id) > (?, ?) OR expired_date IS NULL)")
+            params += list(after)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+        # NULLS LAST: urutan sama dengan order=expired_date PostgREST
+        rows = self._reader.execute(
+            f"SELECT * FROM services{where_sql} ORDER BY expired_date NULLS LAST, id LIMIT ?", (*params, limit)
+        ).fetchall()
+        return self._records(rows), self._count(start, end) if with_count else None
+
+    def _count(self, start, end):
+        version, counts = self._counts
+        if version != self.version:
+            counts = {}
+            self._counts = (self.version, counts)
+        if (start, end) not in counts:
+            range_sql = f" WHERE {_MONTH_SQL}" if start else ""
+            counts[(start, end)] = self._reader.execute(
+                f"SELECT count(*) FROM services{range_sql}", (start, end) if start else ()
+            ).fetchone()[0]
+        return counts[(start, end)]
+
+    def month_buckets(self):
+        """(month, client_count, sample_client) per bulan, sama dengan RPC hosting_month_buckets."""
+        version, buckets = self._buckets
+        if version != self.version or buckets is None:
+            # Agregat full scan: di-cache sampai replica berubah
+            buckets = [tuple(r) for r in self._reader.execute(
+                "SELECT substr(coalesce(expired_date, tanggal_sewa), 1, 7) AS month,"
+                " count(DISTINCT client_user_id), min(client_user_id)"
+                " FROM services WHERE coalesce(expired_date, tanggal_sewa) IS NOT NULL"
+                " GROUP BY 1 ORDER BY 1"
+            ).fetchall()]
+            self._buckets = (self.version, buckets)
+        return buckets
+
+    def active_services(self, search, offset, limit, with_client=False):
+        """Layanan aktif urut domain, cari awalan domain/provider.
+
+        NOCASE di ORDER BY & LIKE supaya urutan dan hasil sama dengan ilike +
+        order collation Postgres (huruf besar/kecil tidak memisahkan urutan).
+        """
+        sql = "SELECT s.*" + (", c.full_name AS _client_name" if with_client else "") + " FROM services s"
+        if with_client:
+            sql += " LEFT JOIN clients c ON c.user_id = s.client_user_id"
+        sql += " WHERE s.status = 'active'"
+        params = []
+        if search:
+            sql += " AND (s.domain LIKE ? ESCAPE '\\' OR s.provider LIKE ? ESCAPE '\\')"
+            params += [_like_prefix(search)] * 2
+        sql += " ORDER BY s.domain COLLATE NOCASE, s.id LIMIT ? OFFSET ?"
+        records = self._records(self._reader.execute(sql, (*params, limit, offset)).fetchall())
+        if with_client:
+            for item in records:
+                name = item.pop("_client_name")
+                item["HostingClients"] = {"full_name": name} if name is not None else None
+        return records
+
+    def clients_page(self, search, offset, limit):
+        """Klien urut full_name, cari awalan full_name/username (aturan sama dengan active_services)."""
+        sql, params = "SELECT user_id, username, full_name FROM clients", []
+        if search:
+            sql += " WHERE full_name LIKE ? ESCAPE '\\' OR username LIKE ? ESCAPE '\\'"
+            params += [_like_prefix(search)] * 2
+        sql += " ORDER BY full_name COLLATE NOCASE, user_id LIMIT ? OFFSET ?"
+        return [dict(r) for r in self._reader.execute(sql, (*params, limit, offset)).fetchall()]
+
+    def hosted_client_ids(self, user_ids):
+        """Subset user_ids yang punya minimal satu layanan."""
+        if not user_ids:
+            return set()
+        rows = self._reader.execute(
+            f"SELECT DISTINCT client_user_id FROM services WHERE client_user_id IN ({','.join('?' * len(user_ids))})",
+            list(user_ids),
+        ).fetchall()
+        return {r[0] for r in rows}
+
+
+# ✅ Instance global
+local_replica = LocalReplica()
@@ -0,0 +1,127 @@
+# 📍 File: database/proof_archive.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import LOCAL_DB_PATH
+
+
+class ProofArchive:
+    """Catatan arsip bukti transfer di Supabase Storage.
+
+    Dua tabel: proof_archive_files (satu baris per foto Telegram, key
+    file_unique_id, sha256 kosong selama belum terarsip) dan
+    proof_archive_objects (satu baris per isi file, key sha256). Foto yang
+    isinya sama hanya diunggah sekali. Baris yang belum terarsip diantrekan
+    ulang saat bot start, jadi kegagalan/restart tidak menghilangkan bukti.
+    Ini hanya antrean & cache dedup lokal; pemetaan foto ke layanan/klien
+    yang menjadi jejak audit ada di tabel Supabase "PaymentProofs".
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS proof_archive_files ("
+            " file_unique_id TEXT PRIMARY KEY,"
+            " file_id TEXT NOT NULL,"
+            " user_id INTEGER NOT NULL,"
+            " service_id TEXT NOT NULL,"
+            " sha256 TEXT,"
+            " queued_at TEXT NOT NULL,"
+            " archived_at TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS proof_archive_objects ("
+            " sha256 TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " thumb_path TEXT,"
+            " size INTEGER NOT NULL,"
+            " stored_at TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS proof_archive_files_pending_idx"
+            " ON proof_archive_files (queued_at) WHERE sha256 IS NULL"
+        )
+        self._conn.commit()
+
+    def _add(self, user_id, service_id, photos):
+        now = datetime.now().isoformat(timespec="seconds")
+        fresh = []
+        with self._lock, self._conn:
+            for file_id, unique_id in photos:
+                known = self._conn.execute(
+                    "SELECT 1 FROM proof_archive_files WHERE file_unique_id = ?", (unique_id,)
+                ).fetchone()
+                # Foto lama yang dikirim ulang (mis. setelah reject) ikut pindah ke layanan terbarunya
+                self._conn.execute(
+                    "INSERT INTO proof_archive_files (file_unique_id, file_id, user_id, service_id, queued_at)"
+                    " VALUES (?, ?, ?, ?, ?) ON CONFLICT (file_unique_id)"
+                    " DO UPDATE SET user_id = excluded.user_id, service_id = excluded.service_id",
+                    (unique_id, file_id, user_id, str(service_id), now),
+                )
+                if known is None:
+                    fresh.append((file_id, unique_id))
+        return fresh
+
+    def _pending(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT file_id, file_unique_id FROM proof_archive_files WHERE sha256 IS NULL ORDER BY queued_at"
+            ).fetchall()
+
+    def _object(self, sha256):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, thumb_path, size FROM proof_archive_objects WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        return None if row is None else {"path": row[0], "thumb_path": row[1], "size": row[2]}
+
+    def _record(self, file_unique_id, sha256, path, thumb_path, size):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO proof_archive_objects (sha256, path, thumb_path, size, stored_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (sha256, path, thumb_path, size, now),
+            )
+            self._conn.execute(
+                "UPDATE proof_archive_files SET sha256 = ?, archived_at = ? WHERE file_unique_id = ?",
+                (sha256, now, file_unique_id),
+            )
+
+    def _owner(self, file_unique_id):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT user_id, service_id FROM proof_archive_files WHERE file_unique_id = ?", (file_unique_id,)
+            ).fetchone()
+
+    async def add(self, user_id, service_id, photos):
+        """Catat foto [(file_id, file_unique_id)] untuk diarsip; mengembalikan yang belum pernah tercatat."""
+        if not photos:
+            return []
+        return await asyncio.to_thread(self._add, user_id, service_id, photos)
+
+    async def pending(self):
+        """[(file_id, file_unique_id)] yang belum terarsip (gagal / terpotong restart)."""
+        return await asyncio.to_thread(self._pending)
+
+    async def object(self, sha256):
+        """Objek yang sudah tersimpan untuk isi file ini, atau None."""
+        return await asyncio.to_thread(self._object, sha256)
+
+    async def record(self, file_unique_id, sha256, path, thumb_path, size):
+        await asyncio.to_thread(self._record, file_unique_id, sha256, path, thumb_path, size)
+
+    async def owner(self, file_unique_id):
+        """(user_id, service_id) terakhir yang mengirim foto ini, atau None."""
+        return await asyncio.to_thread(self._owner, file_unique_id)
+
+
+# ✅ Instance global
+proof_archive = ProofArchive()
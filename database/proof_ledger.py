@@ -0,0 +1,104 @@
+# 📍 File: database/proof_ledger.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import LOCAL_DB_PATH
+
+
+class ProofLedger:
+    """Bukti transfer yang sudah diteruskan ke admin, key file_unique_id Telegram.
+
+    file_unique_id sama untuk foto yang sama meskipun dikirim ulang/diteruskan,
+    jadi screenshot yang dikirim berkali-kali hanya diproses sekali, juga
+    setelah bot restart. claim() atomik: dua submission berisi foto yang sama
+    yang diproses bersamaan hanya dimenangkan satu. Saat admin menolak
+    pembayaran, catatan layanan itu dilepas lewat release(); claim yang
+    gagal diteruskan ke admin dibatalkan lewat unclaim().
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS proof_ledger ("
+            " file_unique_id TEXT PRIMARY KEY,"
+            " user_id INTEGER NOT NULL,"
+            " service_id TEXT NOT NULL,"
+            " received_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _seen(self, file_unique_ids):
+        placeholders = ",".join("?" * len(file_unique_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT file_unique_id FROM proof_ledger WHERE file_unique_id IN ({placeholders})",
+                list(file_unique_ids),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def _claim(self, user_id, service_id, file_unique_ids):
+        now = datetime.now().isoformat(timespec="seconds")
+        fresh = []
+        with self._lock, self._conn:
+            for uid in file_unique_ids:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO proof_ledger (file_unique_id, user_id, service_id, received_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (uid, user_id, str(service_id), now),
+                )
+                if cur.rowcount:
+                    fresh.append(uid)
+        return fresh
+
+    def _release(self, service_id):
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM proof_ledger WHERE service_id = ?", (str(service_id),))
+        return cur.rowcount
+
+    def _unclaim(self, file_unique_ids):
+        placeholders = ",".join("?" * len(file_unique_ids))
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM proof_ledger WHERE file_unique_id IN ({placeholders})", list(file_unique_ids)
+            )
+
+    def _prune(self, before_day):
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM proof_ledger WHERE received_at < ?", (before_day.isoformat(),))
+        return cur.rowcount
+
+    async def seen(self, file_unique_ids):
+        """Subset file_unique_ids yang sudah pernah diteruskan."""
+        if not file_unique_ids:
+            return set()
+        return await asyncio.to_thread(self._seen, file_unique_ids)
+
+    async def claim(self, user_id, service_id, file_unique_ids):
+        """Catat foto untuk service_id; mengembalikan file_unique_id yang belum pernah tercatat."""
+        if not file_unique_ids:
+            return []
+        return await asyncio.to_thread(self._claim, user_id, service_id, file_unique_ids)
+
+    async def release(self, service_id):
+        """Lepas catatan foto milik service_id (bukti ditolak) supaya bisa dikirim ulang."""
+        return await asyncio.to_thread(self._release, service_id)
+
+    async def unclaim(self, file_unique_ids):
+        """Batalkan claim() untuk foto yang ternyata tidak sampai ke admin."""
+        if file_unique_ids:
+            await asyncio.to_thread(self._unclaim, file_unique_ids)
+
+    async def prune(self, before_day):
+        """Hapus catatan lama; mengembalikan jumlah baris yang dihapus."""
+        return await asyncio.to_thread(self._prune, before_day)
+
+
+# ✅ Instance global
+proof_ledger = ProofLedger()
@@ -0,0 +1,191 @@
+# 📍 File: database/query_tracer.py
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from config import QUERY_TRACE_ENABLED, QUERY_TRACE_REPEAT_THRESHOLD, QUERY_TRACE_FILE
+from lib.metrics import iter_handlers
+
+logger = logging.getLogger(__name__)
+
+_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+# Parameter yang nilainya bagian dari bentuk query (bukan data)
+_SHAPE_KEYS = {"select", "order", "on_conflict", "columns"}
+# Nilai filter di dalam or=(...)/and(...): "kolom.op.nilai" -> "kolom.op.?"
+_FILTER_VALUE = re.compile(r"\.(eq|neq|gt|gte|lt|lte|like|ilike|is|in|not\.\w+)\.(\([^)]*\)|[^,()]+)")
+
+_current = contextvars.ContextVar("query_trace_unit", default=None)
+
+
+def query_shape(query):
+    """Bentuk query tanpa nilai filter, mis. 'select HostingServices select=*&id=eq.?'."""
+    path = getattr(query, "path", "").lstrip("/")
+    operation = "rpc" if path.startswith("rpc/") else _OPERATIONS.get(getattr(query, "http_method", ""), "unknown")
+    parts = []
+    for key, value in getattr(query, "params", {}).multi_items():
+        if key in _SHAPE_KEYS:
+            parts.append(f"{key}={value}")
+        elif key in ("limit", "offset"):
+            parts.append(f"{key}=?")
+        elif key in ("or", "and"):
+            parts.append(f"{key}=" + _FILTER_VALUE.sub(r".\1.?", value))
+        else:
+            op = value.split(".", 1)[0]
+            parts.append(f"{key}={op}.?")
+    return path or "unknown", operation, f"{operation} {path} " + "&".join(sorted(parts))
+
+
+class UnitOfWork:
+    """Semua query Supabase dalam satu update/job."""
+
+    __slots__ = ("name", "started", "queries")
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.queries = []
+
+    def record(self, query, result, seconds, error=None):
+        table, operation, shape = query_shape(query)
+        data = getattr(result, "data", None)
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        self.queries.append({
+            "table": table,
+            "operation": operation,
+            "shape": shape,
+            "filters": dict(getattr(query, "params", {}).multi_items()),
+            "rows": rows,
+            "bytes": len(json.dumps(data, default=str)) if data is not None else 0,
+            "ms": round(seconds * 1000, 3),
+            "error": error,
+        })
+
+    def repeated(self, threshold):
+        counts = Counter(q["shape"] for q in self.queries)
+        return [{"shape": shape, "count": n} for shape, n in counts.most_common() if n > threshold]
+
+    def to_dict(self, threshold):
+        return {
+            "unit": self.name,
+            "started": self.started,
+            "duration_ms": round((time.time() - self.started) * 1000, 3),
+            "query_count": len(self.queries),
+            "repeated": self.repeated(threshold),
+            "queries": self.queries,
+        }
+
+
+class QueryTracer:
+    """Tracer query Supabase per unit kerja (satu update Telegram atau satu job).
+
+    run_query() memanggil record() jika ada unit aktif di context saat ini.
+    Saat unit selesai, bentuk query (tanpa nilai filter) yang berulang lebih
+    dari `threshold` kali di-log sebagai dugaan N+1. Unit terakhir disimpan
+    di memori dan, jika `path` diisi, ditambahkan ke file JSONL.
+    """
+
+    def __init__(self, enabled=QUERY_TRACE_ENABLED, threshold=QUERY_TRACE_REPEAT_THRESHOLD,
+                 path=QUERY_TRACE_FILE, keep=1000):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.path = path
+        self.units = deque(maxlen=keep)
+
+    def record(self, query, result, seconds, error=None):
+        unit = _current.get()
+        if unit is not None:
+            unit.record(query, result, seconds, error)
+
+    def begin(self, name):
+        return _current.set(UnitOfWork(name))
+
+    def end(self, token):
+        unit = _current.get()
+        _current.reset(token)
+        if unit is None or not unit.queries:
+            return
+        trace = unit.to_dict(self.threshold)
+        for item in trace["repeated"]:
+            logger.warning(
+                f"[N+1] {unit.name}: query '{item['shape']}' diulang {item['count']}x dalam satu unit kerja"
+            )
+        self.units.append(trace)
+        if self.path:
+            self._append(self.path, [trace])
+
+    def unit(self, name, func):
+        """Bungkus callback/job async sehingga setiap pemanggilan menjadi satu unit kerja."""
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        async def wrapped(*args, **kwargs):
+            token = self.begin(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.end(token)
+
+        return wrapped
+
+    def trace_application(self, app):
+        """Jadikan setiap callback handler (termasuk di ConversationHandler) satu unit kerja."""
+        if not self.enabled:
+            return
+        for handler, label in iter_handlers(app):
+            if not getattr(handler.callback, "_traced", False):
+                handler.callback = self.unit(label, handler.callback)
+                handler.callback._traced = True
+
+    def dump(self, path):
+        """Tulis semua unit yang masih di memori ke file JSONL."""
+        self._append(path, list(self.units))
+        return len(self.units)
+
+    @staticmethod
+    def _append(path, traces):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            for trace in traces:
+                f.write(json.dumps(trace, default=str) + "\n")
+
+
+# ✅ Instance global
+query_tracer = QueryTracer()
+
+
+def summarize(path, top=20):
+    """Ringkasan file trace: bentuk query paling sering, dan unit dengan pola N+1."""
+    shapes = Counter()
+    shape_ms = Counter()
+    flagged = Counter()
+    units = 0
+    with open(path) as f:
+        for line in f:
+            trace = json.loads(line)
+            units += 1
+            for q in trace["queries"]:
+                shapes[q["shape"]] += 1
+                shape_ms[q["shape"]] += q["ms"]
+            for item in trace["repeated"]:
+                flagged[(trace["unit"], item["shape"])] += 1
+
+    print(f"{units} unit kerja, {sum(shapes.values())} query")
+    print("\nBentuk query terbanyak:")
+    for shape, n in shapes.most_common(top):
+        print(f"  {n:6d}x  {shape_ms[shape] / n:8.2f} ms rata-rata  {shape}")
+    if flagged:
+        print("\nDugaan N+1 (unit, bentuk query):")
+        for (unit, shape), n in flagged.most_common(top):
+            print(f"  {n:6d} unit  {unit}  {shape}")
+
+
+if __name__ == "__main__":
+    # python -m database.query_tracer data/query_trace.jsonl
+    summarize(sys.argv[1])
@@ -0,0 +1,82 @@
+# 📍 File: database/reminder_ledger.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import LOCAL_DB_PATH
+
+# SQLite membatasi jumlah parameter per statement
+_CHUNK = 500
+
+
+class ReminderLedger:
+    """Catatan reminder yang sudah terkirim, key (service_id, reminder_day).
+
+    Disimpan di SQLite lokal supaya restart bot tidak mengirim ulang reminder
+    yang sama di hari yang sama. Lookup dan insert untuk satu run dilakukan
+    sekaligus (batch), bukan per layanan.
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reminder_ledger ("
+            " service_id TEXT NOT NULL,"
+            " reminder_day TEXT NOT NULL,"
+            " sent_at TEXT NOT NULL,"
+            " PRIMARY KEY (service_id, reminder_day))"
+        )
+        self._conn.commit()
+
+    def _sent_ids(self, reminder_day, service_ids):
+        ids = [str(i) for i in service_ids]
+        sent = set()
+        with self._lock:
+            for start in range(0, len(ids), _CHUNK):
+                chunk = ids[start:start + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT service_id FROM reminder_ledger WHERE reminder_day = ? AND service_id IN ({placeholders})",
+                    [reminder_day.isoformat(), *chunk],
+                ).fetchall()
+                sent.update(r[0] for r in rows)
+        return sent
+
+    def _record(self, reminder_day, service_ids):
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [(str(i), reminder_day.isoformat(), now) for i in service_ids]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reminder_ledger (service_id, reminder_day, sent_at) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def _prune(self, before_day):
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM reminder_ledger WHERE reminder_day < ?", (before_day.isoformat(),))
+        return cur.rowcount
+
+    async def sent_ids(self, reminder_day, service_ids):
+        """Set service_id (str) yang sudah dikirimi reminder pada reminder_day."""
+        if not service_ids:
+            return set()
+        return await asyncio.to_thread(self._sent_ids, reminder_day, service_ids)
+
+    async def record(self, reminder_day, service_ids):
+        """Catat reminder terkirim untuk banyak layanan dalam satu transaksi."""
+        if service_ids:
+            await asyncio.to_thread(self._record, reminder_day, service_ids)
+
+    async def prune(self, before_day):
+        """Hapus catatan lama; mengembalikan jumlah baris yang dihapus."""
+        return await asyncio.to_thread(self._prune, before_day)
+
+
+# ✅ Instance global
+reminder_ledger = ReminderLedger()
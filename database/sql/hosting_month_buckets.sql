@@ -0,0 +1,18 @@
+-- 📍 File: database/sql/hosting_month_buckets.sql
+-- RPC untuk menu filter /listhosting: satu baris per bulan expired/tanggal sewa.
+-- Jalankan sekali di Supabase SQL editor.
+
+create or replace function hosting_month_buckets()
+returns table (month text, client_count bigint, sample_client bigint)
+language sql
+stable
+as $$
+    select
+        to_char(coalesce(expired_date, tanggal_sewa), 'YYYY-MM') as month,
+        count(distinct client_user_id) as client_count,
+        min(client_user_id) as sample_client
+    from "HostingServices"
+    where coalesce(expired_date, tanggal_sewa) is not null
+    group by 1
+    order by 1;
+$$;
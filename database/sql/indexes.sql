@@ -0,0 +1,15 @@
+-- 📍 File: database/sql/indexes.sql
+-- Jalankan sekali di Supabase SQL editor.
+
+-- Reminder planner: filter rentang tanggal untuk layanan aktif yang belum approved
+create index if not exists hosting_services_reminder_expired_idx
+    on "HostingServices" (expired_date)
+    where status = 'active' and approved_date is null;
+
+create index if not exists hosting_services_reminder_approved_idx
+    on "HostingServices" (approved_date)
+    where status = 'active';
+
+-- List hosting admin: keyset pagination (expired_date, id)
+create index if not exists hosting_services_expired_id_idx
+    on "HostingServices" (expired_date, id);
@@ -0,0 +1,26 @@
+-- 📍 File: database/sql/proof_archive_bucket.sql
+-- Jalankan sekali di Supabase SQL editor sebelum PROOF_ARCHIVE_ENABLED=true.
+
+-- Bucket privat arsip bukti transfer (lib/proof_archiver.py); bot memakai service key
+-- sehingga tidak butuh policy tambahan. Objek content-addressed, tidak pernah ditimpa.
+insert into storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+values ('payment-proofs', 'payment-proofs', false, 20971520, array['image/jpeg'])
+on conflict (id) do nothing;
+
+-- Pemetaan foto -> layanan/klien -> objek di bucket. Objek content-addressed (path
+-- dari sha256), jadi tanpa tabel ini arsip tidak bisa dikaitkan ke pembayaran.
+-- Satu baris per foto Telegram; decision diisi saat admin approve/reject.
+create table if not exists "PaymentProofs" (
+    file_unique_id text primary key,
+    service_id text not null,
+    user_id bigint not null,
+    sha256 text,
+    path text,
+    thumb_path text,
+    size bigint,
+    submitted_at timestamptz not null default now(),
+    archived_at timestamptz,
+    decision text,
+    decided_at timestamptz
+);
+create index if not exists payment_proofs_service_idx on "PaymentProofs" (service_id, submitted_at);
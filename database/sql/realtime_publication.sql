@@ -0,0 +1,5 @@
+-- 📍 File: database/sql/realtime_publication.sql
+-- Jalankan sekali di Supabase SQL editor sebelum REALTIME_ENABLED=true.
+
+-- Kirim perubahan kedua tabel ke Supabase Realtime (lib/change_feed.py)
+alter publication supabase_realtime add table "HostingServices", "HostingClients";
@@ -0,0 +1,30 @@
+-- 📍 File: database/sql/replica_updated_at.sql
+-- Kolom updated_at untuk sync inkremental replica lokal (REPLICA_ENABLED).
+-- Jalankan sekali di Supabase SQL editor. Baris lama terisi now() saat kolom dibuat.
+
+alter table "HostingServices" add column if not exists updated_at timestamptz not null default now();
+alter table "HostingClients" add column if not exists updated_at timestamptz not null default now();
+
+create or replace function touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+drop trigger if exists hosting_services_touch on "HostingServices";
+create trigger hosting_services_touch
+    before update on "HostingServices"
+    for each row execute function touch_updated_at();
+
+drop trigger if exists hosting_clients_touch on "HostingClients";
+create trigger hosting_clients_touch
+    before update on "HostingClients"
+    for each row execute function touch_updated_at();
+
+-- Sync: keyset (updated_at, pk) sejak watermark
+create index if not exists hosting_services_updated_at_idx on "HostingServices" (updated_at, id);
+create index if not exists hosting_clients_updated_at_idx on "HostingClients" (updated_at, user_id);
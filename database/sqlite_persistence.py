@@ -0,0 +1,236 @@
+# 📍 File: database/sqlite_persistence.py
+
+import asyncio
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from telegram.ext import BasePersistence, PersistenceInput
+from config import LOCAL_DB_PATH, PERSISTENCE_FLUSH_INTERVAL, SESSION_TTL
+from lib.session_store import STORES
+
+logger = logging.getLogger(__name__)
+
+
+class SQLitePersistence(BasePersistence):
+    """Persistence PTB di SQLite (WAL) dengan write-behind.
+
+    Semua update_*/drop_* hanya ditampung di memori; perubahan ditulis ke
+    SQLite dalam satu transaksi oleh task latar belakang setiap
+    PERSISTENCE_FLUSH_INTERVAL detik (dan saat shutdown lewat flush()), di
+    thread terpisah. Jalur update tidak pernah menunggu disk.
+
+    Selain data PTB (conversation, user/chat/bot data), isi SessionStore
+    (temp_data, temp_delete, list_state) juga ikut disimpan dan dipulihkan.
+    Setiap baris menyimpan waktu tulis (saved_at) supaya saat restart entri
+    yang TTL-nya sudah lewat dibuang, bukan dipulihkan seolah masih baru.
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH, flush_interval=PERSISTENCE_FLUSH_INTERVAL, store_data=None):
+        super().__init__(
+            store_data=store_data or PersistenceInput(callback_data=False),
+            update_interval=flush_interval,
+        )
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ptb_data ("
+            " kind TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " saved_at REAL,"
+            " PRIMARY KEY (kind, key))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(ptb_data)")}
+        if "saved_at" not in columns:
+            # Database lama: baris tanpa saved_at dianggap sudah kedaluwarsa saat restore
+            self._conn.execute("ALTER TABLE ptb_data ADD COLUMN saved_at REAL")
+        self._conn.commit()
+        # (kind, key) -> (bytes hasil pickle, saved_at), atau None untuk dihapus
+        self._pending = {}
+        self._writer_task = None
+        # Hasil restore session: nama store -> key yang dibuang karena kedaluwarsa
+        self._sessions_restored = False
+        self._expired_sessions = {}
+        for store in STORES.values():
+            store.track_changes = True
+
+    # ---------- SQLite (dijalankan di thread) ----------
+    def _load(self, kind):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, saved_at FROM ptb_data WHERE kind = ?", (kind,)
+            ).fetchall()
+        return [(key, pickle.loads(value), saved_at) for key, value, saved_at in rows]
+
+    def _load_prefix(self, prefix):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, key, value, saved_at FROM ptb_data WHERE kind LIKE ?", (prefix + "%",)
+            ).fetchall()
+        return [(kind, key, pickle.loads(value), saved_at) for kind, key, value, saved_at in rows]
+
+    def _write(self, pending):
+        upserts = [(kind, key, *value) for (kind, key), value in pending.items() if value is not None]
+        deletes = [(kind, key) for (kind, key), value in pending.items() if value is None]
+        with self._lock, self._conn:
+            if upserts:
+                self._conn.executemany("INSERT OR REPLACE INTO ptb_data (kind, key, value, saved_at) VALUES (?, ?, ?, ?)", upserts)
+            if deletes:
+                self._conn.executemany("DELETE FROM ptb_data WHERE kind = ? AND key = ?", deletes)
+
+    # ---------- write-behind ----------
+    def _stage(self, kind, key, value):
+        self._pending[(kind, key)] = None if value is None else (pickle.dumps(value), time.time())
+
+    def _stage_sessions(self):
+        now = time.time()
+        for name, store in STORES.items():
+            changed, deleted = store.drain_changes()
+            kind = f"session:{name}"
+            for key in deleted:
+                self._pending[(kind, json.dumps(key))] = None
+            for key, value in changed.items():
+                self._pending[(kind, json.dumps(key))] = (pickle.dumps(value), now)
+
+    async def _writer_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush_pending()
+
+    async def _flush_pending(self):
+        self._stage_sessions()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await asyncio.to_thread(self._write, pending)
+        except Exception as e:
+            logger.error(f"Gagal menulis persistence ke SQLite: {e}", exc_info=True)
+            # Kembalikan supaya dicoba lagi di flush berikutnya (yang lebih baru menang)
+            self._pending = {**pending, **self._pending}
+
+    # ---------- startup ----------
+    async def start(self):
+        """Pulihkan session lalu jalankan writer latar belakang; dipanggil dari post_init."""
+        await asyncio.to_thread(self.restore_sessions)
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+    def restore_sessions(self):
+        """Pulihkan semua SessionStore dari SQLite dengan sisa TTL masing-masing.
+
+        Entri yang TTL-nya sudah habis selama bot mati dibuang (juga dari
+        SQLite) dan key-nya dicatat, supaya get_conversations ikut membuang
+        conversation yang datanya sudah hilang. Hanya berjalan sekali.
+        """
+        if self._sessions_restored:
+            return
+        self._sessions_restored = True
+        now = time.time()
+        restored = expired = 0
+        grouped = {}
+        for kind, key, value, saved_at in self._load_prefix("session:"):
+            grouped.setdefault(kind[len("session:"):], []).append((key, value, saved_at))
+        for name, rows in grouped.items():
+            store = STORES.get(name)
+            if store is None:
+                continue
+            items = []
+            for key, value, saved_at in rows:
+                ttl_left = store.ttl - (now - saved_at) if saved_at is not None else 0
+                if ttl_left <= 0:
+                    self._expired_sessions.setdefault(name, set()).add(json.loads(key))
+                    self._pending[(f"session:{name}", key)] = None
+                    expired += 1
+                else:
+                    items.append((json.loads(key), value, ttl_left))
+            store.restore(items)
+            restored += len(items)
+        logger.info(f"Persistence: {restored} session dipulihkan dari SQLite, {expired} kedaluwarsa dibuang")
+
+    # ---------- BasePersistence ----------
+    async def get_user_data(self):
+        return {int(k): v for k, v, _ in await asyncio.to_thread(self._load, "user")}
+
+    async def get_chat_data(self):
+        return {int(k): v for k, v, _ in await asyncio.to_thread(self._load, "chat")}
+
+    async def get_bot_data(self):
+        rows = await asyncio.to_thread(self._load, "bot")
+        return rows[0][1] if rows else {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        """State conversation, tanpa yang sudah kedaluwarsa selama bot mati.
+
+        Dibuang jika aktivitas terakhirnya lebih lama dari SESSION_TTL (sama
+        dengan conversation_timeout, yang tidak dijadwalkan ulang setelah
+        restart), atau jika entri SessionStore bernama sama milik user itu
+        kedaluwarsa saat restore. Dipanggil PTB saat initialize, sebelum
+        post_init, jadi session dipulihkan lebih dulu di sini.
+        """
+        await asyncio.to_thread(self.restore_sessions)
+        rows = await asyncio.to_thread(self._load, f"conv:{name}")
+        expired_users = self._expired_sessions.get(name, set())
+        now = time.time()
+        conversations = {}
+        for k, v, saved_at in rows:
+            key = tuple(json.loads(k))
+            if saved_at is None or now - saved_at >= SESSION_TTL or key[-1] in expired_users:
+                self._pending[(f"conv:{name}", k)] = None
+                continue
+            conversations[key] = v
+        dropped = len(rows) - len(conversations)
+        if dropped:
+            logger.info(f"Persistence: {dropped} conversation {name} kedaluwarsa dibuang")
+        return conversations
+
+    async def update_conversation(self, name, key, new_state):
+        self._stage(f"conv:{name}", json.dumps(list(key)), new_state)
+
+    async def update_user_data(self, user_id, data):
+        self._stage("user", str(user_id), data)
+
+    async def update_chat_data(self, chat_id, data):
+        self._stage("chat", str(chat_id), data)
+
+    async def update_bot_data(self, data):
+        self._stage("bot", "", data)
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        self._stage("chat", str(chat_id), None)
+
+    async def drop_user_data(self, user_id):
+        self._stage("user", str(user_id), None)
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def flush(self):
+        """Dipanggil PTB saat shutdown: tulis semua perubahan yang tersisa."""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+        await self._flush_pending()
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,45 @@
 # 📍 File: database/supabase_client.py
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client
-from config import SUPABASE_URL, SUPABASE_KEY
+from config import SUPABASE_URL, SUPABASE_KEY, DB_MAX_WORKERS, METRICS_ENABLED
+from lib.metrics import track_query
+from database.query_tracer import query_tracer
 
 # ✅ Inisialisasi Supabase client
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# ✅ Thread pool khusus query Supabase.
+# Client supabase-py bersifat sinkron (HTTP blocking), jadi setiap .execute()
+# dijalankan di thread terpisah supaya event loop PTB tidak ikut berhenti.
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="supabase")
+
+
+async def run_query(query):
+    """Jalankan query builder Supabase (tanpa .execute()) di thread pool.
+
+    Contoh:
+        result = await run_query(supabase.table("HostingClients").select("user_id"))
+    """
+    loop = asyncio.get_running_loop()
+    if query_tracer.enabled:
+        return await _traced(query, loop)
+    if METRICS_ENABLED:
+        return await track_query(query, loop.run_in_executor(_executor, query.execute))
+    return await loop.run_in_executor(_executor, query.execute)
+
+
+async def _traced(query, loop):
+    awaitable = loop.run_in_executor(_executor, query.execute)
+    if METRICS_ENABLED:
+        awaitable = track_query(query, awaitable)
+    start = time.perf_counter()
+    try:
+        result = await awaitable
+    except Exception as e:
+        query_tracer.record(query, None, time.perf_counter() - start, error=repr(e))
+        raise
+    query_tracer.record(query, result, time.perf_counter() - start)
+    return result
@@ -5,10 +5,17 @@ from telegram.ext import (
     ContextTypes, ConversationHandler, CommandHandler,
     CallbackQueryHandler, MessageHandler, filters
 )
-from database.supabase_client import supabase
+from database.supabase_client import supabase, run_query
+from database.models import HostingService
+from database.local_replica import local_replica
 import logging
-from datetime import datetime
-from config import ADMIN_IDS
+from config import ADMIN_IDS, PERSISTENCE_ENABLED, SESSION_TTL
+from lib.reminder_planner import reminder_planner
+from lib.search_index import search_index
+from lib.session_store import SessionStore
+from lib.paged_picker import PagedPicker, ilike_prefix
+from lib.telegram_utils import session_expired, timeout_state
+from lib.validators import SERVICE_TYPES, parse_date, parse_price
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +25,49 @@ logger = logging.getLogger(__name__)
     INPUT_SELL
 ) = range(7)
 
-temp_data = {}
+temp_data = SessionStore("add_hosting")
 
 back_button = InlineKeyboardMarkup(
     [[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
 )
 
+CLIENT_PICKER_TEXT = "Pilih klien untuk ditambahkan hosting:\n(ketik awalan nama untuk mencari)"
+
+
+async def _fetch_clients(search, offset, limit):
+    if local_replica.ready:
+        return local_replica.clients_page(search, offset, limit)
+    q = supabase.table("HostingClients").select("user_id, full_name").order("full_name").order("user_id") \
+        .range(offset, offset + limit - 1)
+    if search:
+        pattern = ilike_prefix(search)
+        q = q.or_(f"full_name.ilike.{pattern},username.ilike.{pattern}")
+    result = await run_query(q)
+    return result.data or []
+
+
+async def _client_buttons(users):
+    # Tanda ✅ hanya dicek untuk klien di halaman ini
+    user_ids = [u["user_id"] for u in users]
+    hosted_user_ids = set()
+    if local_replica.ready:
+        hosted_user_ids = local_replica.hosted_client_ids(user_ids)
+    elif user_ids:
+        existing = await run_query(
+            supabase.table("HostingServices").select("client_user_id").in_("client_user_id", user_ids)
+        )
+        hosted_user_ids = {h["client_user_id"] for h in existing.data}
+    return [
+        (f"{'✅ ' if u['user_id'] in hosted_user_ids else ''}{u['full_name']}", str(u["user_id"]))
+        for u in users
+    ]
+
+
+client_picker = PagedPicker(
+    "addpick", _fetch_clients, _client_buttons,
+    footer=[[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
+)
+
 # Handler tombol back ke menu
 async def back_to_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -46,34 +90,41 @@ async def add_hosting_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.callback_query.message.reply_text("❌ Akses ditolak. Khusus admin.")
         return ConversationHandler.END
 
-    result = supabase.table("HostingClients").select("user_id, full_name").execute()
-    users = result.data
-
-    logger.info(f"Ditemukan {len(users) if users else 0} user di HostingClients")
+    client_picker.reset(user_id)
+    markup, count, _ = await client_picker.render(user_id)
+    logger.info(f"Picker klien halaman pertama: {count} user")
 
-    if not users:
+    if not count:
         await (update.message or update.callback_query.message).reply_text("⚠️ Belum ada user yang /start.")
         return ConversationHandler.END
 
-    existing_hostings = supabase.table("HostingServices").select("client_user_id").execute()
-    hosted_user_ids = set(h["client_user_id"] for h in existing_hostings.data)
-    logger.info(f"Ditemukan {len(hosted_user_ids)} user yang sudah punya hosting")
-
-    keyboard = [
-        [InlineKeyboardButton(
-            f"{'✅ ' if u['user_id'] in hosted_user_ids else ''}{u['full_name']}",
-            callback_data=str(u["user_id"])
-        )]
-        for u in users
-    ]
-    keyboard.append([InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")])
-
     await (update.message or update.callback_query.message).reply_text(
-        "Pilih klien untuk ditambahkan hosting:",
-        reply_markup=InlineKeyboardMarkup(keyboard)
+        CLIENT_PICKER_TEXT,
+        reply_markup=markup
     )
     return CHOOSING_USER
 
+# Navigasi halaman picker klien
+async def client_picker_nav(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    client_picker.handle_callback(query.from_user.id, query.data)
+    markup, _, search = await client_picker.render(query.from_user.id)
+    text = CLIENT_PICKER_TEXT + (f"\n🔍 Hasil pencarian: {search}" if search else "")
+    await query.edit_message_text(text, reply_markup=markup)
+    return CHOOSING_USER
+
+# Pencarian klien: admin mengetik awalan nama / username
+async def client_picker_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+    client_picker.set_search(user_id, update.message.text)
+    markup, count, search = await client_picker.render(user_id)
+    if not count:
+        await update.message.reply_text(f"⚠️ Tidak ada klien dengan nama \"{search}\".", reply_markup=markup)
+        return CHOOSING_USER
+    await update.message.reply_text(f"{CLIENT_PICKER_TEXT}\n🔍 Hasil pencarian: {search}", reply_markup=markup)
+    return CHOOSING_USER
+
 # Handler pilih user
 async def choose_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -95,6 +146,8 @@ async def choose_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def input_provider(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     logger.info(f"input_provider dipanggil oleh user_id={user_id} dengan input={update.message.text}")
     temp_data[user_id]["provider"] = update.message.text
     await update.message.reply_text("Masukkan domain:", reply_markup=back_button)
@@ -102,9 +155,11 @@ async def input_provider(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def input_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     logger.info(f"input_domain dipanggil oleh user_id={user_id} dengan input={update.message.text}")
     temp_data[user_id]["domain"] = update.message.text
-    keyboard = [[InlineKeyboardButton(x, callback_data=x)] for x in ["hosting", "domain", "VPS", "email"]]
+    keyboard = [[InlineKeyboardButton(x, callback_data=x)] for x in SERVICE_TYPES]
     keyboard.append([InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")])
     await update.message.reply_text("Pilih jenis layanan:", reply_markup=InlineKeyboardMarkup(keyboard))
     return INPUT_SERVICE_TYPE
@@ -113,6 +168,8 @@ async def input_service_type(update: Update, context: ContextTypes.DEFAULT_TYPE)
     query = update.callback_query
     await query.answer()
     user_id = query.from_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     logger.info(f"input_service_type dipanggil oleh user_id={user_id} dengan input={query.data}")
     temp_data[user_id]["service_type"] = query.data
     await query.edit_message_text(
@@ -123,21 +180,24 @@ async def input_service_type(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def input_tanggal_sewa(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     logger.info(f"input_tanggal_sewa dipanggil oleh user_id={user_id} dengan input={update.message.text}")
     try:
-        datetime.strptime(update.message.text, "%Y-%m-%d")
-    except ValueError:
-        await update.message.reply_text("⚠️ Format tanggal salah. Contoh: 2025-12-01", reply_markup=back_button)
+        temp_data[user_id]["tanggal_sewa"] = parse_date(update.message.text)
+    except ValueError as e:
+        await update.message.reply_text(f"⚠️ {e}", reply_markup=back_button)
         return INPUT_TANGGAL_SEWA
-    temp_data[user_id]["tanggal_sewa"] = update.message.text
     await update.message.reply_text("Masukkan harga beli:", reply_markup=back_button)
     return INPUT_BUY
 
 async def input_buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     logger.info(f"input_buy dipanggil oleh user_id={user_id} dengan input={update.message.text}")
     try:
-        temp_data[user_id]["price_buy"] = float(update.message.text)
+        temp_data[user_id]["price_buy"] = parse_price(update.message.text)
     except ValueError:
         await update.message.reply_text("⚠️ Masukkan angka (contoh: 100000)", reply_markup=back_button)
         return INPUT_BUY
@@ -148,9 +208,11 @@ async def input_buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def input_sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     logger.info(f"input_sell dipanggil oleh user_id={user_id} dengan input={update.message.text}")
     try:
-        temp_data[user_id]["price_sell"] = float(update.message.text)
+        temp_data[user_id]["price_sell"] = parse_price(update.message.text)
     except ValueError:
         await update.message.reply_text("⚠️ Masukkan angka (contoh: 200000)", reply_markup=back_button)
         return INPUT_SELL
@@ -165,7 +227,11 @@ async def input_sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
     data = temp_data.pop(user_id)
 
     # Simpan ke database
-    supabase.table("HostingServices").insert(data).execute()
+    result = await run_query(supabase.table("HostingServices").insert(data))
+    reminder_planner.invalidate()
+    for row in result.data or []:
+        search_index.upsert_service(HostingService.from_row(row))
+        local_replica.upsert("HostingServices", row)
     logger.info(f"Hosting berhasil disimpan untuk user_id={user_id} dengan data: {data}")
 
     # Kirim notifikasi ke client yang baru ditambahkan hosting
@@ -217,7 +283,9 @@ def get_add_hosting_handler():
         states={
             CHOOSING_USER: [
                 CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$"),
+                CallbackQueryHandler(client_picker_nav, pattern=client_picker.pattern),
                 CallbackQueryHandler(choose_user),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, client_picker_search),
             ],
             INPUT_PROVIDER: [
                 MessageHandler(filters.TEXT & ~filters.COMMAND, input_provider),
@@ -243,7 +311,12 @@ def get_add_hosting_handler():
                 MessageHandler(filters.TEXT & ~filters.COMMAND, input_sell),
                 CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$")
             ],
+            **timeout_state(),
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        # Sama dengan TTL temp_data: percakapan tidak tertinggal di state yang datanya sudah hilang
+        conversation_timeout=SESSION_TTL,
         per_message=False,
+        name="add_hosting",
+        persistent=PERSISTENCE_ENABLED,
     )
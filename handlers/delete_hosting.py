@@ -4,24 +4,49 @@ import logging
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes, ConversationHandler, CallbackQueryHandler,
+    MessageHandler, filters,
 )
-from database.supabase_client import supabase
+from database.supabase_client import supabase, run_query
+from database.local_replica import local_replica
 from handlers.admin_menu import show_admin_menu
-from config import ADMIN_IDS
+from config import ADMIN_IDS, PERSISTENCE_ENABLED, SESSION_TTL
+from lib.reminder_planner import reminder_planner
+from lib.search_index import search_index
+from lib.session_store import SessionStore
+from lib.paged_picker import PagedPicker, active_services_fetcher
+from lib.telegram_utils import session_expired, timeout_state
 
 logger = logging.getLogger(__name__)
 
 CHOOSING_HOSTING, CONFIRM_DELETE = range(2)
 
 # Simpan data sementara pilihan hosting user
-temp_delete = {}
+temp_delete = SessionStore("delete_hosting")
 
 back_button = InlineKeyboardMarkup(
     [[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
 )
 
+HOSTING_PICKER_TEXT = "Pilih hosting yang ingin dihapus:\n(ketik awalan domain/provider untuk mencari)"
+
+
+async def _hosting_buttons(rows):
+    return [
+        (f"{h['provider']} - {h['domain']} ({h['service_type']})", f"deletehosting_{h['id']}")
+        for h in rows
+    ]
+
+
+hosting_picker = PagedPicker(
+    "delpick",
+    active_services_fetcher("id, provider, domain, service_type, status"),
+    _hosting_buttons,
+    footer=[[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
+)
+
+
 async def delete_hosting_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Menampilkan daftar hosting aktif yang bisa dihapus."""
+    """Menampilkan daftar hosting aktif (berhalaman) yang bisa dihapus."""
     query = update.callback_query
     await query.answer()
     user_id = query.from_user.id
@@ -31,27 +56,37 @@ async def delete_hosting_start(update: Update, context: ContextTypes.DEFAULT_TYP
         logger.warning(f"delete_hosting_start akses ditolak user_id={user_id}")
         return ConversationHandler.END
 
-    result = supabase.table("HostingServices") \
-        .select("id, provider, domain, service_type, status") \
-        .eq("status", "active") \
-        .execute()
-    hostings = result.data
+    hosting_picker.reset(user_id)
+    markup, count, _ = await hosting_picker.render(user_id)
 
-    if not hostings:
+    if not count:
         await query.edit_message_text("⚠️ Tidak ada hosting aktif yang bisa dihapus.", reply_markup=back_button)
         return ConversationHandler.END
 
-    keyboard = [
-        [InlineKeyboardButton(f"{h['provider']} - {h['domain']} ({h['service_type']})",
-                              callback_data=f"deletehosting_{h['id']}")]
-        for h in hostings
-    ]
-    keyboard.append([InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")])
+    await query.edit_message_text(HOSTING_PICKER_TEXT, reply_markup=markup)
+    return CHOOSING_HOSTING
 
-    await query.edit_message_text(
-        "Pilih hosting yang ingin dihapus:",
-        reply_markup=InlineKeyboardMarkup(keyboard)
-    )
+
+async def hosting_picker_nav(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Navigasi halaman / reset pencarian picker hosting."""
+    query = update.callback_query
+    await query.answer()
+    hosting_picker.handle_callback(query.from_user.id, query.data)
+    markup, _, search = await hosting_picker.render(query.from_user.id)
+    text = HOSTING_PICKER_TEXT + (f"\n🔍 Hasil pencarian: {search}" if search else "")
+    await query.edit_message_text(text, reply_markup=markup)
+    return CHOOSING_HOSTING
+
+
+async def hosting_picker_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cari hosting berdasarkan awalan domain atau provider."""
+    user_id = update.effective_user.id
+    hosting_picker.set_search(user_id, update.message.text)
+    markup, count, search = await hosting_picker.render(user_id)
+    if not count:
+        await update.message.reply_text(f"⚠️ Tidak ada hosting dengan domain/provider \"{search}\".", reply_markup=markup)
+        return CHOOSING_HOSTING
+    await update.message.reply_text(f"{HOSTING_PICKER_TEXT}\n🔍 Hasil pencarian: {search}", reply_markup=markup)
     return CHOOSING_HOSTING
 
 
@@ -91,13 +126,15 @@ async def confirm_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     hosting_id = temp_delete.get(user_id)
     if not hosting_id:
-        await query.edit_message_text("❌ Data hosting tidak ditemukan, batalkan operasi.")
-        return ConversationHandler.END
+        return await session_expired(update)
 
     try:
-        res = supabase.table("HostingServices").delete().eq("id", hosting_id).execute()
+        res = await run_query(supabase.table("HostingServices").delete().eq("id", hosting_id))
 
         if res.data:  # ✅ Cek data terhapus
+            reminder_planner.invalidate()
+            search_index.remove_service(hosting_id)
+            local_replica.remove("HostingServices", hosting_id)
             logger.info(f"Hosting dengan id={hosting_id} berhasil dihapus oleh admin user_id={user_id}")
             await query.edit_message_text("✅ Hosting berhasil dihapus.", reply_markup=back_button)
         else:
@@ -138,14 +175,21 @@ def get_delete_hosting_handler():
         states={
             CHOOSING_HOSTING: [
                 CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$"),
+                CallbackQueryHandler(hosting_picker_nav, pattern=hosting_picker.pattern),
                 CallbackQueryHandler(choose_hosting, pattern="^deletehosting_"),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, hosting_picker_search),
             ],
             CONFIRM_DELETE: [
                 CallbackQueryHandler(confirm_delete, pattern="^confirm_delete$"),
                 CallbackQueryHandler(cancel_delete, pattern="^cancel_delete$"),
                 CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$"),
             ],
+            **timeout_state(),
         },
         fallbacks=[CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$")],
+        # Sama dengan TTL temp_delete: percakapan tidak tertinggal di state yang datanya sudah hilang
+        conversation_timeout=SESSION_TTL,
         per_message=False,
+        name="delete_hosting",
+        persistent=PERSISTENCE_ENABLED,
     )
@@ -1,13 +1,20 @@
 # 📍 File: handlers/edit_hosting.py
 import logging
-from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ContextTypes, ConversationHandler, CallbackQueryHandler,
     MessageHandler, filters, CommandHandler
 )
-from database.supabase_client import supabase
-from config import ADMIN_IDS
+from database.supabase_client import supabase, run_query
+from database.models import HostingService
+from database.local_replica import local_replica
+from config import ADMIN_IDS, PERSISTENCE_ENABLED, SESSION_TTL
+from lib.reminder_planner import reminder_planner
+from lib.search_index import search_index
+from lib.session_store import SessionStore
+from lib.paged_picker import PagedPicker, active_services_fetcher
+from lib.telegram_utils import session_expired, timeout_state
+from lib.validators import SERVICE_TYPES, is_valid, parse_date, parse_price
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +29,30 @@ logger = logging.getLogger(__name__)
     INPUT_SELL
 ) = range(8)  # sudah dihapus INPUT_NOTES
 
-temp_data = {}
+temp_data = SessionStore("edit_hosting")
 
 # Tombol kembali
 back_button = InlineKeyboardMarkup(
     [[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
 )
 
+HOSTING_PICKER_TEXT = "Pilih hosting yang akan diedit:\n(ketik awalan domain/provider untuk mencari)"
+
+
+async def _hosting_buttons(rows):
+    return [
+        (f"{(h.get('HostingClients') or {}).get('full_name', '-')} | {h['provider']} | {h['domain']}", str(h["id"]))
+        for h in rows
+    ]
+
+
+hosting_picker = PagedPicker(
+    "editpick",
+    active_services_fetcher("id, provider, domain, service_type, HostingClients(full_name)"),
+    _hosting_buttons,
+    footer=[[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
+)
+
 async def back_to_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
@@ -60,23 +84,35 @@ async def edit_hosting_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await query.message.reply_text("❌ Akses ditolak. Khusus admin.")
         return ConversationHandler.END
 
-    result = supabase.table("HostingServices").select(
-        "id, provider, domain, service_type, expired_date, price_buy, price_sell, status, HostingClients(full_name)"
-    ).eq("status", "active").execute()
+    hosting_picker.reset(user_id)
+    markup, count, _ = await hosting_picker.render(user_id)
 
-    if not result.data:
+    if not count:
         await query.message.reply_text("⚠️ Tidak ada hosting aktif yang ditemukan.")
         return ConversationHandler.END
 
-    keyboard = [
-        [InlineKeyboardButton(
-            f"{h['HostingClients']['full_name']} | {h['provider']} | {h['domain']}",
-            callback_data=h["id"]
-        )] for h in result.data
-    ]
-    keyboard.append([InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")])
+    await query.edit_message_text(HOSTING_PICKER_TEXT, reply_markup=markup)
+    return CHOOSING_HOSTING
 
-    await query.edit_message_text("Pilih hosting yang akan diedit:", reply_markup=InlineKeyboardMarkup(keyboard))
+# Navigasi halaman picker hosting
+async def hosting_picker_nav(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    hosting_picker.handle_callback(query.from_user.id, query.data)
+    markup, _, search = await hosting_picker.render(query.from_user.id)
+    text = HOSTING_PICKER_TEXT + (f"\n🔍 Hasil pencarian: {search}" if search else "")
+    await query.edit_message_text(text, reply_markup=markup)
+    return CHOOSING_HOSTING
+
+# Pencarian hosting: awalan domain atau provider
+async def hosting_picker_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+    hosting_picker.set_search(user_id, update.message.text)
+    markup, count, search = await hosting_picker.render(user_id)
+    if not count:
+        await update.message.reply_text(f"⚠️ Tidak ada hosting dengan domain/provider \"{search}\".", reply_markup=markup)
+        return CHOOSING_HOSTING
+    await update.message.reply_text(f"{HOSTING_PICKER_TEXT}\n🔍 Hasil pencarian: {search}", reply_markup=markup)
     return CHOOSING_HOSTING
 
 async def choose_hosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -85,30 +121,42 @@ async def choose_hosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     hosting_id = query.data
     user_id = query.from_user.id
 
-    result = supabase.table("HostingServices").select("*").eq("id", hosting_id).single().execute()
-    if not result.data:
+    if local_replica.ready:
+        row = local_replica.service(hosting_id)
+    else:
+        row = (await run_query(supabase.table("HostingServices").select("*").eq("id", hosting_id).single())).data
+    if not row:
         await query.edit_message_text("❌ Data hosting tidak ditemukan.")
         return ConversationHandler.END
 
+    svc = HostingService.from_row(row)
     temp_data[user_id] = {
         "hosting_id": hosting_id,
-        "provider": result.data.get("provider") or "",
-        "domain": result.data.get("domain") or "",
-        "service_type": result.data.get("service_type") or "",
-        "tanggal_sewa": result.data.get("tanggal_sewa") or "",  # <-- ubah di sini
-        "price_buy": result.data.get("price_buy") or 0,
-        "price_sell": result.data.get("price_sell") or 0
+        "provider": svc.provider or "",
+        "domain": svc.domain or "",
+        "service_type": svc.service_type or "",
+        "tanggal_sewa": svc.tanggal_sewa.isoformat() if svc.tanggal_sewa else "",
+        "price_buy": svc.price_buy or 0,
+        "price_sell": svc.price_sell or 0
     }
 
 
     await query.edit_message_text("Pilih bagian yang ingin diedit:", reply_markup=get_edit_menu(user_id))
     return MENU_EDIT
 
+# Nilai teks dari admin di-parse sekali; hasilnya dipakai untuk DB dan kedua cache
+FIELD_PARSERS = {"tanggal_sewa": parse_date, "price_buy": parse_price, "price_sell": parse_price}
+
 # Fungsi umum untuk update DB
 async def update_field(user_id, field, value):
     hosting_id = temp_data[user_id]["hosting_id"]
+    if field in FIELD_PARSERS:
+        value = FIELD_PARSERS[field](value)
     temp_data[user_id][field] = value
-    result = supabase.table("HostingServices").update({field: value}).eq("id", hosting_id).execute()
+    result = await run_query(supabase.table("HostingServices").update({field: value}).eq("id", hosting_id))
+    reminder_planner.invalidate()
+    search_index.patch_service(hosting_id, {field: value})
+    local_replica.patch_service(hosting_id, {field: value})
     logger.info(f"Update {field} untuk hosting_id {hosting_id} => {value}")
     return bool(result.data)
 
@@ -124,6 +172,9 @@ async def menu_edit_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("✅ Edit selesai.", reply_markup=back_button)
         return ConversationHandler.END
 
+    if user_id not in temp_data:
+        return await session_expired(update)
+
     # Ubah di menu_edit_handler
     field_map = {
         "edit_provider": (INPUT_PROVIDER, f"Masukkan provider baru (sekarang: {temp_data[user_id]['provider']}):"),
@@ -138,7 +189,7 @@ async def menu_edit_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if action in field_map:
         state, text = field_map[action]
         if state == INPUT_SERVICE_TYPE:
-            keyboard = [[InlineKeyboardButton(x, callback_data=f"stype_{x}")] for x in ["hosting", "domain", "VPS", "email"]]
+            keyboard = [[InlineKeyboardButton(x, callback_data=f"stype_{x}")] for x in SERVICE_TYPES]
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
         else:
             await query.edit_message_text(text)
@@ -153,6 +204,8 @@ async def menu_edit_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Input field
 async def input_text_field(update: Update, context: ContextTypes.DEFAULT_TYPE, field, state_return, validator=None):
     user_id = update.effective_user.id
+    if user_id not in temp_data:
+        return await session_expired(update)
     text = update.message.text.strip()
 
     if validator:
@@ -172,31 +225,19 @@ async def input_domain(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # Ubah validator untuk tanggal sewa
 async def input_expired(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    def valid_date(val):
-        try:
-            datetime.strptime(val, "%Y-%m-%d")
-            return True
-        except ValueError:
-            return False
-    return await input_text_field(update, context, "tanggal_sewa", INPUT_EXPIRED, validator=valid_date)
+    return await input_text_field(
+        update, context, "tanggal_sewa", INPUT_EXPIRED, validator=lambda val: is_valid(parse_date, val)
+    )
 
 async def input_buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    def valid_float(val):
-        try:
-            float(val)
-            return True
-        except ValueError:
-            return False
-    return await input_text_field(update, context, "price_buy", INPUT_BUY, validator=valid_float)
+    return await input_text_field(
+        update, context, "price_buy", INPUT_BUY, validator=lambda val: is_valid(parse_price, val)
+    )
 
 async def input_sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    def valid_float(val):
-        try:
-            float(val)
-            return True
-        except ValueError:
-            return False
-    return await input_text_field(update, context, "price_sell", INPUT_SELL, validator=valid_float)
+    return await input_text_field(
+        update, context, "price_sell", INPUT_SELL, validator=lambda val: is_valid(parse_price, val)
+    )
 
 def get_edit_hosting_handler():
     return ConversationHandler(
@@ -204,7 +245,9 @@ def get_edit_hosting_handler():
         states={
             CHOOSING_HOSTING: [
                 CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$"),
+                CallbackQueryHandler(hosting_picker_nav, pattern=hosting_picker.pattern),
                 CallbackQueryHandler(choose_hosting),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, hosting_picker_search),
             ],
             MENU_EDIT: [
                 CallbackQueryHandler(back_to_menu_handler, pattern="^back_to_menu$"),
@@ -216,7 +259,12 @@ def get_edit_hosting_handler():
             INPUT_EXPIRED: [MessageHandler(filters.TEXT & ~filters.COMMAND, input_expired)],
             INPUT_BUY: [MessageHandler(filters.TEXT & ~filters.COMMAND, input_buy)],
             INPUT_SELL: [MessageHandler(filters.TEXT & ~filters.COMMAND, input_sell)],
+            **timeout_state(),
         },
         fallbacks=[CommandHandler("cancel", back_to_menu_handler)],
+        # Sama dengan TTL temp_data: percakapan tidak tertinggal di state yang datanya sudah hilang
+        conversation_timeout=SESSION_TTL,
         per_message=False,
+        name="edit_hosting",
+        persistent=PERSISTENCE_ENABLED,
     )
@@ -1,10 +1,11 @@
 # 📍 File: handlers/info_hosting.py
 import logging
-from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
+from datetime import date
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
-from database.supabase_client import supabase
+from database.supabase_client import supabase, run_query
+from database.models import HostingService
+from lib.due_dates import STATUS_TEXT, classify_services
 
 logger = logging.getLogger(__name__)
 
@@ -16,43 +17,27 @@ async def info_hosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # Ambil data hosting milik user
-        result = supabase.table("HostingServices").select(
+        result = await run_query(supabase.table("HostingServices").select(
             "provider, domain, service_type, tanggal_sewa, expired_date, price_sell, status, payment_status, approved_date"
-        ).eq("client_user_id", user_id).execute()
+        ).eq("client_user_id", user_id))
 
-        data_list = result.data
+        services = HostingService.from_rows(result.data)
 
-        if not data_list:
+        if not services:
             await update.message.reply_text("⚠️ Anda belum memiliki layanan hosting yang terdaftar.")
             return
 
-        today = date.today()
-        
+        # Jatuh tempo & status semua layanan dihitung sekaligus (aturan sama dengan reminder)
+        dates = classify_services(services, date.today())
 
-        for data in data_list:
-            # Tanggal sewa asli
-            tanggal_sewa = datetime.strptime(data["tanggal_sewa"], "%Y-%m-%d").date()
-            expired_date_input = datetime.strptime(data["expired_date"], "%Y-%m-%d").date() if data.get("expired_date") else tanggal_sewa
-
-            # Tentukan tanggal expired yang dihitung untuk countdown
-            if data.get("payment_status") == "approved":
-                # Sudah bayar -> expired dihitung dari tanggal sewa + 1 bulan
-                display_expired = tanggal_sewa + relativedelta(months=1)
-                payment_status_text = "✅ Sudah Dibayar"
-            else:
-                # Belum bayar -> expired = tanggal sewa
-                display_expired = tanggal_sewa
-                delta_days = (display_expired - today).days
-                if delta_days < 0:
-                    payment_status_text = "❌ Expired"
-                elif delta_days <= 3:
-                    payment_status_text = "⚠️ Akan Jatuh Tempo"
-                else:
-                    payment_status_text = "✅ Aktif"
+        for i, svc in enumerate(services):
+            display_expired, days_left, status = dates.row(i)
+            payment_status_text = STATUS_TEXT[status]
 
             # Hitung sisa waktu
-            days_left = (display_expired - today).days
-            if days_left >= 0:
+            if days_left is None:
+                countdown_text = "-"
+            elif days_left >= 0:
                 countdown_text = f"{days_left} hari lagi"
             else:
                 countdown_text = f"{abs(days_left)} hari lewat"
@@ -61,23 +46,23 @@ async def info_hosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
             msg = (
                 f"📄 *Informasi Hosting Anda*\n"
                 f"👤 Nama: {fullname}\n"
-                f"🏢 Provider: {data['provider']}\n"
-                f"🌐 Domain: {data['domain']}\n"
-                f"🛠 Layanan: {data['service_type']}\n"
-                f"📅 Tanggal Sewa: {tanggal_sewa}\n"
+                f"🏢 Provider: {svc.provider}\n"
+                f"🌐 Domain: {svc.domain}\n"
+                f"🛠 Layanan: {svc.service_type}\n"
+                f"📅 Tanggal Sewa: {svc.tanggal_sewa}\n"
                 f"📅 Expired: {display_expired} ({countdown_text})\n"
-                f"💰 Harga: Rp {int(data['price_sell']):,}\n"
+                f"💰 Harga: Rp {svc.price_sell:,}\n"
                 f"📌 Status Pembayaran: {payment_status_text}\n"
                 f"📝 Catatan: Hosting harus dibayar sebelum jatuh tempo\n"
             )
 
             # Tombol Bayar jika belum dibayar
             buttons = None
-            if data.get("payment_status") != "approved":
+            if not svc.is_paid:
                 buttons = InlineKeyboardMarkup([[
                     InlineKeyboardButton(
                         "💳 Bayar Sekarang",
-                        callback_data=f"pay_{data['domain']}_{int(data['price_sell'])}"
+                        callback_data=f"pay_{svc.domain}_{svc.price_sell}"
                     )
                 ]])
 
@@ -96,7 +81,8 @@ async def handle_pay_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     _, domain, price = query.data.split("_")
-    price = int(price)
+    price = float(price)
+    price = int(price) if price.is_integer() else price
 
     # Kirim info pembayaran ke user
     message = (
@@ -111,9 +97,9 @@ async def handle_pay_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
     # Update DB supaya menunggu bukti
-    supabase.table("HostingServices").update({
+    await run_query(supabase.table("HostingServices").update({
         "waiting_payment_proof": True
-    }).eq("domain", domain).execute()
+    }).eq("domain", domain))
 
 
 # ------------------- Fungsi untuk main.py -------------------
@@ -0,0 +1,49 @@
+# 📍 File: handlers/inline_search.py
+
+import logging
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import ContextTypes, InlineQueryHandler
+from config import ADMIN_IDS
+from lib.client_directory import client_directory, display_name
+from lib.search_index import search_index
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 20
+
+
+def _result(svc_id, svc):
+    client = display_name(client_directory.get(svc.client_user_id))
+    summary = (
+        f"🌐 Domain: {svc.domain}\n"
+        f"🏢 Provider: {svc.provider}\n"
+        f"🧾 Layanan: {svc.service_type}\n"
+        f"👤 Klien: {client}\n"
+        f"📅 Expired: {svc.expired_date}"
+    )
+    return InlineQueryResultArticle(
+        id=svc_id,
+        title=svc.domain or "-",
+        description=f"{svc.provider} · {client} · exp {svc.expired_date}",
+        input_message_content=InputTextMessageContent(summary),
+    )
+
+
+# Inline query "@bot <kata kunci>" khusus admin, dijawab dari index in-memory
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.inline_query
+    if query.from_user.id not in ADMIN_IDS:
+        await query.answer([], cache_time=0, is_personal=True)
+        return
+
+    matches = search_index.search(query.query, limit=MAX_RESULTS)
+    await query.answer(
+        [_result(svc_id, svc) for svc_id, svc in matches],
+        cache_time=0,
+        is_personal=True,
+    )
+
+
+# ------------------- Fungsi untuk main.py -------------------
+def get_inline_search_handler():
+    return InlineQueryHandler(inline_search)
@@ -2,18 +2,81 @@
 
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes, CallbackQueryHandler
-from database.supabase_client import supabase
+from postgrest.exceptions import APIError
+from database.supabase_client import supabase, run_query
+from database.local_replica import local_replica
 from config import ADMIN_IDS
 import logging
+import time
 from datetime import datetime, timedelta, date
-from collections import defaultdict
-from dateutil.relativedelta import relativedelta
 from handlers.menus.admin_panel import show_admin_menu  # ✅ untuk tombol Back
+from lib.session_store import SessionStore
+from lib.client_directory import client_directory
+from database.models import HostingService
+from lib.due_dates import DUE_SOON, STATUS_TEXT, classify_services
 
 logger = logging.getLogger(__name__)
 
 ITEMS_PER_PAGE = 5
-list_state = defaultdict(lambda: {"page": 0, "month": None, "data": []})
+# Fallback tanpa RPC: kolom minimum dibaca per halaman (PostgREST memotong di max-rows)
+# lalu hasilnya di-cache, supaya membuka menu tidak memindai seluruh tabel setiap kali
+_FALLBACK_PAGE_SIZE = 1000
+_FALLBACK_TTL = 300
+_fallback = {"buckets": None, "loaded_at": 0.0, "logged": False}
+list_state = SessionStore("list_hosting", default_factory=lambda: {"page": 0, "month": None, "cursors": [None], "total": None})
+
+def build_month_buckets(rows):
+    """Kelompokkan baris per bulan (YYYY-MM) dalam satu pass.
+
+    Mengembalikan list (month, client_count, sample_client) terurut bulan,
+    format yang sama dengan RPC hosting_month_buckets.
+    """
+    buckets = {}
+    for r in rows:
+        d = r.get("expired_date") or r.get("tanggal_sewa")
+        if not d:
+            continue
+        buckets.setdefault(d[:7], set()).add(r["client_user_id"])
+    return [(m, len(users), min(users)) for m, users in sorted(buckets.items())]
+
+
+async def fetch_month_buckets():
+    """Ringkasan bulan untuk menu filter, dihitung di Postgres lewat RPC.
+
+    Jika fungsi RPC belum dibuat (lihat database/sql/hosting_month_buckets.sql),
+    dicatat sebagai error sekali lalu fallback ke perhitungan lokal dari kolom
+    minimum yang di-cache _FALLBACK_TTL detik. Jika replica lokal aktif,
+    dihitung dari replica tanpa round trip.
+    """
+    if local_replica.ready:
+        return local_replica.month_buckets()
+    try:
+        result = await run_query(supabase.rpc("hosting_month_buckets", {}))
+        return [(r["month"], r["client_count"], r["sample_client"]) for r in result.data]
+    except APIError as e:
+        if not _fallback["logged"]:
+            _fallback["logged"] = True
+            logger.error(
+                f"RPC hosting_month_buckets gagal ({e.message}); jalankan database/sql/hosting_month_buckets.sql. "
+                f"Sementara bucket dihitung lokal (cache {_FALLBACK_TTL} detik)"
+            )
+    if _fallback["buckets"] is not None and time.monotonic() - _fallback["loaded_at"] < _FALLBACK_TTL:
+        return _fallback["buckets"]
+    rows, offset = [], 0
+    while True:
+        result = await run_query(
+            supabase.table("HostingServices").select("id,expired_date,tanggal_sewa,client_user_id")
+            .order("id").range(offset, offset + _FALLBACK_PAGE_SIZE - 1)
+        )
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < _FALLBACK_PAGE_SIZE:
+            break
+        offset += _FALLBACK_PAGE_SIZE
+    _fallback["buckets"] = build_month_buckets(rows)
+    _fallback["loaded_at"] = time.monotonic()
+    return _fallback["buckets"]
+
 
 async def listhosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message:
@@ -24,44 +87,20 @@ async def listhosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.callback_query.answer("❌ Akses ditolak.", show_alert=True)
         return
 
-    logger.info("🔍 Memuat data tanggal_sewa & expired_date dari HostingServices...")
-    result = supabase.table("HostingServices").select(
-        "tanggal_sewa,expired_date,client_user_id,payment_status,approved_date,domain,provider,service_type,price_sell,status"
-    ).execute()
-    data = result.data
+    buckets = await fetch_month_buckets()
 
-    if not data:
+    if not buckets:
         await update.callback_query.edit_message_text("Belum ada data hosting.")
         return
 
-    # Buat list bulan
-    dates = [r.get("expired_date") or r.get("tanggal_sewa") for r in data]
-    months = sorted(set([d[:7] for d in dates]))  # Format "YYYY-MM"
-
-    user_ids = list(set([r["client_user_id"] for r in data]))
-    usernames = {}
-    if user_ids:
-        logger.info(f"🔍 Mengambil username dari HostingClients untuk user_id: {user_ids}")
-        user_query = supabase.table("HostingClients").select("user_id,username,full_name").in_("user_id", user_ids).execute()
-        for u in user_query.data:
-            uid = u["user_id"]
-            uname = u.get("username")
-            if uname and uname.strip() and uname != "-":
-                usernames[uid] = f"@{uname}"
-            else:
-                usernames[uid] = u.get("full_name", "-")
+    # Nama contoh klien per bulan diambil dari cache client directory
+    usernames = await client_directory.resolve_many([sample for _, _, sample in buckets])
 
     keyboard = []
-    for m in months:
-        month_users = [r["client_user_id"] for r in data if (r.get("expired_date") or r.get("tanggal_sewa")).startswith(m)]
-        unique_users = set(month_users)
-        displayed_user = "-"
-        if unique_users:
-            first_uid = next(iter(unique_users))
-            displayed_user = usernames.get(first_uid, "-")
-        display = f"{m} ({len(unique_users)} {displayed_user})"
-        logger.info(f"📅 Tombol bulan: {display}")
+    for m, client_count, sample_client in buckets:
+        display = f"{m} ({client_count} {usernames.get(sample_client, '-')})"
         keyboard.append([InlineKeyboardButton(display, callback_data=f"filter_{m}")])
+    logger.info(f"📅 Menu filter: {len(buckets)} bulan")
 
     keyboard.append([InlineKeyboardButton("❌ Lihat Semua", callback_data="filter_all")])
     keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="back_to_admin")])
@@ -71,22 +110,48 @@ async def listhosting(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
-def get_filtered_data(month=None):
-    q = supabase.table("HostingServices").select(
-        "tanggal_sewa,expired_date,client_user_id,payment_status,approved_date,domain,provider,service_type,price_sell,status"
-    ).order("expired_date")
+async def fetch_page(month=None, after=None, with_count=False):
+    """Ambil satu halaman (keyset pagination pada expired_date, id).
 
+    after: tuple (expired_date, id) baris terakhir halaman sebelumnya; expired_date
+    None jika baris itu belum punya tanggal (NULL diurutkan paling akhir).
+    Mengambil ITEMS_PER_PAGE + 1 baris; baris ekstra hanya penanda ada halaman berikutnya.
+    """
+    start = end = None
     if month:
-        start_date = datetime.strptime(month, "%Y-%m")
+        start_date = datetime.strptime(month, "%Y-%m").date()
         end_date = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-        logger.info(f"🔍 Filter data antara {start_date.date()} s/d {end_date.date()} (berdasarkan expired_date)")
+        start, end = start_date.isoformat(), end_date.isoformat()
+        logger.info(f"🔍 Filter data antara {start} s/d {end} (berdasarkan expired_date/tanggal_sewa)")
+
+    if local_replica.ready:
+        return local_replica.services_page(start, end, after, ITEMS_PER_PAGE + 1, with_count)
+
+    q = supabase.table("HostingServices").select(
+        "id,tanggal_sewa,expired_date,client_user_id,payment_status,approved_date,domain,provider,service_type,price_sell,status",
+        count="exact" if with_count else None
+    ).order("expired_date").order("id").limit(ITEMS_PER_PAGE + 1)
 
-        # filter utama pakai expired_date
-        q = q.gte("expired_date", start_date.date().isoformat())
-        q = q.lt("expired_date", end_date.date().isoformat())
+    if month:
+        # Sama dengan bucket menu: expired_date, atau tanggal_sewa jika expired_date kosong
+        q = q.or_(
+            f"and(expired_date.gte.{start},expired_date.lt.{end}),"
+            f"and(expired_date.is.null,tanggal_sewa.gte.{start},tanggal_sewa.lt.{end})"
+        )
+
+    if after:
+        last_expired, last_id = after
+        if last_expired is None:
+            # Sudah di bagian NULL (paling akhir): lanjut urut id saja
+            q = q.is_("expired_date", "null").gt("id", last_id)
+        else:
+            q = q.or_(
+                f"expired_date.gt.{last_expired},and(expired_date.eq.{last_expired},id.gt.{last_id}),"
+                "expired_date.is.null"
+            )
 
-    result = q.execute()
-    return result.data
+    result = await run_query(q)
+    return result.data, result.count
 
 
 async def handle_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -99,17 +164,20 @@ async def handle_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     month = None if query.data == "filter_all" else query.data.replace("filter_", "")
-    data = get_filtered_data(month)
 
-    list_state[user_id] = {"page": 0, "month": month, "data": data}
+    # State hanya menyimpan cursor tiap halaman yang sudah dilewati, bukan data
+    list_state[user_id] = {"page": 0, "month": month, "cursors": [None], "total": None}
     await send_page(query, user_id)
 
 async def send_page(query, user_id):
     state = list_state[user_id]
     page = state["page"]
-    data = state["data"]
 
-    if not data:
+    rows, total = await fetch_page(state["month"], state["cursors"][page], with_count=state["total"] is None)
+    if total is not None:
+        state["total"] = total
+
+    if not rows:
         await query.edit_message_text(
             "⚠️ Tidak ada data hosting.",
             reply_markup=InlineKeyboardMarkup([
@@ -118,87 +186,58 @@ async def send_page(query, user_id):
         )
         return
 
-    start = page * ITEMS_PER_PAGE
-    end = start + ITEMS_PER_PAGE
-    sliced = data[start:end]
-
-    user_ids = [item['client_user_id'] for item in sliced]
-    user_info = {}
-    if user_ids:
-        user_query = supabase.table("HostingClients").select("user_id,username,full_name").in_("user_id", user_ids).execute()
-        for u in user_query.data:
-            uid = u["user_id"]
-            uname = u.get("username")
-            if uname and uname.strip():
-                user_info[uid] = f"@{uname}"
-            else:
-                user_info[uid] = u.get("full_name", "-")
+    has_next = len(rows) > ITEMS_PER_PAGE
+    sliced = HostingService.from_rows(rows[:ITEMS_PER_PAGE])
+    if has_next and len(state["cursors"]) == page + 1:
+        last = sliced[-1]
+        state["cursors"].append((last.expired_date.isoformat() if last.expired_date else None, last.id))
+
+    user_info = await client_directory.resolve_many([item.client_user_id for item in sliced])
 
     messages = []
-    today = date.today()
-    for item in sliced:
-        username = user_info.get(item["client_user_id"], "-")
-
-        # Gunakan tanggal_sewa sebagai dasar expired default
-        try:
-            base_date = datetime.strptime(item.get("tanggal_sewa"), "%Y-%m-%d").date()
-            if item.get("expired_date"):
-                expired_date_input = datetime.strptime(item["expired_date"], "%Y-%m-%d").date()
-            else:
-                expired_date_input = base_date  # fallback
-
-            display_expired = expired_date_input
-
-
-            delta_days = (display_expired - today).days
-            if delta_days < 0:
-                sisa_waktu = f"❌ Expired {abs(delta_days)} hari lalu"
-            elif delta_days <= 3 and item.get("payment_status") != "approved":
-                sisa_waktu = f"⚠️ Akan Jatuh Tempo ({delta_days} hari lagi)"
-            else:
-                sisa_waktu = f"{delta_days} hari lagi"
-
-            # Tentukan status pembayaran
-            if item.get("payment_status") == "approved":
-                payment_status_text = "✅ Sudah Dibayar"
-            else:
-                if delta_days < 0:
-                    payment_status_text = "❌ Expired"
-                elif delta_days <= 3:
-                    payment_status_text = "⚠️ Akan Jatuh Tempo"
-                else:
-                    payment_status_text = "✅ Aktif"
-
-        except Exception as e:
-            logger.error(f"❌ Gagal parsing tanggal - {e}")
-            display_expired = item.get("expired_date") or item.get("tanggal_sewa")
+    # Tanggal yang ditampilkan = kolom yang dipakai filter bulan & urutan halaman
+    dates = classify_services(sliced, date.today(), from_approved=False)
+    for i, item in enumerate(sliced):
+        username = user_info.get(item.client_user_id, "-")
+
+        display_expired, delta_days, status = dates.row(i)
+        payment_status_text = STATUS_TEXT[status]
+        if delta_days is None:
             sisa_waktu = "-"
-            payment_status_text = "-"
+        elif delta_days < 0:
+            sisa_waktu = f"❌ Expired {abs(delta_days)} hari lalu"
+        elif status == DUE_SOON:
+            sisa_waktu = f"⚠️ Akan Jatuh Tempo ({delta_days} hari lagi)"
+        else:
+            sisa_waktu = f"{delta_days} hari lagi"
 
         messages.append(
-            f"🌐 Domain: {item['domain']}\n"
-            f"👤 user_id: {item['client_user_id']} ({username})\n"
-            f"🏢 Provider: {item['provider']}\n"
-            f"📦 Layanan: {item['service_type']}\n"
-            f"📅 Tanggal Sewa: {item.get('tanggal_sewa')}\n"
+            f"🌐 Domain: {item.domain}\n"
+            f"👤 user_id: {item.client_user_id} ({username})\n"
+            f"🏢 Provider: {item.provider}\n"
+            f"📦 Layanan: {item.service_type}\n"
+            f"📅 Tanggal Sewa: {item.tanggal_sewa}\n"
             f"📅 Expired: {display_expired} ({sisa_waktu})\n"
             f"💳 Status Pembayaran: {payment_status_text}\n"
-            f"💸 Harga Jual: {item['price_sell']}\n"
-            f"📌 Status: {item['status']}"
+            f"💸 Harga Jual: {item.price_sell}\n"
+            f"📌 Status: {item.status}"
         )
 
 
     nav_buttons = []
     if page > 0:
         nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data="page_prev"))
-    if end < len(data):
+    if has_next:
         nav_buttons.append(InlineKeyboardButton("➡️ Next", callback_data="page_next"))
 
     keyboard = [nav_buttons] if nav_buttons else []
     keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="back_to_admin")])
 
+    total_pages = max(1, -(-(state["total"] or 0) // ITEMS_PER_PAGE))
+    header = f"📋 Total {state['total']} hosting — halaman {page + 1}/{total_pages}"
+
     await query.edit_message_text(
-        "\n\n".join(messages),
+        header + "\n\n" + "\n\n".join(messages),
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
@@ -208,9 +247,9 @@ async def handle_pagination(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = query.from_user.id
     state = list_state[user_id]
 
-    if query.data == "page_prev":
+    if query.data == "page_prev" and state["page"] > 0:
         state["page"] -= 1
-    elif query.data == "page_next":
+    elif query.data == "page_next" and state["page"] + 1 < len(state["cursors"]):
         state["page"] += 1
 
     await send_page(query, user_id)
@@ -1,139 +1,172 @@
 # 📍 File: handlers/payment_reminder.py
 
+import asyncio
 import logging
+import time
 from datetime import date
+from functools import partial
 from dateutil.relativedelta import relativedelta
-from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Bot, Update
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import ContextTypes, MessageHandler, CallbackQueryHandler, filters
-from database.supabase_client import supabase
-from config import ADMIN_IDS
+from database.supabase_client import supabase, run_query
+from database.models import HostingService
+from database.local_replica import local_replica
+from lib.reminder_planner import reminder_planner
+from lib.search_index import search_index
+from database.reminder_ledger import reminder_ledger
+from lib.broadcast import broadcaster
+from lib.payment_intake import payment_intake
+from lib.proof_archiver import proof_archiver
+from database.proof_ledger import proof_ledger
 
 logger = logging.getLogger(__name__)
 
+# Reminder terkirim dicatat ke ledger per potongan ini selama broadcast berjalan,
+# jadi crash/restart di tengah broadcast panjang hanya bisa mengulang < 1 potongan
+_LEDGER_FLUSH_EVERY = 20
+
 # ------------------- Reset status bulanan otomatis -------------------
-def reset_monthly_status():
+async def reset_monthly_status():
+    """Reset semua layanan aktif yang approved bulan lalu dengan satu UPDATE.
+
+    Filter status='active' AND payment_status='approved' ada di query, jadi
+    aman dijalankan ulang: run kedua tidak mengubah baris apa pun.
+    """
     try:
-        result = supabase.table("HostingServices").select(
-            "id, domain, client_user_id, payment_status"
-        ).eq("status", "active").execute()
-
-        services = result.data
-        if not services:
-            logger.info("Tidak ada layanan aktif untuk di-reset bulan ini.")
-            return
-
-        for svc in services:
-            # Reset hanya yang statusnya approved bulan sebelumnya
-            if svc.get("payment_status") == "approved":
-                supabase.table("HostingServices").update({
-                    "payment_status": "pending",
-                    "waiting_payment_proof": True,
-                    "payment_proof_url": None
-                }).eq("id", svc["id"]).execute()
-                logger.info(f"Status bulanan di-reset untuk domain {svc['domain']} user_id={svc['client_user_id']}")
+        started = time.perf_counter()
+        result = await run_query(
+            supabase.table("HostingServices").update({
+                "payment_status": "pending",
+                "waiting_payment_proof": True,
+                "payment_proof_url": None
+            }, count="exact", returning="minimal")
+            .eq("status", "active")
+            .eq("payment_status", "approved")
+        )
+        changed = result.count or 0
+        elapsed = time.perf_counter() - started
+        logger.info(f"Reset status bulanan: {changed} layanan di-reset dalam {elapsed:.2f} detik")
+
+        reminder_planner.invalidate()
+        await local_replica.sync()
+        # Catatan ledger bulan lalu sudah tidak dibutuhkan
+        await reminder_ledger.prune(date.today() - relativedelta(months=1))
+        await proof_ledger.prune(date.today() - relativedelta(months=3))
+        return changed
 
     except Exception as e:
         logger.error(f"Error saat reset status bulanan: {e}", exc_info=True)
+        # Dilempar ulang supaya timed_job mencatat kegagalan (JOB_FAILURES) dan last-success tidak diperbarui
+        raise
 
 
 # ------------------- Reminder H-3 sampai H-0 (versi bulanan) -------------------
 async def send_payment_reminders(bot: Bot):
     today = date.today()
     try:
-        result = supabase.table("HostingServices").select(
-            "id, client_user_id, provider, domain, expired_date, price_sell, payment_status, approved_date"
-        ).eq("status", "active").neq("payment_status", "approved").execute()
-
-        services = result.data
-        if not services:
-            logger.info("Tidak ada layanan yang perlu diingatkan hari ini.")
-            return
-
-        for svc in services:
-            # Tentukan tanggal expired dinamis
-            if svc.get("approved_date"):
-                approved_date = date.fromisoformat(svc["approved_date"])
-                display_expired = approved_date + relativedelta(months=1)
-            else:
-                display_expired = date.fromisoformat(svc["expired_date"])
+        # Planner hanya query layanan di window jatuh tempo; run tanpa jadwal tidak query sama sekali
+        due = await reminder_planner.due(today)
+    except Exception as e:
+        logger.error(f"Error saat memproses payment reminder: {e}", exc_info=True)
+        raise
+    if not due:
+        return
 
+    # Layanan yang jadwalnya sudah diatur ulang; sisanya dikembalikan ke heap jika run terputus
+    handled = set()
+    try:
+        # Satu lookup ledger untuk seluruh run: skip yang sudah terkirim hari ini
+        already_sent = await reminder_ledger.sent_ids(today, [svc.id for svc, _ in due])
+
+        to_send = []
+        for svc, display_expired in due:
+            if str(svc.id) in already_sent:
+                reminder_planner.reschedule(svc.id, display_expired, today)
+                handled.add(svc.id)
+                continue
+            to_send.append((svc, display_expired))
+
+        jobs = []
+        for svc, display_expired in to_send:
             days_left = (display_expired - today).days
 
             # Kirim reminder H-3 sampai H-0
-            if 0 <= days_left <= 3:
-                countdown_text = f"{days_left} hari lagi" if days_left > 0 else "hari ini"
-                message = (
-                    f"⚠️ <b>Pengingat Pembayaran Hosting</b>\n\n"
-                    f"🌐 Domain: <b>{svc['domain']}</b>\n"
-                    f"🏢 Provider: <code>{svc['provider']}</code>\n"
-                    f"💰 Harga: <b>Rp {int(svc['price_sell']):,}</b>\n"
-                    f"📅 Expired: {display_expired} ({countdown_text})\n\n"
-                    f"Silakan lakukan pembayaran sebelum jatuh tempo.\n"
-                    f"Kirimkan bukti transfer melalui chat ini."
-                )
-                await bot.send_message(chat_id=svc["client_user_id"], text=message, parse_mode="HTML")
-                logger.info(f"Reminder terkirim ke user_id={svc['client_user_id']} untuk domain {svc['domain']}")
+            countdown_text = f"{days_left} hari lagi" if days_left > 0 else "hari ini"
+            message = (
+                f"⚠️ <b>Pengingat Pembayaran Hosting</b>\n\n"
+                f"🌐 Domain: <b>{svc.domain}</b>\n"
+                f"🏢 Provider: <code>{svc.provider}</code>\n"
+                f"💰 Harga: <b>Rp {svc.price_sell:,}</b>\n"
+                f"📅 Expired: {display_expired} ({countdown_text})\n\n"
+                f"Silakan lakukan pembayaran sebelum jatuh tempo.\n"
+                f"Kirimkan bukti transfer melalui chat ini."
+            )
+            jobs.append((svc.client_user_id, partial(
+                bot.send_message, chat_id=svc.client_user_id, text=message, parse_mode="HTML"
+            )))
+
+        # Ledger ditulis bertahap (bulk per _LEDGER_FLUSH_EVERY) begitu pengiriman selesai,
+        # bukan sekali di akhir: yang sudah terkirim tidak dikirim ulang setelah restart
+        sent_now, flushes = [], []
+
+        def on_result(index, res):
+            if isinstance(res, Exception):
+                return
+            sent_now.append(to_send[index][0].id)
+            if len(sent_now) >= _LEDGER_FLUSH_EVERY:
+                flushes.append(asyncio.create_task(reminder_ledger.record(today, sent_now[:])))
+                sent_now.clear()
+
+        try:
+            # Kirim lewat broadcaster (konkuren + rate limit + retry), bukan satu per satu
+            results = await broadcaster.broadcast(jobs, on_result=on_result)
+        finally:
+            # Juga saat job dibatalkan (shutdown/drain): sisa yang terkirim tetap tercatat
+            await asyncio.gather(*flushes, reminder_ledger.record(today, sent_now[:]))
+
+        for (svc, display_expired), res in zip(to_send, results):
+            if isinstance(res, Exception):
+                logger.error(f"Gagal kirim reminder ke user_id={svc.client_user_id}: {res}")
+                if not isinstance(res, (Forbidden, BadRequest)):
+                    # Gagal sementara: dicoba lagi run berikutnya (belum tercatat di ledger)
+                    continue
+                # Bot diblokir / chat tidak valid: tidak diulang tiap menit, coba lagi besok
+            else:
+                logger.info(f"Reminder terkirim ke user_id={svc.client_user_id} untuk domain {svc.domain}")
+            reminder_planner.reschedule(svc.id, display_expired, today)
+            handled.add(svc.id)
 
     except Exception as e:
         logger.error(f"Error saat memproses payment reminder: {e}", exc_info=True)
+        raise
+    finally:
+        # Gagal kirim sementara, error ledger, atau job dibatalkan: jadwal hari ini dikembalikan
+        for svc, _ in due:
+            if svc.id not in handled:
+                reminder_planner.retry(svc.id, today)
 
 
 # ------------------- Handler menerima bukti transfer -------------------
 async def handle_payment_proof(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user = update.effective_user
-    user_id = user.id
-    username = f"@{user.username}" if user.username else "-"
-    fullname = user.full_name
-
     if not update.message.photo:
         await update.message.reply_text("⚠️ Kirimkan gambar bukti transfer.")
         return
 
-    photo_file_id = update.message.photo[-1].file_id
+    # Dedup, penggabungan album, pencocokan layanan & notifikasi admin dikerjakan worker intake
+    payment_intake.submit(update.message, context.bot)
 
-    result = supabase.table("HostingServices").select(
-        "id, provider, domain, price_sell"
-    ).eq("client_user_id", user_id).eq("waiting_payment_proof", True).single().execute()
 
-    if not result.data:
-        await update.message.reply_text("⚠️ Tidak ada pembayaran yang menunggu bukti transfer.")
-        return
-
-    svc = result.data
-    # Update dengan logika lebih jelas
-    supabase.table("HostingServices").update({
-        "payment_proof_url": photo_file_id,
-        "waiting_payment_proof": True,  # tetap True sampai admin approve/reject
-        "payment_status": "pending"
-    }).eq("id", svc["id"]).execute()
-
-    logger.info(f"User {user_id} kirim bukti transfer untuk domain {svc['domain']}")
-    await update.message.reply_text("✅ Bukti transfer diterima. Admin akan meninjau pembayaran Anda.")
-
-    buttons = InlineKeyboardMarkup([[
-        InlineKeyboardButton("✅ Approve", callback_data=f"approve_{svc['id']}"),
-        InlineKeyboardButton("❌ Reject", callback_data=f"reject_{svc['id']}")
-    ]])
-
-    message_text = (
-        f"📢 <b>Pembayaran Masuk</b>\n\n"
-        f"🌐 Domain: <b>{svc['domain']}</b>\n"
-        f"🏢 Provider: <code>{svc['provider']}</code>\n"
-        f"💰 Harga: <b>Rp {int(svc['price_sell']):,}</b>\n"
-        f"👤 Fullname: {fullname}\n"
-        f"📛 Username: {username}\n"
-        f"📌 Dari user_id: {user_id}"
-    )
+async def handle_proof_choice(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Klien memilih layanan untuk bukti transfer (jika lebih dari satu layanan menunggu bukti)."""
+    query = update.callback_query
+    await query.answer()
+    service_id = query.data[len("proofsvc_"):]
 
-    for admin_id in ADMIN_IDS:
-        await context.bot.send_photo(
-            chat_id=admin_id,
-            photo=photo_file_id,
-            caption=message_text,
-            parse_mode="HTML",
-            reply_markup=buttons
-        )
-        logger.info(f"Notifikasi bukti transfer dikirim ke admin_id={admin_id}")
+    if payment_intake.choose(query.from_user.id, service_id, context.bot):
+        await query.edit_message_text("⏳ Bukti transfer sedang diproses...")
+    else:
+        await query.edit_message_text("⚠️ Pilihan sudah kedaluwarsa. Silakan kirim ulang bukti transfer.")
 
 
 # ------------------- Handler tombol admin -------------------
@@ -142,44 +175,62 @@ async def handle_admin_validation(update: Update, context: ContextTypes.DEFAULT_
     await query.answer()
     action, svc_id = query.data.split("_")
     svc_id = str(svc_id)
-    svc = supabase.table("HostingServices").select("*").eq("id", svc_id).single().execute().data
+    result = await run_query(
+        supabase.table("HostingServices").select("id, client_user_id, domain, expired_date").eq("id", svc_id).single()
+    )
 
-    if not svc:
+    if not result.data:
         await query.edit_message_text("❌ Data tidak ditemukan.")
         return
 
-    client_id = svc["client_user_id"]
+    svc = HostingService.from_row(result.data)
+    client_id = svc.client_user_id
 
     if action == "approve":
-        current_expired = date.fromisoformat(svc['expired_date'])
+        current_expired = svc.expired_date
         new_expired = current_expired + relativedelta(months=1)
 
-        supabase.table("HostingServices").update({
+        fields = {
             "payment_status": "approved",
             "waiting_payment_proof": False,
             "approved_date": date.today().isoformat(),
             "expired_date": new_expired.isoformat()
-        }).eq("id", svc_id).execute()
+        }
+        await run_query(supabase.table("HostingServices").update(fields).eq("id", svc_id))
+        reminder_planner.invalidate()
+        local_replica.patch_service(svc_id, fields)
+        # Hasil inline search menampilkan expired_date
+        search_index.patch_service(svc_id, fields)
+        await proof_archiver.decide(svc_id, "approved")
 
         await context.bot.send_message(client_id, "✅ Pembayaran Anda telah diverifikasi oleh admin. Layanan tetap aktif.")
         await query.edit_message_caption("✅ Pembayaran disetujui.", parse_mode="HTML")
-        logger.info(f"Admin approve pembayaran domain {svc['domain']} untuk user_id={client_id}, expired updated ke {new_expired}")
+        logger.info(f"Admin approve pembayaran domain {svc.domain} untuk user_id={client_id}, expired updated ke {new_expired}")
 
     elif action == "reject":
-        supabase.table("HostingServices").update({
+        fields = {
             "payment_status": "rejected",
             "waiting_payment_proof": True,
             "payment_proof_url": None
-        }).eq("id", svc_id).execute()
+        }
+        await run_query(supabase.table("HostingServices").update(fields).eq("id", svc_id))
+        local_replica.patch_service(svc_id, fields)
+        # Screenshot yang sama boleh dikirim ulang (mis. ditolak karena salah pilih layanan)
+        await proof_ledger.release(svc_id)
+        # payment_proof_url dikosongkan, tapi foto & keputusan tetap ada di arsip (PaymentProofs)
+        await proof_archiver.decide(svc_id, "rejected")
 
         await context.bot.send_message(client_id, "❌ Pembayaran Anda ditolak oleh admin. Silakan kirim ulang bukti transfer.")
         await query.edit_message_text("❌ Pembayaran ditolak.")
-        logger.info(f"Admin reject pembayaran domain {svc['domain']} untuk user_id={client_id}")
+        logger.info(f"Admin reject pembayaran domain {svc.domain} untuk user_id={client_id}")
 
 
 # ------------------- Fungsi untuk main.py -------------------
 def get_payment_proof_handler():
     return MessageHandler(filters.PHOTO & ~filters.COMMAND, handle_payment_proof)
 
+def get_proof_choice_handler():
+    return CallbackQueryHandler(handle_proof_choice, pattern="^proofsvc_")
+
 def get_admin_validation_handler():
     return CallbackQueryHandler(handle_admin_validation, pattern="^(approve|reject)_")
@@ -2,8 +2,10 @@
 
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
-from database.supabase_client import supabase
 from config import ADMIN_IDS
+from lib.client_directory import client_directory
+from lib.search_index import search_index
+from database.local_replica import local_replica
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,16 +32,15 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"🤖 Is Bot: {is_bot}"
     )
 
-    # Cek jika user sudah ada
-    result = supabase.table("HostingClients").select("user_id").eq("user_id", user_id).execute()
-    if not result.data:
-        # Insert user ke Supabase
-        supabase.table("HostingClients").insert({
-            "user_id": user_id,
-            "username": username,
-            "full_name": full_name
-        }).execute()
+    # Registrasi: user lama yang datanya sama tidak menyentuh DB, user baru cukup satu upsert
+    status = await client_directory.register(user_id, username, full_name)
+    if status != "known":
+        search_index.update_client(user_id, username, full_name)
+        local_replica.upsert("HostingClients", {"user_id": user_id, "username": username, "full_name": full_name})
+    if status == "new":
         logger.info(f"✅ User baru disimpan ke Supabase: {full_name} ({username})")
+    elif status == "updated":
+        logger.info(f"✏️ Data user diperbarui (antri batch): {full_name} ({username})")
 
     await update.message.reply_text(
         f"👋 Hai {full_name}!\n\n"
@@ -0,0 +1,141 @@
+# 📍 File: lib/broadcast.py
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from telegram.error import RetryAfter, TimedOut, NetworkError, Forbidden, BadRequest
+from config import BROADCAST_CONCURRENCY, BROADCAST_GLOBAL_RATE, BROADCAST_PER_CHAT_RATE
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket sederhana berbasis reservasi.
+
+    reserve() langsung mengambil satu token (boleh minus/berhutang) dan
+    mengembalikan berapa detik pemanggil harus menunggu. Karena tidak ada
+    await di dalamnya, aman dipakai banyak coroutine di satu event loop.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def reserve(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+def _retry_after_seconds(error):
+    value = error.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class Broadcaster:
+    """Pengirim pesan Telegram bersama untuk reminder & notifikasi admin.
+
+    Menggabungkan batas konkurensi (semaphore), rate limit global dan per-chat
+    (token bucket), serta backoff saat Telegram membalas RetryAfter (429).
+    """
+
+    def __init__(self, max_concurrency=BROADCAST_CONCURRENCY, global_rate=BROADCAST_GLOBAL_RATE,
+                 per_chat_rate=BROADCAST_PER_CHAT_RATE, max_retries=3):
+        self.max_concurrency = max_concurrency
+        self.per_chat_rate = per_chat_rate
+        self.max_retries = max_retries
+        # burst=1: pesan disebar rata, tidak ada lonjakan di awal yang memicu 429
+        self._global = TokenBucket(global_rate, burst=1)
+        self._chats = {}
+        self._paused_until = 0.0
+        self._semaphore = None
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Buang bucket chat yang sudah lama idle supaya dict tidak tumbuh terus
+            if len(self._chats) > 10_000:
+                cutoff = time.monotonic() - 60
+                self._chats = {k: b for k, b in self._chats.items() if b._updated > cutoff}
+            bucket = self._chats[chat_id] = TokenBucket(self.per_chat_rate, burst=1)
+        return bucket
+
+    async def _wait_chat(self, chat_id):
+        delay = self._chat_bucket(chat_id).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _wait_global(self):
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        delay = self._global.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def send(self, chat_id, factory):
+        """Kirim satu panggilan Bot API. factory: callable tanpa argumen yang mengembalikan coroutine.
+
+        Jeda per-chat ditunggu di luar semaphore, supaya banyak pesan ke satu
+        chat tidak menahan slot kiriman ke chat lain. Token global baru diambil
+        setelah slot semaphore didapat, tepat sebelum panggilan API.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_chat(chat_id)
+            backoff = 0
+            async with self._semaphore:
+                await self._wait_global()
+                try:
+                    return await factory()
+                except RetryAfter as e:
+                    wait = _retry_after_seconds(e)
+                    # 429 berlaku untuk bot secara global, jadi semua pengiriman ikut ditahan
+                    self._paused_until = max(self._paused_until, time.monotonic() + wait)
+                    logger.warning(f"RetryAfter {wait}s saat kirim ke chat_id={chat_id} (percobaan {attempt + 1})")
+                    if attempt == self.max_retries:
+                        raise
+                except (Forbidden, BadRequest):
+                    # User blokir bot / chat tidak valid: tidak ada gunanya diulang
+                    raise
+                except (TimedOut, NetworkError) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    backoff = 0.5 * (2 ** attempt)
+                    logger.warning(f"{e.__class__.__name__} saat kirim ke chat_id={chat_id}, ulang dalam {backoff}s")
+            if backoff:
+                await asyncio.sleep(backoff)
+
+    async def broadcast(self, jobs, on_result=None):
+        """Kirim banyak pesan sekaligus. jobs: iterable (chat_id, factory).
+
+        Mengembalikan list hasil sesuai urutan jobs; pengiriman yang gagal
+        berisi objek exception-nya (tidak melempar). on_result(index, hasil)
+        (opsional) dipanggil begitu satu pengiriman selesai, supaya pemanggil
+        bisa mencatat progres sebelum seluruh broadcast selesai.
+        """
+        async def run(index, chat_id, factory):
+            try:
+                result = await self.send(chat_id, factory)
+            except Exception as e:
+                on_result(index, e)
+                raise
+            on_result(index, result)
+            return result
+
+        if on_result is None:
+            sends = (self.send(chat_id, factory) for chat_id, factory in jobs)
+        else:
+            sends = (run(i, chat_id, factory) for i, (chat_id, factory) in enumerate(jobs))
+        return await asyncio.gather(*sends, return_exceptions=True)
+
+
+# ✅ Instance global yang dipakai reminder & notifikasi admin
+broadcaster = Broadcaster()
@@ -0,0 +1,190 @@
+# 📍 File: lib/change_feed.py
+
+import asyncio
+import logging
+import time
+from datetime import date
+from realtime import AsyncRealtimeClient, RealtimePostgresChangesListenEvent, RealtimeSubscribeStates
+from realtime import __version__ as REALTIME_VERSION
+from config import SUPABASE_URL, SUPABASE_KEY, REALTIME_URL, REALTIME_RECONNECT_MAX_DELAY
+from database.local_replica import local_replica
+from database.models import HostingService
+from lib.client_directory import client_directory
+from lib.reminder_planner import reminder_planner
+from lib.search_index import search_index
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "hostmanagebot-changes"
+SUBSCRIBE_TIMEOUT = 15
+
+
+def _listen_task(client):
+    """Task listen websocket milik client, selesai saat koneksi tertutup.
+
+    Atribut privat realtime==2.7.0 (versi di-pin di requirements.txt): di
+    versi ini callback subscribe hanya dipanggil untuk balasan join, tidak
+    saat websocket putus, jadi tidak bisa dipakai mendeteksi koneksi hilang.
+    """
+    if not hasattr(client, "_listen_task"):
+        raise RuntimeError(
+            f"realtime {REALTIME_VERSION} tidak punya AsyncRealtimeClient._listen_task; "
+            "change feed butuh realtime==2.7.0 (lihat requirements.txt) atau matikan REALTIME_ENABLED"
+        )
+    return client._listen_task
+
+
+class ChangeFeed:
+    """Pelanggan Supabase Realtime untuk HostingServices & HostingClients.
+
+    Setiap INSERT/UPDATE/DELETE langsung mem-patch client directory, search
+    index, dan jadwal reminder, jadi perubahan dari luar bot (mis. dashboard
+    Supabase) terlihat tanpa polling. Reconnect ditangani sendiri dengan
+    backoff eksponensial; setelah tersambung lagi dilakukan resync penuh
+    karena event selama terputus tidak dikirim ulang oleh Realtime.
+    """
+
+    def __init__(self, url=None, key=SUPABASE_KEY, initial_delay=1.0, max_delay=REALTIME_RECONNECT_MAX_DELAY):
+        self.url = url or REALTIME_URL or f"{SUPABASE_URL}/realtime/v1"
+        self.key = key
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.connected = False
+        self.events = 0
+        self.resyncs = 0
+        self.last_event_at = None
+        self._task = None
+
+    # ---------- siklus hidup ----------
+    def start(self):
+        # Versi realtime yang tidak cocok langsung gagal saat startup, bukan diam-diam reconnect terus
+        _listen_task(AsyncRealtimeClient(self.url, self.key, auto_reconnect=False))
+        if self._task is None or self._task.done():
+            # Log per pesan dari library realtime terlalu ramai di level INFO
+            logging.getLogger("realtime").setLevel(logging.WARNING)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        delay = self.initial_delay
+        # Cache sudah dimuat saat startup; resync hanya setelah pernah gagal/terputus
+        needs_resync = False
+        while True:
+            client = AsyncRealtimeClient(self.url, self.key, auto_reconnect=False, max_retries=1)
+            try:
+                await self._subscribe(client)
+                self._set_connected(True)
+                logger.info(f"Change feed tersambung ke {self.url}")
+                if needs_resync:
+                    await self.resync()
+                delay = self.initial_delay
+                await _listen_task(client)
+                logger.warning("Change feed terputus, menyambung ulang")
+            except asyncio.CancelledError:
+                self._set_connected(False)
+                await client.close()
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed gagal tersambung: {e!r}, coba lagi dalam {delay:.1f} detik")
+            self._set_connected(False)
+            needs_resync = True
+            await client.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+
+    async def _subscribe(self, client):
+        subscribed = asyncio.get_running_loop().create_future()
+
+        def on_state(state, error):
+            if subscribed.done():
+                return
+            if state == RealtimeSubscribeStates.SUBSCRIBED:
+                subscribed.set_result(None)
+            else:
+                subscribed.set_exception(error or ConnectionError(f"subscribe {state.value}"))
+
+        channel = client.channel(CHANNEL)
+        channel.on_postgres_changes(
+            RealtimePostgresChangesListenEvent.All, self._on_service_change, table="HostingServices", schema="public"
+        )
+        channel.on_postgres_changes(
+            RealtimePostgresChangesListenEvent.All, self._on_client_change, table="HostingClients", schema="public"
+        )
+        await channel.subscribe(on_state)
+        # Gagal cepat jika server menutup koneksi sebelum join dibalas
+        done, _ = await asyncio.wait(
+            {subscribed, _listen_task(client)}, timeout=SUBSCRIBE_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+        )
+        if subscribed in done:
+            return subscribed.result()
+        subscribed.cancel()
+        raise ConnectionError("koneksi tertutup sebelum subscribe" if done else "subscribe timeout")
+
+    def _set_connected(self, connected):
+        self.connected = connected
+        client_directory.live = connected
+        search_index.live = connected
+
+    async def resync(self):
+        """Muat ulang semua cache dari Supabase (menutup celah event selama terputus)."""
+        started = time.perf_counter()
+        await client_directory.load_all()
+        await search_index.load(client_directory)
+        reminder_planner.invalidate()
+        await local_replica.sync()
+        self.resyncs += 1
+        logger.info(f"Change feed: resync selesai dalam {time.perf_counter() - started:.2f} detik")
+
+    # ---------- event ----------
+    def _on_service_change(self, payload):
+        data = payload["data"]
+        self._apply(self.apply_service_change, data["type"], data.get("record"), data.get("old_record"))
+
+    def _on_client_change(self, payload):
+        data = payload["data"]
+        self._apply(self.apply_client_change, data["type"], data.get("record"), data.get("old_record"))
+
+    def _apply(self, func, kind, record, old_record):
+        # Exception di callback akan menghentikan loop listen library; cukup di-log
+        try:
+            func(kind, record, old_record)
+        except Exception as e:
+            logger.error(f"Change feed: gagal menerapkan {kind}: {e}", exc_info=True)
+            return
+        self.events += 1
+        self.last_event_at = time.time()
+
+    def apply_service_change(self, kind, record, old_record):
+        if kind == "DELETE":
+            # Tanpa REPLICA IDENTITY FULL, old_record hanya berisi primary key
+            search_index.remove_service(old_record["id"])
+            local_replica.remove("HostingServices", old_record["id"])
+            return
+        svc = HostingService.from_row(record)
+        # upsert_service juga mengeluarkan layanan yang tidak lagi aktif
+        search_index.upsert_service(svc)
+        reminder_planner.apply_change(svc, date.today())
+        local_replica.upsert("HostingServices", record)
+
+    def apply_client_change(self, kind, record, old_record):
+        if kind == "DELETE":
+            client_directory.remove(old_record["user_id"])
+            search_index.remove_client(old_record["user_id"])
+            local_replica.remove("HostingClients", old_record["user_id"])
+            return
+        user_id = record["user_id"]
+        client_directory.put(user_id, record.get("username"), record.get("full_name"))
+        search_index.update_client(user_id, record.get("username"), record.get("full_name"))
+        local_replica.upsert("HostingClients", record)
+
+
+# ✅ Instance global
+change_feed = ChangeFeed()
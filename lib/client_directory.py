@@ -0,0 +1,179 @@
+# 📍 File: lib/client_directory.py
+
+import asyncio
+import logging
+import time
+from database.supabase_client import supabase, run_query
+from database.models import HostingClient
+from config import CLIENT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Ukuran halaman saat bulk load HostingClients
+_LOAD_PAGE_SIZE = 1000
+
+
+def display_name(client):
+    """@username jika ada, selain itu full_name."""
+    return client.display_name if client else "-"
+
+
+class ClientDirectory:
+    """Cache in-process HostingClients (user_id -> username, full_name).
+
+    Dimuat penuh saat startup, di-refresh di latar belakang setelah TTL, dan
+    diperbarui langsung oleh /start, sekaligus menjadi set user yang sudah
+    dikenal. Miss untuk satu halaman diambil dengan satu query in_(), sehingga
+    render halaman normalnya tanpa query sama sekali.
+    """
+
+    def __init__(self, ttl=CLIENT_CACHE_TTL):
+        self.ttl = ttl
+        self._clients = {}
+        # user_id yang dicari tapi tidak ada di DB (supaya tidak di-query ulang terus)
+        self._missing = set()
+        self._loaded_at = None
+        self._refresh_task = None
+        # Perubahan username/full_name yang menunggu ditulis (batch)
+        self._pending_writes = {}
+        # True selama change feed tersambung: cache diperbarui per event, refresh TTL tidak perlu
+        self.live = False
+        # Satu dict per load_all yang sedang berjalan: user_id -> HostingClient (put) / None (remove)
+        self._load_writes = []
+
+    async def load_all(self):
+        """Muat ulang semua klien dari Supabase.
+
+        put()/remove() (dari /start atau change feed) selama load berjalan
+        dicatat lalu diterapkan lagi di atas hasil load, begitu juga perubahan
+        yang belum di-flush, supaya tidak tertimpa snapshot yang lebih lama.
+        """
+        clients = {}
+        writes = {}
+        self._load_writes.append(writes)
+        try:
+            offset = 0
+            while True:
+                result = await run_query(
+                    supabase.table("HostingClients")
+                    .select("user_id,username,full_name")
+                    .order("user_id")
+                    .range(offset, offset + _LOAD_PAGE_SIZE - 1)
+                )
+                rows = result.data or []
+                for u in rows:
+                    clients[u["user_id"]] = HostingClient.from_row(u)
+                if len(rows) < _LOAD_PAGE_SIZE:
+                    break
+                offset += _LOAD_PAGE_SIZE
+        finally:
+            self._load_writes.remove(writes)
+
+        for row in self._pending_writes.values():
+            clients[row["user_id"]] = HostingClient.from_row(row)
+        for user_id, client in writes.items():
+            if client is None:
+                clients.pop(user_id, None)
+            else:
+                clients[user_id] = client
+        self._clients = clients
+        self._missing = set()
+        self._loaded_at = time.monotonic()
+        logger.info(f"Client directory dimuat: {len(clients)} klien")
+
+    def _refresh_if_stale(self):
+        if self.live:
+            return
+        stale = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self.load_all())
+
+    def get(self, user_id):
+        return self._clients.get(user_id)
+
+    def put(self, user_id, username, full_name):
+        client = self._clients[user_id] = HostingClient(user_id, username, full_name)
+        self._missing.discard(user_id)
+        for writes in self._load_writes:
+            writes[user_id] = client
+
+    def is_unchanged(self, user_id, username, full_name):
+        client = self._clients.get(user_id)
+        return client is not None and client.username == username and client.full_name == full_name
+
+    async def register(self, user_id, username, full_name):
+        """Daftarkan user dari /start.
+
+        User yang sudah dikenal dan datanya tidak berubah tidak menyentuh DB.
+        User baru langsung di-upsert (satu round trip). Perubahan nama/username
+        user lama diantrikan dan ditulis bersama oleh flush_writes().
+        Mengembalikan "known", "updated" atau "new".
+        """
+        if self.is_unchanged(user_id, username, full_name):
+            return "known"
+
+        client = HostingClient(user_id, username, full_name)
+        if user_id in self._clients:
+            self.put(user_id, username, full_name)
+            self._pending_writes[user_id] = client.to_row()
+            return "updated"
+
+        await run_query(
+            supabase.table("HostingClients").upsert(client.to_row(), on_conflict="user_id", returning="minimal")
+        )
+        self.put(user_id, username, full_name)
+        return "new"
+
+    async def flush_writes(self):
+        """Tulis semua perubahan klien yang tertunda dalam satu upsert."""
+        if not self._pending_writes:
+            return 0
+        rows, self._pending_writes = list(self._pending_writes.values()), {}
+        # load_all yang sedang berjalan mungkin membaca sebelum upsert ini masuk
+        for writes in self._load_writes:
+            for row in rows:
+                writes.setdefault(row["user_id"], HostingClient.from_row(row))
+        try:
+            await run_query(
+                supabase.table("HostingClients").upsert(rows, on_conflict="user_id", returning="minimal")
+            )
+        except Exception:
+            # Simpan lagi untuk flush berikutnya; yang lebih baru menang
+            for row in rows:
+                self._pending_writes.setdefault(row["user_id"], row)
+            raise
+        logger.info(f"Client directory: {len(rows)} perubahan klien ditulis ke Supabase")
+        return len(rows)
+
+    def remove(self, user_id):
+        self._clients.pop(user_id, None)
+        for writes in self._load_writes:
+            writes[user_id] = None
+
+    def items(self):
+        return list(self._clients.items())
+
+    def __contains__(self, user_id):
+        return user_id in self._clients
+
+    def __len__(self):
+        return len(self._clients)
+
+    async def resolve_many(self, user_ids):
+        """Nama tampilan untuk banyak user_id: dict user_id -> '@username' / full_name / '-'."""
+        self._refresh_if_stale()
+
+        misses = [uid for uid in set(user_ids) if uid not in self._clients and uid not in self._missing]
+        if misses:
+            result = await run_query(
+                supabase.table("HostingClients").select("user_id,username,full_name").in_("user_id", misses)
+            )
+            for u in result.data or []:
+                self._clients[u["user_id"]] = HostingClient.from_row(u)
+            self._missing.update(uid for uid in misses if uid not in self._clients)
+
+        return {uid: display_name(self._clients.get(uid)) for uid in user_ids}
+
+
+# ✅ Instance global
+client_directory = ClientDirectory()
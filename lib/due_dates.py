@@ -0,0 +1,142 @@
+# 📍 File: lib/due_dates.py
+
+from datetime import date
+import numpy as np
+
+# Layanan dianggap "akan jatuh tempo" mulai H-3
+DUE_SOON_DAYS = 3
+
+# Kelas status pembayaran (disimpan sebagai int8)
+PAID, ACTIVE, DUE_SOON, EXPIRED, UNKNOWN = range(5)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NAT = np.iinfo(np.int64).min
+
+STATUS_TEXT = {
+    PAID: "✅ Sudah Dibayar",
+    ACTIVE: "✅ Aktif",
+    DUE_SOON: "⚠️ Akan Jatuh Tempo",
+    EXPIRED: "❌ Expired",
+    UNKNOWN: "-",
+}
+
+
+def parse_dates(values):
+    """List string ISO 'YYYY-MM-DD' (atau None) -> array datetime64[D]; kosong/tidak valid jadi NaT."""
+    # None membuat numpy jatuh ke jalur objek yang jauh lebih lambat
+    return _parse([v or "NaT" for v in values])
+
+
+def _parse(values):
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        # Ada nilai rusak: parse satu per satu supaya baris lain tetap terbaca
+        out = np.empty(len(values), dtype="datetime64[D]")
+        for i, v in enumerate(values):
+            try:
+                out[i] = np.datetime64(v[:10], "D")
+            except ValueError:
+                out[i] = np.datetime64("NaT")
+        return out
+
+
+def date_array(dates):
+    """List date (atau None) -> array datetime64[D] lewat ordinal, tanpa jalur objek numpy yang lambat."""
+    days = np.fromiter(
+        (d.toordinal() - _EPOCH_ORDINAL if d else _NAT for d in dates), dtype=np.int64, count=len(dates)
+    )
+    return days.view("datetime64[D]")
+
+
+def add_months(days, months=1):
+    """Tambah bulan dengan clamp akhir bulan seperti relativedelta (31 Jan + 1 bulan = 28/29 Feb)."""
+    month = days.astype("datetime64[M]")
+    offset = days - month.astype("datetime64[D]")
+    target = month + months
+    last_day = (target + 1).astype("datetime64[D]") - 1
+    return np.minimum(target.astype("datetime64[D]") + offset, last_day)
+
+
+class DueDates:
+    """Hasil classify(): array sejajar dengan baris input."""
+
+    __slots__ = ("expiry", "days_left", "status")
+
+    def __init__(self, expiry, days_left, status):
+        self.expiry = expiry
+        self.days_left = days_left
+        self.status = status
+
+    def __len__(self):
+        return len(self.status)
+
+    def row(self, i):
+        """(display_expired: date | None, days_left: int | None, status) untuk baris ke-i."""
+        if np.isnat(self.expiry[i]):
+            return None, None, int(self.status[i])
+        return self.expiry[i].item(), int(self.days_left[i]), int(self.status[i])
+
+
+def classify_columns(approved_date, expired_date, tanggal_sewa, paid, today=None, due_soon_days=DUE_SOON_DAYS,
+                     from_approved=True):
+    """Versi kolom dari classify(): tanggal berupa array datetime64[D], `paid` array bool.
+
+    Aturan jatuh tempo (dipakai reminder dan /infohosting): approved_date + 1
+    bulan jika ada, lalu expired_date, lalu tanggal_sewa. from_approved=False
+    melewati langkah pertama: list hosting memfilter, mengelompokkan per bulan
+    dan mengurutkan berdasarkan expired_date/tanggal_sewa yang tersimpan, jadi
+    tanggal yang ditampilkan harus sama dengan kolom itu.
+    """
+    expiry = np.where(np.isnat(expired_date), tanggal_sewa, expired_date)
+    if from_approved:
+        has_approved = ~np.isnat(approved_date)
+        expiry[has_approved] = add_months(approved_date[has_approved])
+
+    today = np.datetime64(today or date.today(), "D")
+    unknown = np.isnat(expiry)
+    days_left = (expiry - today).view(np.int64)
+    days_left[unknown] = 0
+
+    status = np.full(len(expiry), ACTIVE, dtype=np.int8)
+    status[days_left <= due_soon_days] = DUE_SOON
+    status[days_left < 0] = EXPIRED
+    status[unknown] = UNKNOWN
+    status[paid] = PAID
+    return DueDates(expiry, days_left, status)
+
+
+def classify(rows, today=None, due_soon_days=DUE_SOON_DAYS):
+    """Hitung tanggal jatuh tempo efektif, sisa hari, dan kelas status untuk banyak baris HostingServices sekaligus.
+
+    Kolom yang tidak di-select dianggap kosong.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    approved_date = _parse([r.get("approved_date") or "NaT" for r in rows])
+    expired_date = _parse([r.get("expired_date") or "NaT" for r in rows])
+
+    # tanggal_sewa hanya dibutuhkan baris tanpa approved_date & expired_date (jarang)
+    tanggal_sewa = np.full(len(rows), np.datetime64("NaT"), dtype="datetime64[D]")
+    fallback = np.flatnonzero(np.isnat(approved_date) & np.isnat(expired_date))
+    if len(fallback):
+        tanggal_sewa[fallback] = parse_dates([rows[i].get("tanggal_sewa") for i in fallback])
+
+    paid = np.fromiter((r.get("payment_status") == "approved" for r in rows), dtype=bool, count=len(rows))
+    return classify_columns(approved_date, expired_date, tanggal_sewa, paid, today=today, due_soon_days=due_soon_days)
+
+
+def classify_services(services, today=None, due_soon_days=DUE_SOON_DAYS, from_approved=True):
+    """classify() untuk list HostingService (tanggal sudah berupa date)."""
+    approved_date = date_array([s.approved_date for s in services])
+    expired_date = date_array([s.expired_date for s in services])
+
+    tanggal_sewa = np.full(len(services), np.datetime64("NaT"), dtype="datetime64[D]")
+    fallback = np.flatnonzero(np.isnat(approved_date) & np.isnat(expired_date))
+    if len(fallback):
+        tanggal_sewa[fallback] = date_array([services[i].tanggal_sewa for i in fallback])
+
+    paid = np.array([s.payment_status == "approved" for s in services], dtype=bool)
+    return classify_columns(
+        approved_date, expired_date, tanggal_sewa, paid, today=today, due_soon_days=due_soon_days,
+        from_approved=from_approved,
+    )
@@ -0,0 +1,219 @@
+# 📍 File: lib/metrics.py
+
+import functools
+import logging
+import time
+from prometheus_client import Counter, Histogram, Gauge, start_http_server
+from telegram.ext import CallbackQueryHandler, CommandHandler, ConversationHandler, InlineQueryHandler
+from telegram.request import HTTPXRequest
+from config import METRICS_ENABLED, METRICS_PORT, METRICS_ADDR
+
+logger = logging.getLogger(__name__)
+
+# Bucket detik: handler/query bot ini umumnya 5 ms - beberapa detik
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HANDLER_SECONDS = Histogram(
+    "hostmanagebot_handler_seconds", "Durasi callback handler Telegram",
+    ["handler", "trigger"], buckets=_BUCKETS,
+)
+HANDLER_ERRORS = Counter(
+    "hostmanagebot_handler_errors_total", "Exception yang lolos dari callback handler",
+    ["handler", "trigger"],
+)
+SUPABASE_SECONDS = Histogram(
+    "hostmanagebot_supabase_query_seconds", "Durasi query Supabase (termasuk antre di thread pool)",
+    ["table", "operation"], buckets=_BUCKETS,
+)
+SUPABASE_ERRORS = Counter(
+    "hostmanagebot_supabase_errors_total", "Query Supabase yang gagal",
+    ["table", "operation"],
+)
+TELEGRAM_REQUESTS = Counter(
+    "hostmanagebot_telegram_requests_total", "Request ke Bot API per endpoint dan status HTTP",
+    ["endpoint", "status"],
+)
+TELEGRAM_SECONDS = Histogram(
+    "hostmanagebot_telegram_request_seconds", "Durasi request ke Bot API",
+    ["endpoint"], buckets=_BUCKETS,
+)
+JOB_SECONDS = Histogram(
+    "hostmanagebot_job_seconds", "Durasi job scheduler",
+    ["job"], buckets=_BUCKETS + (60, 300),
+)
+JOB_FAILURES = Counter("hostmanagebot_job_failures_total", "Job scheduler yang gagal", ["job"])
+JOB_LAST_SUCCESS = Gauge("hostmanagebot_job_last_success_timestamp", "Unix time job terakhir sukses", ["job"])
+PAYMENT_PROOFS = Counter(
+    "hostmanagebot_payment_proofs_total", "Submission bukti transfer per hasil intake",
+    ["outcome"],
+)
+PROOF_ARCHIVE = Counter(
+    "hostmanagebot_proof_archive_total", "Foto bukti transfer per hasil arsip ke Supabase Storage",
+    ["outcome"],
+)
+PROOF_ARCHIVE_BYTES = Counter("hostmanagebot_proof_archive_bytes_total", "Byte bukti transfer yang diunggah ke Storage")
+
+_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+# labels() mengambil lock + membangun tuple setiap dipanggil; child per kombinasi label di-cache
+_children = {}
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def start_metrics_server(port=METRICS_PORT, addr=METRICS_ADDR):
+    """Endpoint /metrics di port terpisah (tidak ikut terbuka lewat URL webhook publik).
+
+    Gagal bind (mis. port sudah dipakai node_exporter) hanya di-log: metrics
+    tidak boleh menghalangi bot start.
+    """
+    if not METRICS_ENABLED:
+        return
+    try:
+        start_http_server(port, addr=addr)
+    except OSError as e:
+        logger.error(f"Gagal membuka endpoint metrics di {addr}:{port}: {e}")
+        return
+    logger.info(f"Prometheus metrics tersedia di {addr}:{port}/metrics")
+
+
+# ---------- Supabase ----------
+def query_labels(query):
+    """(table, operation) dari query builder postgrest, mis. ("HostingServices", "update")."""
+    path = getattr(query, "path", "").lstrip("/")
+    if path.startswith("rpc/"):
+        return path, "rpc"
+    operation = _OPERATIONS.get(getattr(query, "http_method", ""), "unknown")
+    if operation == "insert" and "resolution=" in query.headers.get("Prefer", ""):
+        operation = "upsert"
+    return path or "unknown", operation
+
+
+async def track_query(query, awaitable):
+    table, operation = query_labels(query)
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    except Exception:
+        _child(SUPABASE_ERRORS, table, operation).inc()
+        raise
+    finally:
+        _child(SUPABASE_SECONDS, table, operation).observe(time.perf_counter() - start)
+
+
+# ---------- Bot API ----------
+class InstrumentedRequestMixin:
+    """Mixin BaseRequest: catat jumlah, status, dan durasi request per endpoint Bot API."""
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        start = time.perf_counter()
+        status = "error"
+        try:
+            code, payload = await super().do_request(
+                url, method, request_data=request_data, read_timeout=read_timeout,
+                write_timeout=write_timeout, connect_timeout=connect_timeout, pool_timeout=pool_timeout,
+            )
+            status = str(code)
+            return code, payload
+        finally:
+            _child(TELEGRAM_REQUESTS, endpoint, status).inc()
+            _child(TELEGRAM_SECONDS, endpoint).observe(time.perf_counter() - start)
+
+
+class InstrumentedHTTPXRequest(InstrumentedRequestMixin, HTTPXRequest):
+    pass
+
+
+# ---------- handler ----------
+def _trigger(handler):
+    if isinstance(handler, CallbackQueryHandler) and handler.pattern is not None:
+        return getattr(handler.pattern, "pattern", str(handler.pattern))
+    if isinstance(handler, CommandHandler):
+        return "/" + ",".join(sorted(handler.commands))
+    if isinstance(handler, InlineQueryHandler):
+        return "inline_query"
+    return type(handler).__name__
+
+
+def iter_handlers(app):
+    """(handler, label) untuk semua handler app, termasuk yang ada di dalam ConversationHandler."""
+    for handlers in app.handlers.values():
+        for handler in handlers:
+            if isinstance(handler, ConversationHandler):
+                nested = list(handler.entry_points) + list(handler.fallbacks)
+                for state_handlers in handler.states.values():
+                    nested.extend(state_handlers)
+                for inner in nested:
+                    yield inner, f"{handler.name or 'conversation'}:{_callback_name(inner.callback)}"
+            else:
+                yield handler, _callback_name(handler.callback)
+
+
+def _callback_name(callback):
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def _wrap_handler(handler, name):
+    callback = handler.callback
+    if getattr(callback, "_instrumented", False):
+        return
+    trigger = _trigger(handler)
+    # Child metric di-bind sekali di sini, jalur update hanya observe()
+    seconds = HANDLER_SECONDS.labels(name, trigger)
+    errors = HANDLER_ERRORS.labels(name, trigger)
+
+    @functools.wraps(callback)
+    async def wrapped(update, context):
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - start)
+
+    wrapped._instrumented = True
+    handler.callback = wrapped
+
+
+def instrument_application(app):
+    """Bungkus callback semua handler (termasuk di dalam ConversationHandler) dengan histogram latensi."""
+    if not METRICS_ENABLED:
+        return
+    count = 0
+    for handler, name in iter_handlers(app):
+        _wrap_handler(handler, name)
+        count += 1
+    logger.info(f"Metrics: {count} handler diinstrumentasi")
+
+
+# ---------- scheduler ----------
+def timed_job(name, func):
+    """Bungkus job scheduler async supaya durasi & kegagalannya tercatat."""
+    if not METRICS_ENABLED:
+        return func
+    seconds = JOB_SECONDS.labels(name)
+
+    @functools.wraps(func)
+    async def wrapped(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            JOB_FAILURES.labels(name).inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - start)
+        JOB_LAST_SUCCESS.labels(name).set_to_current_time()
+        return result
+
+    return wrapped
@@ -0,0 +1,115 @@
+# 📍 File: lib/paged_picker.py
+
+import re
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from config import PICKER_PAGE_SIZE
+from database.supabase_client import supabase, run_query
+from database.local_replica import local_replica
+from lib.session_store import SessionStore
+
+# Halaman & kata kunci pencarian picker per admin
+picker_state = SessionStore("paged_picker")
+
+# Karakter yang punya arti khusus di filter PostgREST (or=, like)
+_UNSAFE = re.compile(r"[,()*%\\:\"]")
+
+
+def clean_search(text):
+    """Rapikan input pencarian supaya aman dipakai di filter ilike PostgREST."""
+    return _UNSAFE.sub("", text or "").strip()[:50]
+
+
+def ilike_prefix(search):
+    """Pola ilike PostgREST 'berawalan search'; `_` di input dicari apa adanya, bukan wildcard."""
+    return search.replace("_", "\\_") + "*"
+
+
+def active_services_fetcher(columns):
+    """fetch_page untuk HostingServices aktif, urut domain, cari awalan domain/provider."""
+    with_client = "HostingClients(" in columns
+
+    async def fetch(search, offset, limit):
+        if local_replica.ready:
+            return local_replica.active_services(search, offset, limit, with_client)
+        q = supabase.table("HostingServices").select(columns).eq("status", "active") \
+            .order("domain").order("id").range(offset, offset + limit - 1)
+        if search:
+            pattern = ilike_prefix(search)
+            q = q.or_(f"domain.ilike.{pattern},provider.ilike.{pattern}")
+        result = await run_query(q)
+        return result.data or []
+    return fetch
+
+
+class PagedPicker:
+    """Keyboard pilihan berhalaman dengan pencarian prefix.
+
+    Setiap layar hanya mengambil satu halaman (page_size + 1 baris lewat
+    range query); baris ekstra hanya penanda ada halaman berikutnya.
+
+    fetch_page(search, offset, limit) -> list baris
+    make_buttons(rows) -> list (label, callback_data)
+    Callback navigasi memakai prefix `name`: "<name>_page_<n>" dan "<name>_reset".
+    """
+
+    def __init__(self, name, fetch_page, make_buttons, footer=None, page_size=PICKER_PAGE_SIZE):
+        self.name = name
+        self.fetch_page = fetch_page
+        self.make_buttons = make_buttons
+        self.footer = footer or []
+        self.page_size = page_size
+
+    @property
+    def pattern(self):
+        return f"^{self.name}_"
+
+    def _key(self, user_id):
+        return f"{self.name}:{user_id}"
+
+    def state(self, user_id):
+        return picker_state.get(self._key(user_id)) or {"page": 0, "search": ""}
+
+    def reset(self, user_id):
+        picker_state[self._key(user_id)] = {"page": 0, "search": ""}
+
+    def set_search(self, user_id, text):
+        picker_state[self._key(user_id)] = {"page": 0, "search": clean_search(text)}
+
+    def handle_callback(self, user_id, data):
+        """Terapkan callback navigasi (<name>_page_<n> / <name>_reset) ke state picker."""
+        if data == f"{self.name}_reset":
+            self.reset(user_id)
+            return
+        state = self.state(user_id)
+        try:
+            state["page"] = max(0, int(data.rsplit("_", 1)[-1]))
+        except ValueError:
+            state["page"] = 0
+        picker_state[self._key(user_id)] = state
+
+    async def render(self, user_id):
+        """Bangun keyboard untuk halaman saat ini. Mengembalikan (markup, jumlah_baris, search)."""
+        state = self.state(user_id)
+        page, search = state["page"], state["search"]
+
+        rows = await self.fetch_page(search, page * self.page_size, self.page_size + 1)
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        keyboard = [
+            [InlineKeyboardButton(label, callback_data=callback_data)]
+            for label, callback_data in await self.make_buttons(rows)
+        ]
+
+        nav = []
+        if page > 0:
+            nav.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{self.name}_page_{page - 1}"))
+        if has_next:
+            nav.append(InlineKeyboardButton("➡️ Next", callback_data=f"{self.name}_page_{page + 1}"))
+        if nav:
+            keyboard.append(nav)
+        if search:
+            keyboard.append([InlineKeyboardButton(f"❌ Hapus pencarian \"{search}\"", callback_data=f"{self.name}_reset")])
+        keyboard.extend(self.footer)
+
+        return InlineKeyboardMarkup(keyboard), len(rows), search
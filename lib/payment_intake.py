@@ -0,0 +1,312 @@
+# 📍 File: lib/payment_intake.py
+
+import asyncio
+import logging
+from functools import partial
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
+from config import ADMIN_IDS, METRICS_ENABLED, PROOF_ALBUM_WAIT, PROOF_WORKERS
+from database.local_replica import local_replica
+from database.models import HostingService
+from database.proof_ledger import proof_ledger
+from database.supabase_client import supabase, run_query
+from lib.broadcast import broadcaster
+from lib.metrics import PAYMENT_PROOFS
+from lib.proof_archiver import proof_archiver
+from lib.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Bukti yang menunggu klien memilih layanan (lebih dari satu layanan menunggu bukti)
+pending_choice = SessionStore("payment_intake")
+
+
+class ProofSubmission:
+    """Satu pembayaran dari klien: satu foto, atau semua foto dalam satu album."""
+
+    __slots__ = ("user_id", "username", "full_name", "photos", "caption", "service_id", "bot")
+
+    def __init__(self, user_id, username, full_name, bot, caption=None, service_id=None, photos=None):
+        self.user_id = user_id
+        self.username = username
+        self.full_name = full_name
+        self.bot = bot
+        self.caption = caption
+        self.service_id = service_id
+        # [(file_id, file_unique_id)], tanpa duplikat
+        self.photos = []
+        for file_id, unique_id in photos or []:
+            self.add_photo(file_id, unique_id)
+
+    @classmethod
+    def from_message(cls, message, bot):
+        user = message.from_user
+        sub = cls(user.id, f"@{user.username}" if user.username else "-", user.full_name, bot, message.caption)
+        photo = message.photo[-1]
+        sub.add_photo(photo.file_id, photo.file_unique_id)
+        return sub
+
+    def add_photo(self, file_id, unique_id):
+        if all(u != unique_id for _, u in self.photos):
+            self.photos.append((file_id, unique_id))
+
+    @property
+    def unique_ids(self):
+        return [u for _, u in self.photos]
+
+
+def match_service(services, caption=None, service_id=None):
+    """Pilih layanan tujuan bukti transfer; None jika harus ditanyakan ke klien.
+
+    Urutan: pilihan eksplisit klien, domain yang disebut di caption, lalu
+    satu-satunya layanan yang belum punya bukti yang sedang ditinjau.
+    """
+    if service_id is not None:
+        return next((s for s in services if str(s.id) == str(service_id)), None)
+    text = (caption or "").lower()
+    named = [s for s in services if s.domain and s.domain.lower() in text]
+    if len(named) == 1:
+        return named[0]
+    candidates = named or services
+    open_ = [s for s in candidates if not s.payment_proof_url]
+    candidates = open_ or candidates
+    return candidates[0] if len(candidates) == 1 else None
+
+
+class PaymentIntake:
+    """Antrean intake bukti transfer dari klien.
+
+    Handler hanya memasukkan foto ke antrean lalu selesai. Foto dari satu
+    album (media_group_id sama) ditampung PROOF_ALBUM_WAIT detik dan
+    digabung menjadi satu submission. Worker lalu membuang foto yang sudah
+    pernah diterima (file_unique_id, lewat proof_ledger), mencocokkan
+    submission ke layanan yang menunggu bukti, menulis ke Supabase, dan
+    mengirim satu notifikasi ke setiap admin per pembayaran.
+    """
+
+    def __init__(self, album_wait=PROOF_ALBUM_WAIT, workers=PROOF_WORKERS):
+        self.album_wait = album_wait
+        self.workers = workers
+        self._queue = None
+        self._tasks = []
+        # (user_id, media_group_id) -> [ProofSubmission, TimerHandle]
+        self._albums = {}
+        # file_unique_id yang sedang antre/diproses: kiriman ulang dibuang tanpa query
+        self._inflight = set()
+
+    # ---------- siklus hidup ----------
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout=10):
+        """Proses album yang masih ditampung & sisa antrean, lalu hentikan worker."""
+        if self._queue is None:
+            return
+        for key in list(self._albums):
+            self._flush_album(key)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Intake bukti transfer: {self._queue.qsize()} submission belum diproses saat berhenti")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._queue, self._tasks = None, []
+
+    # ---------- masuk ----------
+    def submit(self, message, bot):
+        """Terima satu pesan foto dari klien (dipanggil handler, tidak menunggu apa pun)."""
+        self.start()
+        if not message.media_group_id:
+            self._enqueue(ProofSubmission.from_message(message, bot))
+            return
+        key = (message.from_user.id, message.media_group_id)
+        entry = self._albums.get(key)
+        if entry is None:
+            entry = self._albums[key] = [ProofSubmission.from_message(message, bot), None]
+        else:
+            photo = message.photo[-1]
+            entry[0].add_photo(photo.file_id, photo.file_unique_id)
+            entry[0].caption = entry[0].caption or message.caption
+            entry[1].cancel()
+        entry[1] = asyncio.get_running_loop().call_later(self.album_wait, self._flush_album, key)
+
+    def _flush_album(self, key):
+        sub, timer = self._albums.pop(key)
+        timer.cancel()
+        self._enqueue(sub)
+
+    def _enqueue(self, sub):
+        sub.photos = [p for p in sub.photos if p[1] not in self._inflight]
+        if not sub.photos:
+            self._count("duplicate")
+            return
+        self._inflight.update(sub.unique_ids)
+        self._queue.put_nowait(sub)
+
+    @staticmethod
+    def _count(outcome):
+        if METRICS_ENABLED:
+            PAYMENT_PROOFS.labels(outcome).inc()
+
+    def choose(self, user_id, service_id, bot):
+        """Klien memilih layanan untuk bukti yang tertunda. False jika pilihan sudah kedaluwarsa."""
+        pending = pending_choice.pop(user_id, None)
+        if pending is None:
+            return False
+        self.start()
+        self._enqueue(ProofSubmission(
+            user_id, pending["username"], pending["full_name"], bot,
+            caption=pending["caption"], service_id=service_id, photos=pending["photos"],
+        ))
+        return True
+
+    # ---------- worker ----------
+    async def _worker(self):
+        while True:
+            sub = await self._queue.get()
+            unique_ids = sub.unique_ids
+            try:
+                outcome = await self._process(sub)
+            except Exception as e:
+                outcome = "error"
+                logger.error(f"Intake bukti transfer user_id={sub.user_id} gagal: {e}", exc_info=True)
+            finally:
+                self._inflight.difference_update(unique_ids)
+                self._queue.task_done()
+            self._count(outcome)
+
+    async def _process(self, sub):
+        seen = await proof_ledger.seen(sub.unique_ids)
+        sub.photos = [p for p in sub.photos if p[1] not in seen]
+        if not sub.photos:
+            await sub.bot.send_message(sub.user_id, "ℹ️ Bukti transfer ini sudah kami terima sebelumnya.")
+            return "duplicate"
+
+        result = await run_query(
+            supabase.table("HostingServices").select("id, provider, domain, price_sell, payment_proof_url")
+            .eq("client_user_id", sub.user_id).eq("waiting_payment_proof", True).order("expired_date")
+        )
+        services = HostingService.from_rows(result.data)
+        if not services:
+            await sub.bot.send_message(sub.user_id, "⚠️ Tidak ada pembayaran yang menunggu bukti transfer.")
+            return "no_pending"
+
+        svc = match_service(services, sub.caption, sub.service_id)
+        if svc is None:
+            return await self._ask_choice(sub, services)
+        return await self._deliver(sub, svc)
+
+    async def _ask_choice(self, sub, services):
+        if sub.service_id is not None:
+            # Layanan yang dipilih sudah tidak menunggu bukti (mis. baru di-approve)
+            await sub.bot.send_message(sub.user_id, "⚠️ Layanan yang dipilih sudah tidak menunggu bukti transfer.")
+            return "no_pending"
+        previous = pending_choice.get(sub.user_id)
+        if previous and set(sub.unique_ids) <= {u for _, u in previous["photos"]}:
+            return "duplicate"
+        pending_choice[sub.user_id] = {
+            "username": sub.username, "full_name": sub.full_name,
+            "caption": sub.caption, "photos": sub.photos,
+        }
+        buttons = [
+            [InlineKeyboardButton(f"{s.domain} (Rp {s.price_sell:,})", callback_data=f"proofsvc_{s.id}")]
+            for s in services
+        ]
+        await sub.bot.send_message(
+            sub.user_id, "Bukti transfer ini untuk layanan yang mana?", reply_markup=InlineKeyboardMarkup(buttons)
+        )
+        return "ask_choice"
+
+    async def _deliver(self, sub, svc):
+        fields = {
+            "payment_proof_url": sub.photos[0][0],
+            "waiting_payment_proof": True,  # tetap True sampai admin approve/reject
+            "payment_status": "pending",
+        }
+        await run_query(supabase.table("HostingServices").update(fields).eq("id", svc.id))
+        local_replica.patch_service(svc.id, fields)
+
+        # Update di atas idempoten; hanya submission yang memenangkan claim yang memberi notifikasi
+        fresh = set(await proof_ledger.claim(sub.user_id, svc.id, sub.unique_ids))
+        claimed = [p for p in sub.photos if p[1] in fresh]
+        if not claimed:
+            return "duplicate"
+        photos = [file_id for file_id, _ in claimed]
+        unique_ids = [unique_id for _, unique_id in claimed]
+
+        # Claim hanya bertahan jika bukti benar-benar sampai ke admin; selain itu foto yang sama
+        # harus bisa dikirim ulang, bukan ditolak sebagai duplikat
+        try:
+            notified = await self._notify_admins(sub, svc, photos)
+            if not notified:
+                await proof_ledger.unclaim(unique_ids)
+                logger.error(
+                    f"Bukti transfer user {sub.user_id} untuk domain {svc.domain} tidak terkirim ke admin mana pun"
+                )
+                await sub.bot.send_message(
+                    sub.user_id,
+                    "⚠️ Bukti transfer belum bisa diteruskan ke admin. Silakan kirim ulang beberapa saat lagi.",
+                )
+                return "undelivered"
+            await sub.bot.send_message(
+                sub.user_id, f"✅ Bukti transfer untuk {svc.domain} diterima. Admin akan meninjau pembayaran Anda."
+            )
+        except Exception:
+            await proof_ledger.unclaim(unique_ids)
+            raise
+
+        logger.info(f"User {sub.user_id} kirim bukti transfer ({len(photos)} foto) untuk domain {svc.domain}")
+        # Salinan permanen di Storage: file_id di payment_proof_url dikosongkan saat reject/reset
+        await proof_archiver.submit(sub.user_id, svc.id, claimed)
+        return "notified"
+
+    async def _notify_admins(self, sub, svc, photos):
+        """Kirim bukti ke setiap admin; mengembalikan jumlah admin yang menerima foto utamanya."""
+        buttons = InlineKeyboardMarkup([[
+            InlineKeyboardButton("✅ Approve", callback_data=f"approve_{svc.id}"),
+            InlineKeyboardButton("❌ Reject", callback_data=f"reject_{svc.id}")
+        ]])
+        message_text = (
+            f"📢 <b>Pembayaran Masuk</b>\n\n"
+            f"🌐 Domain: <b>{svc.domain}</b>\n"
+            f"🏢 Provider: <code>{svc.provider}</code>\n"
+            f"💰 Harga: <b>Rp {svc.price_sell:,}</b>\n"
+            f"👤 Fullname: {sub.full_name}\n"
+            f"📛 Username: {sub.username}\n"
+            f"📌 Dari user_id: {sub.user_id}"
+        )
+        if len(photos) > 1:
+            message_text += f"\n📎 {len(photos)} foto (sisanya dikirim di bawah)"
+
+        results = await broadcaster.broadcast(
+            (admin_id, partial(
+                sub.bot.send_photo, chat_id=admin_id, photo=photos[0],
+                caption=message_text, parse_mode="HTML", reply_markup=buttons,
+            ))
+            for admin_id in ADMIN_IDS
+        )
+        for admin_id, res in zip(ADMIN_IDS, results):
+            if isinstance(res, Exception):
+                logger.error(f"Gagal kirim notifikasi bukti transfer ke admin_id={admin_id}: {res}")
+
+        if len(photos) > 1:
+            # Foto lain dari album: tanpa suara notifikasi, tombol approve tetap di pesan pertama.
+            # send_media_group butuh 2-10 foto.
+            extras = photos[1:11]
+            if len(extras) == 1:
+                send = partial(sub.bot.send_photo, photo=extras[0], disable_notification=True)
+            else:
+                send = partial(
+                    sub.bot.send_media_group, media=[InputMediaPhoto(f) for f in extras], disable_notification=True
+                )
+            await broadcaster.broadcast(
+                (admin_id, partial(send, chat_id=admin_id))
+                for admin_id, res in zip(ADMIN_IDS, results) if not isinstance(res, Exception)
+            )
+        return sum(not isinstance(res, Exception) for res in results)
+
+
+# ✅ Instance global
+payment_intake = PaymentIntake()
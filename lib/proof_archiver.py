@@ -0,0 +1,266 @@
+# 📍 File: lib/proof_archiver.py
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import httpx
+from PIL import Image
+from storage3.exceptions import StorageApiError
+from config import (
+    METRICS_ENABLED, PROOF_ARCHIVE_ENABLED, PROOF_ARCHIVE_BUCKET, PROOF_ARCHIVE_WORKERS,
+    PROOF_ARCHIVE_CHUNK, PROOF_THUMB_SIZE, PROOF_THUMB_WORKERS,
+)
+from database.proof_archive import proof_archive
+from database.supabase_client import supabase, run_query
+from lib.metrics import PROOF_ARCHIVE, PROOF_ARCHIVE_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+def _describe(error):
+    """Teks error yang aman di-log.
+
+    Pesan error httpx menyertakan URL request, dan URL file Bot API berisi
+    token bot (https://api.telegram.org/file/bot<TOKEN>/...), jadi untuk
+    error HTTP hanya kelas error & status code yang ditulis.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code} saat mengunduh file"
+    if isinstance(error, httpx.HTTPError):
+        return f"{error.__class__.__name__} saat mengunduh file"
+    return str(error)
+
+
+def make_thumbnail(src, dst, size):
+    """Tulis thumbnail JPEG dari src ke dst (dijalankan di process pool, bukan di event loop)."""
+    with Image.open(src) as img:
+        # JPEG: decoder langsung memperkecil skala, foto besar tidak di-decode penuh
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        img.thumbnail((size, size))
+        img.save(dst, "JPEG", quality=80, optimize=True)
+
+
+class ProofArchiver:
+    """Arsip bukti transfer dari Bot API ke Supabase Storage di background.
+
+    payment_proof_url hanya berisi file_id Telegram dan dikosongkan saat
+    reject/reset bulanan, jadi setiap foto yang diterima intake diantrekan
+    di sini (dicatat dulu di proof_archive supaya tahan restart). Worker
+    mengunduh file per potongan PROOF_ARCHIVE_CHUNK ke file sementara sambil
+    menghitung sha256, lalu mengunggah file tersebut (httpx membaca file
+    per potongan, isi file tidak pernah utuh di memori). Path objek
+    berdasarkan sha256, jadi isi yang sama diunggah sekali saja. Thumbnail
+    dibuat Pillow di ProcessPoolExecutor.
+
+    Karena path objek tidak menyebut layanan, kaitan foto -> layanan/klien
+    -> objek disimpan di tabel Supabase "PaymentProofs" (bukan hanya di
+    SQLite lokal), berikut keputusan admin approve/reject-nya.
+    """
+
+    def __init__(self, bucket=PROOF_ARCHIVE_BUCKET, workers=PROOF_ARCHIVE_WORKERS, chunk_size=PROOF_ARCHIVE_CHUNK,
+                 thumb_size=PROOF_THUMB_SIZE, thumb_workers=PROOF_THUMB_WORKERS, enabled=PROOF_ARCHIVE_ENABLED):
+        self.bucket = bucket
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.thumb_size = thumb_size
+        self.thumb_workers = thumb_workers
+        self.enabled = enabled
+        # Client storage3 sinkron; None = supabase.storage
+        self.storage = None
+        self._bot = None
+        self._queue = None
+        self._tasks = []
+        self._http = None
+        self._pool = None
+        # file_unique_id yang sedang antre/diproses
+        self._inflight = set()
+        # sha256 -> Task unggahan yang sedang berjalan (dua foto berisi sama diproses bersamaan)
+        self._uploads = {}
+
+    # ---------- siklus hidup ----------
+    async def start(self, bot):
+        """Mulai worker & antrekan ulang foto yang belum terarsip dari run sebelumnya."""
+        if not self.enabled or self._queue is not None:
+            return
+        self._bot = bot
+        self.storage = self.storage or supabase.storage
+        self._http = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0))
+        self._pool = ProcessPoolExecutor(max_workers=self.thumb_workers)
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        pending = await proof_archive.pending()
+        for photo in pending:
+            self._enqueue(photo)
+        if pending:
+            logger.info(f"Arsip bukti transfer: {len(pending)} foto tertunda diantrekan ulang")
+
+    async def stop(self, timeout=30):
+        """Selesaikan antrean (sisa diarsip saat start berikutnya), lalu hentikan worker."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Arsip bukti transfer: {self._queue.qsize()} foto dilanjutkan saat start berikutnya")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._http.aclose()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._queue, self._tasks, self._http, self._pool = None, [], None, None
+        self._inflight.clear()
+
+    # ---------- masuk ----------
+    async def submit(self, user_id, service_id, photos):
+        """Catat & antrekan foto [(file_id, file_unique_id)] yang baru diterima untuk service_id."""
+        if not self.enabled:
+            return
+        fresh = await proof_archive.add(user_id, service_id, photos)
+        try:
+            # Tautkan ke pembayaran sekarang, supaya keputusan admin tercatat walau unggahan belum selesai
+            await run_query(
+                supabase.table("PaymentProofs").upsert([
+                    {"file_unique_id": unique_id, "service_id": str(service_id), "user_id": user_id,
+                     "submitted_at": datetime.now().isoformat(timespec="seconds"), "decision": None}
+                    for _, unique_id in photos
+                ], on_conflict="file_unique_id", returning="minimal")
+            )
+        except Exception as e:
+            # Baris tetap dibuat saat foto selesai diarsip (_archive)
+            logger.warning(f"Gagal mencatat bukti transfer layanan {service_id} di PaymentProofs: {e}")
+        if self._queue is not None:
+            for photo in fresh:
+                self._enqueue(photo)
+
+    async def decide(self, service_id, decision):
+        """Catat keputusan admin ("approved"/"rejected") untuk bukti layanan ini yang belum diputuskan."""
+        if not self.enabled:
+            return
+        try:
+            await run_query(
+                supabase.table("PaymentProofs").update({
+                    "decision": decision, "decided_at": datetime.now().isoformat(timespec="seconds"),
+                }, returning="minimal").eq("service_id", str(service_id)).is_("decision", "null")
+            )
+        except Exception as e:
+            logger.error(f"Gagal mencatat keputusan {decision} untuk bukti layanan {service_id}: {e}")
+
+    def _enqueue(self, photo):
+        if photo[1] in self._inflight:
+            return
+        self._inflight.add(photo[1])
+        self._queue.put_nowait(photo)
+
+    @staticmethod
+    def _count(outcome, size=0):
+        if METRICS_ENABLED:
+            PROOF_ARCHIVE.labels(outcome).inc()
+            if size:
+                PROOF_ARCHIVE_BYTES.inc(size)
+
+    # ---------- worker ----------
+    async def _worker(self):
+        while True:
+            file_id, unique_id = await self._queue.get()
+            size = 0
+            try:
+                outcome, size = await self._archive(file_id, unique_id)
+            except Exception as e:
+                outcome = "error"
+                logger.error(
+                    f"Arsip bukti transfer {unique_id} gagal (dicoba lagi saat start berikutnya): {_describe(e)}"
+                )
+            finally:
+                self._inflight.discard(unique_id)
+                self._queue.task_done()
+            self._count(outcome, size)
+
+    async def _archive(self, file_id, unique_id):
+        tg_file = await self._bot.get_file(file_id)
+        fd, tmp = tempfile.mkstemp(prefix="proof-", suffix=".jpg")
+        try:
+            sha256, size = await self._download(tg_file.file_path, fd)
+            obj = await proof_archive.object(sha256)
+            outcome = "duplicate"
+            if obj is None:
+                task = self._uploads.get(sha256)
+                if task is None:
+                    outcome = "archived"
+                    task = self._uploads[sha256] = asyncio.create_task(self._store(sha256, tmp))
+                    task.add_done_callback(lambda _: self._uploads.pop(sha256, None))
+                obj = await task
+            await self._link(unique_id, sha256, obj, size)
+            await proof_archive.record(unique_id, sha256, obj["path"], obj["thumb_path"], size)
+        finally:
+            os.unlink(tmp)
+        return outcome, size if outcome == "archived" else 0
+
+    async def _link(self, unique_id, sha256, obj, size):
+        """Simpan kaitan foto -> objek di Supabase; gagal = foto tetap tertunda & dicoba lagi."""
+        user_id, service_id = await proof_archive.owner(unique_id)
+        await run_query(
+            supabase.table("PaymentProofs").upsert({
+                "file_unique_id": unique_id, "service_id": service_id, "user_id": user_id,
+                "sha256": sha256, "path": obj["path"], "thumb_path": obj["thumb_path"], "size": size,
+                "archived_at": datetime.now().isoformat(timespec="seconds"),
+            }, on_conflict="file_unique_id", returning="minimal")
+        )
+
+    async def _download(self, url, fd):
+        """Stream file ke fd; mengembalikan (sha256, ukuran)."""
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            async with self._http.stream("GET", url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        return digest.hexdigest(), size
+
+    async def _store(self, sha256, tmp):
+        path = f"proofs/{sha256[:2]}/{sha256}.jpg"
+        thumb_tmp = f"{tmp}.thumb.jpg"
+        thumb_path = None
+        try:
+            # Unggah foto asli sambil Pillow membuat thumbnail di proses lain
+            uploaded, thumbed = await asyncio.gather(
+                asyncio.to_thread(self._upload, path, tmp),
+                asyncio.get_running_loop().run_in_executor(
+                    self._pool, make_thumbnail, tmp, thumb_tmp, self.thumb_size
+                ),
+                return_exceptions=True,
+            )
+            if isinstance(uploaded, BaseException):
+                raise uploaded
+            if isinstance(thumbed, BaseException):
+                # Foto asli sudah tersimpan; tanpa thumbnail admin tetap bisa membuka aslinya
+                logger.warning(f"Thumbnail bukti transfer {sha256[:12]} gagal dibuat: {thumbed}")
+            else:
+                thumb_path = f"thumbs/{sha256[:2]}/{sha256}.jpg"
+                await asyncio.to_thread(self._upload, thumb_path, thumb_tmp)
+        finally:
+            if os.path.exists(thumb_tmp):
+                os.unlink(thumb_tmp)
+        return {"path": path, "thumb_path": thumb_path}
+
+    def _upload(self, path, local_path):
+        try:
+            # Path (bukan bytes): storage3 membuka file & httpx mengirimnya per potongan
+            self.storage.from_(self.bucket).upload(
+                path, local_path, {"content-type": "image/jpeg", "cache-control": "31536000"}
+            )
+        except StorageApiError as e:
+            # Objek content-addressed sudah ada (mis. ledger lokal hilang): isinya pasti sama
+            if str(e.status) != "409" and e.code != "Duplicate":
+                raise
+
+
+# ✅ Instance global
+proof_archiver = ProofArchiver()
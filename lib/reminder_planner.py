@@ -0,0 +1,138 @@
+# 📍 File: lib/reminder_planner.py
+
+import heapq
+import logging
+from datetime import timedelta
+from dateutil.relativedelta import relativedelta
+import numpy as np
+from database.supabase_client import supabase, run_query
+from database.models import HostingService
+from lib.due_dates import DUE_SOON_DAYS, classify_services
+
+logger = logging.getLogger(__name__)
+
+# Reminder dikirim mulai H-3 sampai H-0
+REMINDER_DAYS_BEFORE = DUE_SOON_DAYS
+# Rentang hari ke depan yang dimuat sekali per hari ke dalam heap
+PLAN_HORIZON_DAYS = 7
+
+REMINDER_COLUMNS = "id, client_user_id, provider, domain, expired_date, price_sell, payment_status, approved_date"
+
+
+class ReminderPlanner:
+    """Penjadwal reminder berbasis min-heap.
+
+    Sekali per hari (atau setelah invalidate()) planner mengambil hanya layanan
+    yang jatuh tempo dalam PLAN_HORIZON_DAYS ke depan lewat filter rentang
+    tanggal, lalu menyimpan (tanggal_kirim, service_id) di heap. Run yang tidak
+    punya jadwal jatuh tempo cukup mengecek puncak heap tanpa query apa pun.
+    """
+
+    def __init__(self, days_before=REMINDER_DAYS_BEFORE, horizon_days=PLAN_HORIZON_DAYS):
+        self.days_before = days_before
+        self.horizon_days = horizon_days
+        self._heap = []
+        self._planned_on = None
+
+    def invalidate(self):
+        """Paksa replan pada run berikutnya (dipanggil setelah data layanan berubah)."""
+        self._planned_on = None
+
+    def _window_query(self, today):
+        end = today + timedelta(days=self.horizon_days)
+        # approved_date + 1 bulan tidak bisa dibalik persis karena clamp akhir bulan,
+        # jadi rentangnya dilebarkan sedikit lalu dicek ulang di Python.
+        approved_start = today - relativedelta(months=1) - timedelta(days=self.days_before)
+        approved_end = end - relativedelta(months=1) + timedelta(days=self.days_before)
+        return (
+            supabase.table("HostingServices")
+            .select(REMINDER_COLUMNS)
+            .eq("status", "active")
+            .neq("payment_status", "approved")
+            .or_(
+                f"and(approved_date.is.null,expired_date.gte.{today.isoformat()},expired_date.lte.{end.isoformat()}),"
+                f"and(approved_date.gte.{approved_start.isoformat()},approved_date.lte.{approved_end.isoformat()})"
+            )
+        )
+
+    async def replan(self, today):
+        result = await run_query(self._window_query(today))
+        services = HostingService.from_rows(result.data)
+        end = today + timedelta(days=self.horizon_days)
+
+        dates = classify_services(services, today)
+        in_window = np.flatnonzero((dates.days_left >= 0) & (dates.days_left <= self.horizon_days)
+                                   & ~np.isnat(dates.expiry))
+        # Hari kirim = max(hari ini, jatuh tempo - days_before), dalam offset hari dari today
+        offsets = np.maximum(dates.days_left[in_window] - self.days_before, 0).tolist()
+        heap = [(today + timedelta(days=off), services[i].id) for i, off in zip(in_window.tolist(), offsets)]
+
+        heapq.heapify(heap)
+        self._heap = heap
+        self._planned_on = today
+        logger.info(f"Reminder planner: {len(heap)} layanan dijadwalkan s/d {end}")
+
+    async def due(self, today):
+        """Kembalikan list (HostingService, display_expired) yang harus diingatkan hari ini."""
+        if self._planned_on != today:
+            await self.replan(today)
+
+        if not self._heap or self._heap[0][0] > today:
+            return []
+
+        popped = []
+        while self._heap and self._heap[0][0] <= today:
+            popped.append(heapq.heappop(self._heap))
+        due_ids = [svc_id for _, svc_id in popped]
+
+        # Ambil ulang baris yang jatuh tempo saja, supaya yang sudah approved tidak ikut terkirim
+        try:
+            result = await run_query(
+                supabase.table("HostingServices")
+                .select(REMINDER_COLUMNS)
+                .in_("id", due_ids)
+                .eq("status", "active")
+                .neq("payment_status", "approved")
+            )
+        except Exception:
+            # Query gagal: jadwal dikembalikan supaya dicoba lagi di run berikutnya
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+            raise
+
+        services = HostingService.from_rows(result.data)
+        dates = classify_services(services, today)
+        due = []
+        for i, svc in enumerate(services):
+            display_expired, days_left, _ = dates.row(i)
+            if days_left is not None and 0 <= days_left <= self.days_before:
+                due.append((svc, display_expired))
+        return due
+
+    def apply_change(self, svc, today):
+        """Patch jadwal dari satu perubahan layanan (change feed) tanpa replan penuh.
+
+        Cukup menambah entri heap jika layanan masuk window; entri lama yang
+        sudah tidak berlaku tidak perlu dihapus karena due() mengambil ulang
+        dan mengecek ulang setiap baris yang jatuh tempo.
+        """
+        if self._planned_on != today or svc.status != "active" or svc.is_paid:
+            return
+        display_expired, days_left, _ = classify_services([svc], today).row(0)
+        if days_left is not None and 0 <= days_left <= self.horizon_days:
+            remind_on = max(today, display_expired - timedelta(days=self.days_before))
+            heapq.heappush(self._heap, (remind_on, svc.id))
+
+    def retry(self, svc_id, today):
+        """Kembalikan jadwal hari ini (kiriman gagal/terpotong): dicoba lagi di run berikutnya."""
+        heapq.heappush(self._heap, (today, svc_id))
+
+    def reschedule(self, svc_id, display_expired, today):
+        """Jadwalkan reminder berikutnya (besok) selama belum lewat H-0."""
+        next_day = today + timedelta(days=1)
+        if next_day <= display_expired:
+            heapq.heappush(self._heap, (next_day, svc_id))
+
+
+# ✅ Instance global yang dipakai scheduler & handler
+reminder_planner = ReminderPlanner()
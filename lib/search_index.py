@@ -0,0 +1,310 @@
+# 📍 File: lib/search_index.py
+
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from config import SEARCH_INDEX_TTL
+from database.supabase_client import supabase, run_query
+from database.models import HostingService
+
+logger = logging.getLogger(__name__)
+
+_LOAD_PAGE_SIZE = 1000
+# Di atas perkiraan jumlah hasil ini, hasil diambil dengan memindai urutan domain
+# (berhenti setelah `limit` hasil) alih-alih mengumpulkan & mengurutkan semua kandidat.
+_SCAN_THRESHOLD = 2000
+# Batas baris yang diperiksa saat memindai; jika habis (trigram umum tapi kombinasinya
+# jarang), kembali ke jalur kumpulkan-lalu-urutkan yang kandidatnya ternyata sedikit.
+_SCAN_BUDGET = 5000
+SERVICE_COLUMNS = "id,domain,provider,service_type,client_user_id,expired_date,status"
+
+
+def _grams(text):
+    """Trigram dari teks (lowercase). Teks < 3 huruf tidak punya trigram."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefixes(text):
+    """Awalan 1-2 huruf dari setiap kata, untuk query yang masih sangat pendek."""
+    out = set()
+    for word in text.replace(".", " ").replace("-", " ").split():
+        out.add(word[:1])
+        out.add(word[:2])
+    return out
+
+
+class _GramIndex:
+    """Index n-gram sederhana: doc_id -> teks, gram/awalan -> set doc_id."""
+
+    def __init__(self):
+        self.texts = {}
+        self.grams = {}
+
+    def add(self, doc_id, text):
+        self.remove(doc_id)
+        text = text.lower()
+        self.texts[doc_id] = text
+        for g in _grams(text) | _prefixes(text):
+            self.grams.setdefault(g, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        text = self.texts.pop(doc_id, None)
+        if text is None:
+            return
+        for g in _grams(text) | _prefixes(text):
+            ids = self.grams.get(g)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self.grams[g]
+
+    def postings(self, q):
+        """Posting list yang harus memuat doc_id agar cocok dengan q (terkecil dulu), atau None jika tidak ada."""
+        if len(q) < 3:
+            ids = self.grams.get(q)
+            return [ids] if ids else None
+        sets = [self.grams.get(g) for g in _grams(q)]
+        if any(s is None for s in sets):
+            return None
+        return sorted(sets, key=len)
+
+    def matches(self, doc_id, q, sets):
+        if not all(doc_id in s for s in sets):
+            return False
+        return len(q) < 3 or q in self.texts[doc_id]
+
+    def search(self, q):
+        """Semua doc_id yang teksnya mengandung q (substring), atau berawalan q untuk q pendek."""
+        sets = self.postings(q)
+        if sets is None:
+            return set()
+        if len(q) < 3:
+            return set(sets[0])
+        candidates = set(sets[0])
+        for s in sets[1:]:
+            candidates &= s
+            if not candidates:
+                return candidates
+        # Trigram cocok belum tentu berurutan; verifikasi substring
+        return {doc_id for doc_id in candidates if q in self.texts[doc_id]}
+
+
+class SearchIndex:
+    """Index pencarian in-memory untuk inline query admin.
+
+    Mengindeks HostingServices (domain + provider) dan nama klien
+    (HostingClients full_name/username). Dibangun sekali saat startup lalu
+    diperbarui incremental oleh handler add/edit/delete, approve dan /start,
+    sehingga setiap ketikan admin tidak perlu query ke Supabase. Perubahan
+    di luar bot (cli.py, SQL editor) masuk lewat change feed, atau lewat
+    rebuild di latar belakang setelah TTL jika feed tidak tersambung.
+    """
+
+    def __init__(self, ttl=SEARCH_INDEX_TTL):
+        self.ttl = ttl
+        self._reset()
+        self._client_directory = None
+        self._loaded_at = None
+        self._refresh_task = None
+        # True selama change feed tersambung: index diperbarui per event, rebuild TTL tidak perlu
+        self.live = False
+        # Satu list per load() yang sedang berjalan: perubahan layanan (fungsi, argumen) sesuai urutan
+        self._load_writes = []
+
+    def _reset(self):
+        self.services = {}
+        self._service_index = _GramIndex()
+        self._client_index = _GramIndex()
+        # client_user_id -> set service_id
+        self._by_client = {}
+        # (domain lowercase, service_id) terurut: urutan ranking hasil
+        self._sorted = []
+
+    @staticmethod
+    def _sort_key(svc_id, svc):
+        return ((svc.domain or "").lower(), svc_id)
+
+    def _index_service(self, svc):
+        """Masukkan HostingService ke index; mengembalikan svc_id, atau None jika tidak aktif."""
+        svc_id = str(svc.id)
+        self._remove_service(svc_id)
+        if (svc.status or "active") != "active":
+            return None
+        self.services[svc_id] = svc
+        self._service_index.add(svc_id, f"{svc.domain or ''} {svc.provider or ''}")
+        self._by_client.setdefault(svc.client_user_id, set()).add(svc_id)
+        return svc_id
+
+    # ---------- update incremental ----------
+    def _record(self, func, *args):
+        for writes in self._load_writes:
+            writes.append((func, args))
+
+    def upsert_service(self, svc):
+        self._record(self._upsert_service, svc)
+        self._upsert_service(svc)
+
+    def _upsert_service(self, svc):
+        svc_id = self._index_service(svc)
+        if svc_id is not None:
+            bisect.insort(self._sorted, self._sort_key(svc_id, self.services[svc_id]))
+
+    def patch_service(self, svc_id, fields):
+        """Perbarui sebagian kolom layanan (mis. setelah edit satu field)."""
+        self._record(self._patch_service, svc_id, fields)
+        self._patch_service(svc_id, fields)
+
+    def _patch_service(self, svc_id, fields):
+        svc = self.services.get(str(svc_id))
+        if svc is not None:
+            self._upsert_service(HostingService.from_row({**svc.to_row(), **fields}))
+
+    def remove_service(self, svc_id):
+        self._record(self._remove_service, svc_id)
+        self._remove_service(svc_id)
+
+    def _remove_service(self, svc_id):
+        svc_id = str(svc_id)
+        svc = self.services.pop(svc_id, None)
+        if svc is None:
+            return
+        self._by_client.get(svc.client_user_id, set()).discard(svc_id)
+        self._service_index.remove(svc_id)
+        key = self._sort_key(svc_id, svc)
+        i = bisect.bisect_left(self._sorted, key)
+        if i < len(self._sorted) and self._sorted[i] == key:
+            del self._sorted[i]
+
+    def update_client(self, user_id, username, full_name):
+        names = " ".join(n for n in (full_name, username) if n and n != "-")
+        self._client_index.add(user_id, names)
+
+    def remove_client(self, user_id):
+        self._client_index.remove(user_id)
+
+    def build(self, services, clients):
+        """Bangun ulang seluruh index. services: iterable HostingService, clients: (user_id, username, full_name)."""
+        self._reset()
+        for svc in services:
+            svc_id = self._index_service(svc)
+            if svc_id is not None:
+                self._sorted.append(self._sort_key(svc_id, self.services[svc_id]))
+        self._sorted.sort()
+        for user_id, username, full_name in clients:
+            self.update_client(user_id, username, full_name)
+
+    async def load(self, client_directory):
+        """Bangun ulang index dari Supabase.
+
+        Perubahan layanan (handler atau change feed) selama halaman dibaca
+        dicatat lalu diterapkan lagi di atas hasil load, supaya tidak
+        tertimpa snapshot yang lebih lama. Klien diambil dari
+        client_directory yang sudah menjaga hal yang sama (load_all).
+        """
+        started = time.perf_counter()
+        services = []
+        writes = []
+        self._load_writes.append(writes)
+        try:
+            offset = 0
+            while True:
+                result = await run_query(
+                    supabase.table("HostingServices").select(SERVICE_COLUMNS).eq("status", "active")
+                    .order("id").range(offset, offset + _LOAD_PAGE_SIZE - 1)
+                )
+                page = result.data or []
+                services.extend(HostingService.from_rows(page))
+                if len(page) < _LOAD_PAGE_SIZE:
+                    break
+                offset += _LOAD_PAGE_SIZE
+        finally:
+            self._load_writes.remove(writes)
+
+        clients = [
+            (uid, c.username, c.full_name)
+            for uid, c in client_directory.items()
+        ]
+        self.build(services, clients)
+        for func, args in writes:
+            func(*args)
+        self._client_directory = client_directory
+        self._loaded_at = time.monotonic()
+        logger.info(
+            f"Search index dibangun: {len(self.services)} layanan, {len(clients)} klien "
+            f"dalam {time.perf_counter() - started:.2f} detik"
+        )
+
+    def _refresh_if_stale(self):
+        if self.live or self._loaded_at is None:
+            return
+        stale = time.monotonic() - self._loaded_at > self.ttl
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self.load(self._client_directory))
+
+    # ---------- query ----------
+    def search(self, query, limit=20):
+        """Cari layanan berdasarkan domain, provider, atau nama klien. Mengembalikan list (svc_id, svc)."""
+        self._refresh_if_stale()
+        q = query.strip().lower()
+        if not q:
+            return []
+        sets = self._service_index.postings(q)
+        clients = self._client_index.search(q)
+
+        estimate = len(sets[0]) if sets else 0
+        for user_id in clients:
+            if estimate > _SCAN_THRESHOLD:
+                break
+            estimate += len(self._by_client.get(user_id, ()))
+
+        ids = self._scan(q, sets, clients, limit) if estimate > _SCAN_THRESHOLD else None
+        if ids is None:
+            ids = self._service_index.search(q)
+            for user_id in clients:
+                ids |= self._by_client.get(user_id, set())
+            # Domain yang berawalan q lebih dulu, lalu urut abjad
+            ids = heapq.nsmallest(limit, ids, key=lambda i: self._rank(i, q))
+        return [(i, self.services[i]) for i in ids]
+
+    def _rank(self, svc_id, q):
+        domain, _ = self._sort_key(svc_id, self.services[svc_id])
+        return (not domain.startswith(q), domain, svc_id)
+
+    def _scan(self, q, sets, clients, limit):
+        """Ambil `limit` hasil pertama sesuai ranking tanpa mengumpulkan semua kandidat.
+
+        Mengembalikan None jika _SCAN_BUDGET habis sebelum hasil terkumpul.
+        """
+        def matches(svc_id):
+            if self.services[svc_id].client_user_id in clients:
+                return True
+            return sets is not None and self._service_index.matches(svc_id, q, sets)
+
+        out = []
+        budget = _SCAN_BUDGET
+        # 1. Domain berawalan q: satu rentang berurutan di _sorted
+        i = bisect.bisect_left(self._sorted, (q,))
+        while i < len(self._sorted) and len(out) < limit:
+            domain, svc_id = self._sorted[i]
+            if not domain.startswith(q):
+                break
+            if matches(svc_id):
+                out.append(svc_id)
+            i += 1
+            budget -= 1
+        # 2. Sisanya urut abjad domain
+        for domain, svc_id in self._sorted:
+            if len(out) >= limit:
+                break
+            budget -= 1
+            if budget < 0:
+                return None
+            if not domain.startswith(q) and matches(svc_id):
+                out.append(svc_id)
+        return out
+
+
+# ✅ Instance global
+search_index = SearchIndex()
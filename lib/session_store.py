@@ -0,0 +1,194 @@
+# 📍 File: lib/session_store.py
+
+import sys
+import time
+from collections import OrderedDict
+from config import SESSION_MAX_ENTRIES, SESSION_TTL, SESSION_MAX_BYTES
+
+# Semua store yang dibuat, per nama (untuk metrics / persistence)
+STORES = {}
+
+
+def _sizeof(value, _seen=None):
+    """Perkiraan ukuran memori (byte) sebuah nilai beserta isinya."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, _seen) + _sizeof(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(v, _seen) for v in value)
+    return size
+
+
+class SessionStore:
+    """Penyimpanan state percakapan per user dengan batas ukuran.
+
+    Pengganti dict global (temp_data, temp_delete, list_state). Entri yang
+    tidak disentuh selama `ttl` detik dibuang, dan jika jumlah entri atau
+    total memori melewati batas, entri yang paling lama tidak dipakai (LRU)
+    dibuang lebih dulu. Interface-nya mirip dict supaya handler tidak banyak berubah.
+    """
+
+    def __init__(self, name, max_entries=SESSION_MAX_ENTRIES, ttl=SESSION_TTL,
+                 max_bytes=SESSION_MAX_BYTES, default_factory=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.default_factory = default_factory
+        # key -> [value, expires_at, size]
+        self._data = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Diaktifkan oleh persistence: catat key yang berubah/dihapus sejak flush terakhir
+        self.track_changes = False
+        self._dirty = set()
+        self._deleted = set()
+        STORES[name] = self
+
+    # ---------- internal ----------
+    def _drop(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _remove(self, key):
+        self._drop(key)
+        if self.track_changes:
+            self._dirty.discard(key)
+            self._deleted.add(key)
+
+    def _expire(self, now):
+        # Urutan OrderedDict = urutan akses terakhir = urutan kedaluwarsa
+        while self._data:
+            key, (_, expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def _enforce_limits(self, keep):
+        while len(self._data) > 1 and (
+            len(self._data) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._data))
+            if key == keep:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def _store(self, key, value, now, ttl=None):
+        if key in self._data:
+            self._drop(key)
+        size = _sizeof(value)
+        self._data[key] = [value, now + (self.ttl if ttl is None else ttl), size]
+        self._bytes += size
+        if self.track_changes:
+            self._deleted.discard(key)
+            self._dirty.add(key)
+        self._enforce_limits(keep=key)
+
+    def _lookup(self, key):
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Refresh TTL, posisi LRU, dan ukuran (nilai dict bisa diubah in-place oleh handler)
+        self._store(key, entry[0], now)
+        return entry
+
+    # ---------- interface mirip dict ----------
+    def __getitem__(self, key):
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        if self.default_factory is None:
+            raise KeyError(key)
+        value = self.default_factory()
+        self._store(key, value, time.monotonic())
+        return value
+
+    def __setitem__(self, key, value):
+        now = time.monotonic()
+        self._expire(now)
+        self._store(key, value, now)
+
+    def __contains__(self, key):
+        self._expire(time.monotonic())
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._lookup(key)
+        return default if entry is None else entry[0]
+
+    def pop(self, key, *default):
+        self._expire(time.monotonic())
+        if key in self._data:
+            value = self._data[key][0]
+            self._remove(key)
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def clear(self):
+        for key in list(self._data):
+            self._remove(key)
+
+    def items(self):
+        self._expire(time.monotonic())
+        return [(k, entry[0]) for k, entry in self._data.items()]
+
+    def drain_changes(self):
+        """Ambil perubahan sejak panggilan terakhir: (dict key->value yang berubah, set key yang dihapus)."""
+        self._expire(time.monotonic())
+        changed = {k: self._data[k][0] for k in self._dirty if k in self._data}
+        deleted = self._deleted
+        self._dirty = set()
+        self._deleted = set()
+        return changed, deleted
+
+    def restore(self, items):
+        """Isi ulang store dari persistence saat startup (tidak dihitung sebagai perubahan).
+
+        items: (key, value) atau (key, value, sisa_ttl_detik). Entri dengan sisa
+        TTL dimasukkan berurutan dari yang paling cepat kedaluwarsa supaya
+        urutan OrderedDict tetap sama dengan urutan kedaluwarsa.
+        """
+        now = time.monotonic()
+        tracking = self.track_changes
+        self.track_changes = False
+        items = sorted(
+            ((item[0], item[1], item[2] if len(item) > 2 else self.ttl) for item in items),
+            key=lambda item: item[2],
+        )
+        for key, value, ttl in items:
+            self._store(key, value, now, ttl)
+            # Nilai ini sudah sama dengan isi persistence
+            self._dirty.discard(key)
+            self._deleted.discard(key)
+        self.track_changes = tracking
+
+    def stats(self):
+        """Metrics store: jumlah entri, memori, hit/miss, eviction."""
+        return {
+            "name": self.name,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
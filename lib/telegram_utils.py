@@ -0,0 +1,35 @@
+# 📍 File: lib/telegram_utils.py
+
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import ContextTypes, ConversationHandler, TypeHandler
+
+SESSION_EXPIRED_TEXT = "⌛ Sesi sudah kedaluwarsa karena tidak ada aktivitas. Silakan mulai lagi dari menu /admin."
+
+_back_button = InlineKeyboardMarkup(
+    [[InlineKeyboardButton("⬅️ Kembali ke Menu", callback_data="back_to_menu")]]
+)
+
+
+async def session_expired(update: Update):
+    """Balas bahwa data sesi (SessionStore) sudah hilang dan akhiri percakapan.
+
+    Dipakai state handler ConversationHandler saat entri temp_data sudah
+    kedaluwarsa (TTL) atau hilang setelah restart: admin diminta mulai ulang
+    alih-alih handler melempar KeyError dan percakapan macet di state itu.
+    Callback query harus sudah di-answer oleh pemanggil.
+    """
+    message = update.effective_message
+    if message:
+        await message.reply_text(SESSION_EXPIRED_TEXT, reply_markup=_back_button)
+    return ConversationHandler.END
+
+
+async def _conversation_timed_out(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat = update.effective_chat if isinstance(update, Update) else None
+    if chat:
+        await context.bot.send_message(chat.id, SESSION_EXPIRED_TEXT, reply_markup=_back_button)
+
+
+def timeout_state():
+    """State ConversationHandler.TIMEOUT: beri tahu admin saat conversation_timeout habis."""
+    return {ConversationHandler.TIMEOUT: [TypeHandler(Update, _conversation_timed_out)]}
@@ -0,0 +1,85 @@
+# 📍 File: lib/update_processor.py
+
+import asyncio
+import sys
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def _chat_key(update):
+    """Kunci serialisasi: chat jika ada, selain itu user (mis. inline query). None = bebas paralel."""
+    if isinstance(update, Update):
+        if update.effective_chat:
+            return ("chat", update.effective_chat.id)
+        if update.effective_user:
+            return ("user", update.effective_user.id)
+    return None
+
+
+class ChatSerializedUpdateProcessor(BaseUpdateProcessor):
+    """Proses update secara paralel, tapi berurutan untuk chat yang sama.
+
+    Update dari chat berbeda berjalan bersamaan (maksimal `limit` sekaligus),
+    sedangkan update dari satu chat menunggu update sebelumnya selesai,
+    sehingga langkah ConversationHandler dan SessionStore (temp_data, dll.)
+    satu user tetap konsisten.
+
+    Semaphore bawaan BaseUpdateProcessor diambil sebelum do_process_update;
+    jika dipakai sebagai batas, update yang antre di belakang lock chat ikut
+    memakan slot dan satu user yang spam bisa menahan semua user lain. Karena
+    itu batas semaphore bawaan dibuat tak terbatas dan `limit` ditegakkan di
+    sini setelah lock chat didapat.
+    """
+
+    __slots__ = ("_limit", "_slots", "_locks", "_active")
+
+    def __init__(self, limit):
+        if limit < 1:
+            raise ValueError("limit harus >= 1")
+        super().__init__(max_concurrent_updates=sys.maxsize)
+        self._limit = limit
+        self._slots = asyncio.BoundedSemaphore(limit)
+        # key -> [asyncio.Lock, jumlah update yang memakai/menunggu lock]
+        self._locks = {}
+        self._active = 0
+
+    @property
+    def max_concurrent_updates(self):
+        # Selama BaseUpdateProcessor.__init__ _limit belum ada: semaphore bawaan dibuat tak terbatas
+        return getattr(self, "_limit", None) or sys.maxsize
+
+    @property
+    def current_concurrent_updates(self):
+        return self._active
+
+    async def do_process_update(self, update, coroutine):
+        key = _chat_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await self._run(coroutine)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    async def _run(self, coroutine):
+        async with self._slots:
+            self._active += 1
+            try:
+                await coroutine
+            finally:
+                self._active -= 1
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
@@ -0,0 +1,97 @@
+# 📍 File: lib/validators.py
+#
+# Aturan input layanan hosting yang dipakai bersama oleh percakapan
+# add/edit hosting dan import massal (cli.py). Setiap parser menerima teks
+# mentah dan melempar ValueError dengan pesan yang bisa langsung ditampilkan.
+
+import math
+from datetime import datetime
+
+SERVICE_TYPES = ("hosting", "domain", "VPS", "email")
+
+# Kolom yang diisi admin saat add hosting; expired_date awal = tanggal_sewa
+SERVICE_FIELDS = ("client_user_id", "provider", "domain", "service_type", "tanggal_sewa", "price_buy", "price_sell")
+
+
+def parse_date(text):
+    """'YYYY-MM-DD' -> string tanggal yang sama (dinormalisasi)."""
+    try:
+        return datetime.strptime(str(text).strip(), "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise ValueError("Format tanggal salah. Contoh: 2025-12-01") from None
+
+
+def parse_price(text):
+    """Harga beli/jual -> float (angka biasa, tanpa pemisah ribuan)."""
+    try:
+        value = float(str(text).strip())
+    except ValueError:
+        raise ValueError("Masukkan angka (contoh: 100000)") from None
+    if not math.isfinite(value):
+        raise ValueError("Masukkan angka (contoh: 100000)")
+    return value
+
+
+def parse_service_type(text):
+    value = str(text).strip()
+    # Cocokkan tanpa peduli huruf besar/kecil, simpan dengan ejaan tombol ("VPS")
+    for service_type in SERVICE_TYPES:
+        if value.lower() == service_type.lower():
+            return service_type
+    raise ValueError(f"Jenis layanan harus salah satu dari: {', '.join(SERVICE_TYPES)}")
+
+
+def is_valid(parser, text):
+    """Bentuk predikat untuk validator percakapan (True/False)."""
+    try:
+        parser(text)
+        return True
+    except ValueError:
+        return False
+
+
+def service_row(raw):
+    """Dict mentah (baris CSV/JSON) -> baris insert HostingServices seperti hasil add hosting.
+
+    Melempar ValueError berisi semua kolom yang tidak valid. expired_date
+    opsional (layanan lama yang dipindahkan); default sama dengan tanggal_sewa.
+    """
+    errors = []
+    row = {}
+
+    def take(column, parser):
+        value = raw.get(column)
+        if value is None or str(value).strip() == "":
+            errors.append(f"{column}: wajib diisi")
+            return
+        try:
+            row[column] = parser(value)
+        except ValueError as e:
+            errors.append(f"{column}: {e}")
+
+    take("client_user_id", _parse_user_id)
+    take("provider", _parse_text)
+    take("domain", _parse_text)
+    take("service_type", parse_service_type)
+    take("tanggal_sewa", parse_date)
+    take("price_buy", parse_price)
+    take("price_sell", parse_price)
+    if str(raw.get("expired_date") or "").strip():
+        take("expired_date", parse_date)
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    row["status"] = "active"
+    row.setdefault("expired_date", row["tanggal_sewa"])
+    return row
+
+
+def _parse_user_id(text):
+    try:
+        return int(str(text).strip())
+    except ValueError:
+        raise ValueError("harus berupa user_id Telegram (angka)") from None
+
+
+def _parse_text(text):
+    return str(text).strip()
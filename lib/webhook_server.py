@@ -0,0 +1,133 @@
+# 📍 File: lib/webhook_server.py
+
+import asyncio
+import hmac
+import json
+import logging
+import secrets
+import signal
+from aiohttp import web
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """Server aiohttp untuk menerima update Telegram lewat webhook.
+
+    POST <path>   : update dari Telegram, divalidasi lewat header secret token
+                    lalu dimasukkan ke app.update_queue (handler tetap jalan
+                    lewat Application seperti mode polling).
+    GET  /healthz : 200 selama bot berjalan, 503 saat drain/belum siap.
+
+    Saat drain, update baru ditolak dengan 503 (Telegram akan mengirim ulang
+    setelah restart) dan request yang sedang diproses ditunggu selesai.
+    """
+
+    def __init__(self, app, path="/telegram", secret_token=None, host="0.0.0.0", port=8080):
+        self.app = app
+        self.path = path
+        self.secret_token = secret_token or secrets.token_urlsafe(32)
+        self.host = host
+        self.port = port
+        self.draining = False
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._runner = None
+
+        self.web_app = web.Application()
+        self.web_app.router.add_post(path, self.handle_update)
+        self.web_app.router.add_get("/healthz", self.handle_health)
+
+    # ---------- endpoint ----------
+    async def handle_update(self, request):
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, self.secret_token):
+            logger.warning(f"Webhook: secret token tidak valid dari {request.remote}")
+            return web.Response(status=403)
+        if self.draining:
+            return web.Response(status=503)
+
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            try:
+                data = await request.json()
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return web.Response(status=400)
+            update = Update.de_json(data, self.app.bot)
+            await self.app.update_queue.put(update)
+            return web.Response()
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
+
+    async def handle_health(self, request):
+        healthy = self.app.running and not self.draining
+        return web.json_response(
+            {
+                "status": "ok" if healthy else "draining" if self.draining else "starting",
+                "pending_updates": self.app.update_queue.qsize(),
+            },
+            status=200 if healthy else 503,
+        )
+
+    # ---------- lifecycle ----------
+    async def start(self):
+        self._runner = web.AppRunner(self.web_app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"Webhook server mendengarkan di {self.host}:{self.port}{self.path}")
+
+    async def drain(self, timeout=30):
+        """Berhenti menerima update lalu tunggu request yang masih berjalan."""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook drain: {self._in_flight} request belum selesai setelah {timeout} detik")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def run_webhook(app, url, path, secret_token, host, port, drain_timeout=30):
+    """Pengganti app.run_polling() untuk mode webhook, dengan graceful drain saat SIGINT/SIGTERM."""
+    server = WebhookServer(app, path=path, secret_token=secret_token, host=host, port=port)
+
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    await app.bot.set_webhook(
+        url=url.rstrip("/") + path,
+        secret_token=server.secret_token,
+        allowed_updates=Update.ALL_TYPES,
+    )
+    await app.start()
+    await server.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info("Webhook: shutdown diminta, drain update yang tersisa...")
+    await server.drain(drain_timeout)
+    # app.stop() memproses semua update yang sudah ada di antrean sebelum berhenti.
+    # Webhook sengaja tidak dihapus: Telegram menahan update baru sampai bot kembali.
+    await app.stop()
+    await server.stop()
+    if app.post_stop:
+        await app.post_stop(app)
+    await app.shutdown()
+    if app.post_shutdown:
+        await app.post_shutdown(app)
+    logger.info("Webhook: bot berhenti dengan bersih")
@@ -1,11 +1,28 @@
 # 📍 File: main.py
 
+import asyncio
 import logging
+from datetime import datetime
 from telegram.ext import ApplicationBuilder, CallbackQueryHandler
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 # Config
-from config import BOT_TOKEN
+from config import (
+    BOT_TOKEN, PERSISTENCE_ENABLED, CLIENT_WRITE_FLUSH_INTERVAL, CONCURRENT_UPDATES, METRICS_ENABLED,
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_DRAIN_TIMEOUT,
+    REALTIME_ENABLED, REPLICA_ENABLED, REPLICA_SYNC_INTERVAL, REPLICA_VERIFY_INTERVAL,
+)
+from database.sqlite_persistence import SQLitePersistence
+from lib.client_directory import client_directory
+from lib.search_index import search_index
+from lib.change_feed import change_feed
+from lib.webhook_server import run_webhook
+from lib.update_processor import ChatSerializedUpdateProcessor
+from lib.metrics import InstrumentedHTTPXRequest, instrument_application, start_metrics_server, timed_job
+from database.query_tracer import query_tracer
+from database.local_replica import local_replica
+from lib.payment_intake import payment_intake
+from lib.proof_archiver import proof_archiver
 
 # Handlers utama
 from handlers.start import get_start_handler
@@ -14,14 +31,10 @@ from handlers.list_hosting import get_list_hosting_handler
 from handlers.admin_menu import get_admin_menu_handler
 from handlers.menus.back_button import back_to_menu_handler
 from handlers.edit_hosting import get_edit_hosting_handler
-from handlers.delete_hosting import (
-    choose_hosting,
-    confirm_delete,
-    cancel_delete,
-    back_to_menu_handler as delete_back_to_menu_handler
-)
+from handlers.delete_hosting import get_delete_hosting_handler
 from handlers.info_hosting import get_info_hosting_handler
 from handlers.info_hosting import get_pay_button_handler
+from handlers.inline_search import get_inline_search_handler
 
 
 
@@ -29,6 +42,7 @@ from handlers.info_hosting import get_pay_button_handler
 from handlers.payment_reminder import (
     send_payment_reminders,
     get_payment_proof_handler,
+    get_proof_choice_handler,
     reset_monthly_status,
     get_admin_validation_handler
 )
@@ -42,20 +56,94 @@ logging.basicConfig(
 # Scheduler global
 scheduler = AsyncIOScheduler(timezone="Asia/Jakarta")
 
+# Persistence percakapan & session (SQLite, write-behind)
+persistence = SQLitePersistence() if PERSISTENCE_ENABLED else None
+
+# Job scheduler: durasi (Prometheus) + trace query per eksekusi
+def traced_job(name, func):
+    return timed_job(name, query_tracer.unit(name, func))
+
+
 # Fungsi async post-init scheduler
 async def on_startup(app):
+    # ✅ Endpoint Prometheus /metrics
+    start_metrics_server()
+
+    # ✅ Pulihkan session admin yang sedang berjalan sebelum restart
+    if persistence:
+        await persistence.start()
+
+    # ✅ Perubahan dari Supabase Realtime (dimulai sebelum load supaya perubahan selama load tidak terlewat)
+    if REALTIME_ENABLED:
+        change_feed.start()
+
+    # ✅ Cache nama klien untuk list hosting (gagal load tidak menghentikan bot, akan di-refresh lagi)
+    try:
+        await client_directory.load_all()
+    except Exception as e:
+        logging.error(f"Gagal memuat client directory saat startup: {e}")
+
+    # ✅ Index pencarian inline (domain/provider/klien), setelah client directory terisi
+    try:
+        await search_index.load(client_directory)
+    except Exception as e:
+        logging.error(f"Gagal membangun search index saat startup: {e}")
+
+    # ✅ Replica baca lokal untuk jalur admin (gagal sync awal = handler tetap query ke Supabase)
+    if REPLICA_ENABLED:
+        try:
+            await local_replica.sync()
+        except Exception as e:
+            logging.error(f"Gagal sync awal replica lokal: {e}")
+        scheduler.add_job(traced_job("replica_sync", local_replica.sync), "interval", seconds=REPLICA_SYNC_INTERVAL)
+        # Cek pertama segera: DELETE selama bot mati hanya terlihat lewat cek hash
+        scheduler.add_job(
+            traced_job("replica_verify", local_replica.verify), "interval", seconds=REPLICA_VERIFY_INTERVAL,
+            next_run_time=datetime.now(),
+        )
+
     # ✅ Reminder otomatis setiap hari jam 08:00
     #scheduler.add_job(send_payment_reminders, "cron", hour=8, minute=0, args=[app.bot])
-    scheduler.add_job(send_payment_reminders, "interval", minutes=1, args=[app.bot])
+    scheduler.add_job(traced_job("send_payment_reminders", send_payment_reminders), "interval", minutes=1, args=[app.bot])
     # ✅ Reset otomatis tiap tanggal 1 jam 00:05
-    scheduler.add_job(reset_monthly_status, "cron", day=1, hour=0, minute=5)
+    scheduler.add_job(traced_job("reset_monthly_status", reset_monthly_status), "cron", day=1, hour=0, minute=5)
+    # ✅ Tulis perubahan username/full_name klien secara batch
+    scheduler.add_job(
+        traced_job("client_flush_writes", client_directory.flush_writes), "interval", seconds=CLIENT_WRITE_FLUSH_INTERVAL
+    )
+
+    # ✅ Worker antrean bukti transfer
+    payment_intake.start()
+    # ✅ Arsip bukti transfer ke Supabase Storage (PROOF_ARCHIVE_ENABLED), termasuk sisa run sebelumnya
+    try:
+        await proof_archiver.start(app.bot)
+    except Exception as e:
+        logging.error(f"Gagal memulai arsip bukti transfer: {e}")
 
     scheduler.start()
     logging.info("Scheduler untuk payment reminder & reset bulanan aktif.")
 
 
+# Fungsi async sebelum bot berhenti: tutup change feed, selesaikan bukti transfer yang masih di antrean
+async def on_stop(app):
+    if REALTIME_ENABLED:
+        await change_feed.stop()
+    await payment_intake.stop()
+    await proof_archiver.stop()
+
+
 # Build aplikasi
-app = ApplicationBuilder().token(BOT_TOKEN).post_init(on_startup).build()
+builder = ApplicationBuilder().token(BOT_TOKEN).post_init(on_startup).post_stop(on_stop)
+if persistence:
+    builder = builder.persistence(persistence)
+# ✅ Update diproses paralel antar chat, berurutan per chat
+if CONCURRENT_UPDATES > 1:
+    builder = builder.concurrent_updates(ChatSerializedUpdateProcessor(CONCURRENT_UPDATES))
+# ✅ Hitung request & error Bot API per endpoint
+if METRICS_ENABLED:
+    builder = builder.request(InstrumentedHTTPXRequest(connection_pool_size=256)) \
+        .get_updates_request(InstrumentedHTTPXRequest())
+app = builder.build()
 
 # ✅ Start handler
 app.add_handler(get_start_handler())
@@ -66,6 +154,9 @@ app.add_handler(get_add_hosting_handler())
 # ✅ Edit Hosting
 app.add_handler(get_edit_hosting_handler())
 
+# ✅ Delete Hosting (picker berhalaman + pencarian butuh state percakapan)
+app.add_handler(get_delete_hosting_handler())
+
 # ✅ Info Hosting
 app.add_handler(get_info_hosting_handler())
 
@@ -82,18 +173,27 @@ for h in get_admin_menu_handler():
 for h in get_list_hosting_handler():
     app.add_handler(h)
 
-# ✅ Step lanjutan Delete Hosting
-app.add_handler(CallbackQueryHandler(choose_hosting, pattern="^deletehosting_"))
-app.add_handler(CallbackQueryHandler(confirm_delete, pattern="^confirm_delete$"))
-app.add_handler(CallbackQueryHandler(cancel_delete, pattern="^cancel_delete$"))
-app.add_handler(CallbackQueryHandler(delete_back_to_menu_handler, pattern="^back_to_menu$"))
-
 # ✅ Payment proof dari klien
 app.add_handler(get_payment_proof_handler())
+app.add_handler(get_proof_choice_handler())
 
 # ✅ Admin validation (Approve/Reject)
 app.add_handler(get_admin_validation_handler())
 
+# ✅ Pencarian inline admin (@bot <domain/provider/klien>)
+app.add_handler(get_inline_search_handler())
+
+# ✅ Latensi per handler untuk Prometheus (setelah semua handler terdaftar)
+instrument_application(app)
+# ✅ Trace query Supabase per update (QUERY_TRACE_ENABLED)
+query_tracer.trace_application(app)
+
 # ✅ Jalankan bot
 if __name__ == "__main__":
-    app.run_polling()
+    if WEBHOOK_URL:
+        asyncio.run(run_webhook(
+            app, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET or None,
+            WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_DRAIN_TIMEOUT,
+        ))
+    else:
+        app.run_polling()